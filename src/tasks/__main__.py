@@ -1,12 +1,19 @@
+import sys
+from pathlib import Path
+
+from tasks.service.batch_service import BATCH_STATUS_FAILED, BatchResult, run_batch
 from tasks.service.logging_service import get_logger
 from tasks.tui.app import MainApp
-from tasks.tui.args import get_args
-from tasks.tui.context import setup_context
+from tasks.tui.args import get_args, get_batch_args
+from tasks.tui.context import get_context, setup_context
 
 
 def main() -> None:
     config_path, tasks_directory, log_level, log_file = get_args()
     setup_context(config_path, tasks_directory, log_level, log_file)
+    manifest_file, concurrency = get_batch_args()
+    if manifest_file:
+        sys.exit(batch(manifest_file, concurrency))
     try:
         app = MainApp()
 
@@ -16,5 +23,27 @@ def main() -> None:
         raise e
 
 
+def batch(manifest_file: Path, concurrency: int) -> int:
+    def report(result: BatchResult) -> None:
+        row = result.row
+        print(
+            f'{result.status:8} {row.task_id:12} {result.elapsed:7.2f}s '
+            f'{row.remote_url} {result.task_id or result.error}',
+            flush=True,
+        )
+
+    try:
+        results = run_batch(get_context().config, manifest_file, concurrency, report)
+    except (OSError, ValueError) as e:
+        print(f'Error: {e}', file=sys.stderr)
+        return 2
+    counts = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+    summary = ', '.join(f'{count} {status}' for status, count in sorted(counts.items()))
+    print(f'{len(results)} rows: {summary or "nothing to do"}')
+    return 1 if counts.get(BATCH_STATUS_FAILED) else 0
+
+
 if __name__ == '__main__':
     main()
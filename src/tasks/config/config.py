@@ -1,4 +1,5 @@
 import logging
+import os
 import time
 from dataclasses import asdict, dataclass, field
 from pathlib import Path
@@ -7,9 +8,16 @@ from typing import Any
 import yaml
 
 from tasks.consts import BASE_CONFIG_PATH, TaskStatus
-from tasks.git import GitConfig, find_repos
+from tasks.git import GitConfig, scan_repos
+from tasks.git.clone_profile import CloneProfile
+from tasks.git.repo_index import REPO_INDEX_FILE, RepoIndex
+from tasks.git.repo_scanner import DEFAULT_EXCLUDES
+from tasks.git.worktree import STORES_DIRECTORY, WORKSPACE_MODE_CLONE
+from tasks.service.logging_service import get_logger
+from tasks.service.task_index import TASK_INDEX_FILE, TaskIndex
 
 CONFIG_FILE = '.tasks.yaml'
+REPO_INDEX_MAX_AGE = 60 * 60  # seconds before the repository index is rebuilt
 
 
 @dataclass
@@ -27,6 +35,32 @@ class Config:
     repo_samples: dict[str, str] = field(
         default_factory=dict
     )  # repository name -> local path
+    repo_scan_excludes: list[str] = field(
+        default_factory=lambda: list(DEFAULT_EXCLUDES)
+    )  # glob patterns of directories skipped by repository discovery
+    repo_scan_max_depth: int = field(default=0)  # 0 = unlimited
+    repo_scan_time_budget: float = field(default=0)  # seconds, 0 = unlimited
+    repo_scan_cursors: dict[str, list[tuple[str, int]]] = field(
+        default_factory=dict
+    )  # scanned directory -> pending directories of an unfinished scan
+    task_loading_workers: int = field(default=0)  # 0 = one per CPU (+4), 1 = serial
+    oneliner_concurrency: int = field(default=2)  # oneliners generated at a time
+    oneliner_engine: str = field(default='local')  # 'local' (offline) or 'agent'
+    clone_profiles: dict[str, CloneProfile] = field(
+        default_factory=dict
+    )  # repository name ('*' = any other) -> clone profile of its tasks
+    workspace_mode: str = field(default=WORKSPACE_MODE_CLONE)  # 'clone' or 'worktree'
+    mirror_cache: bool = field(default=False)  # clone new tasks from local mirrors
+    mirror_budget_mb: int = field(
+        default=4096
+    )  # disk budget of the mirrors, 0 = unlimited
+    mirror_refresh_interval: int = field(default=30 * 60)  # seconds between fetches
+    pool_sizes: dict[str, int] = field(
+        default_factory=dict
+    )  # repository name -> spare workspaces kept ready for new tasks
+    multi_repo_concurrency: int = field(
+        default=4
+    )  # clones of a multi-repository task at a time
 
     def __post_init__(self):
         config_file = Path(self.config_path) / CONFIG_FILE
@@ -52,13 +86,93 @@ class Config:
 
     def _find_repos(self):
         """Read all repos from base_repos_directory and updates the unique_repos dictionary"""
+        known_repos = list(self.repos)
         self.repos.clear()
         self.unique_repos.clear()
         for repo_folder in [self.tasks_directory, self.base_repos_directory]:
-            for git_config in find_repos(repo_folder):
+            for git_config in self._discover_repos(repo_folder, known_repos):
                 self.repos.append(git_config)
                 self.unique_repos[git_config.repository_name] = git_config.remote_url
 
+    def _discover_repos(
+        self, directory: str | Path, known_repos: list[GitConfig] | None = None
+    ) -> list[GitConfig]:
+        """Discover the repositories under directory using the scan settings.
+
+        When repo_scan_time_budget is set, a scan that runs out of time saves
+        its cursor and the next call resumes from it, keeping the repositories
+        under directory that are in known_repos (found by the earlier passes).
+        """
+        if not directory:
+            return []
+        directory = os.path.abspath(directory)
+        if self.repo_index.is_indexed(directory):
+            return self.repo_index.repos_under(directory)
+
+        cursor = self.repo_scan_cursors.pop(directory, None)
+        repos, next_cursor = scan_repos(
+            directory,
+            exclude=self.repo_scan_excludes,
+            max_depth=self.repo_scan_max_depth,
+            time_budget=self.repo_scan_time_budget,
+            cursor=cursor,
+        )
+        if next_cursor:
+            self.repo_scan_cursors[directory] = next_cursor
+            get_logger(__name__).info(
+                'Repository scan of %s ran out of time, %d directories pending',
+                directory,
+                len(next_cursor),
+            )
+        if cursor:
+            found = {repo.directory for repo in repos}
+            repos = [
+                repo
+                for repo in known_repos or []
+                if repo.directory.startswith(directory + os.sep)
+                and repo.directory not in found
+            ] + repos
+        self.repo_index.record_scan(directory, repos, complete=not next_cursor)
+        self.repo_index.save()
+        return repos
+
+    @property
+    def repo_index(self) -> RepoIndex:
+        """The repository index, loaded and refreshed (stat only) on first use"""
+        if getattr(self, '_repo_index', None) is None:
+            self._repo_index = RepoIndex(Path(self.config_path) / REPO_INDEX_FILE)
+            self._repo_index.load().refresh(self.repo_scan_excludes)
+            self._repo_index.save()
+        return self._repo_index
+
+    @property
+    def task_index(self) -> TaskIndex:
+        """The task index, reconciled with the status directories on every use"""
+        if getattr(self, '_task_index', None) is None:
+            self._task_index = TaskIndex(Path(self.config_path) / TASK_INDEX_FILE)
+        self._task_index.reconcile(self.tasks_directory)
+        return self._task_index
+
+    def repo_index_is_stale(self) -> bool:
+        return int(time.time()) - self.last_sync > REPO_INDEX_MAX_AGE
+
+    def rebuild_repo_index(self, background: bool = False):
+        """Rescan base_repos_directory and tasks_directory into the index.
+        The repositories are picked up by the next sync_repos"""
+        self.last_sync = int(time.time())
+        roots = [
+            str(directory)
+            for directory in [self.base_repos_directory, self.tasks_directory]
+            if directory
+        ]
+        if background:
+            return self.repo_index.rebuild_in_background(
+                roots, self.repo_scan_excludes, self.repo_scan_max_depth
+            )
+        self.repo_index.rebuild(
+            roots, self.repo_scan_excludes, self.repo_scan_max_depth
+        )
+
     def to_dict(self) -> dict:
         as_dict = asdict(self)
         for key, value in asdict(self).items():
@@ -104,6 +218,15 @@ class Config:
         p.mkdir(parents=True, exist_ok=True)
         return p
 
+    @property
+    def mirror_budget(self) -> int:
+        """Disk budget of the mirror cache in bytes, 0 = unlimited"""
+        return max(0, self.mirror_budget_mb) * 1024 * 1024
+
+    @property
+    def worktree_stores_directory(self) -> Path:
+        return Path(self.config_path) / STORES_DIRECTORY
+
     @property
     def archive_tasks_directory(self) -> Path:
         p = Path(self.tasks_directory) / TaskStatus.ARCHIVE.value
@@ -112,10 +235,11 @@ class Config:
 
     def sync_repos(self):
         """Read all repos from local folders and update the repos list"""
+        known_repos = list(self.repos)
         self.repos.clear()
         self.unique_repos.clear()
         for repo_folder in [self.base_repos_directory, self.tasks_directory]:
-            for git_config in find_repos(repo_folder):
+            for git_config in self._discover_repos(repo_folder, known_repos):
                 self.repos.append(git_config)
                 self.unique_repos[git_config.repository_name] = git_config.remote_url
                 if not self.base_repos_directory:
@@ -131,8 +255,9 @@ class Config:
     def add_repos_from_base_directory(self, base_directory: str) -> 'Config':
         base_directory = Path(base_directory)
 
-        for repo in find_repos(base_directory):
-            if not repo.is_git_directory:
+        known_directories = {repo.directory for repo in self.repos}
+        for repo in self._discover_repos(base_directory):
+            if not repo.is_git_directory or repo.directory in known_directories:
                 continue
             self.repos.append(repo)
             self.unique_repos[repo.repository_name] = repo.remote_url
@@ -142,6 +267,38 @@ class Config:
                 self.base_repos_directory = repo.directory
         return self
 
+    def clone_profile(self, repository_name: str) -> CloneProfile:
+        return self.clone_profiles.get(
+            repository_name, self.clone_profiles.get('*', CloneProfile())
+        )
+
+    def find_repo_sample(self, remote_url: str) -> str | None:
+        """Local checkout of the same repository as remote_url, used as object
+        source when cloning. Checkouts under base_repos_directory come first"""
+        project_name, repository_name = GitConfig.get_repo_names(remote_url)
+        if not repository_name:
+            return None
+        candidates = [
+            repo.directory
+            for repo in self.repos
+            if repo.repository_name == repository_name
+            and repo.project_name == project_name
+        ]
+        if sample := self.repo_samples.get(repository_name):
+            candidates.insert(0, sample)
+        base_repos_directory = str(self.base_repos_directory or '')
+        candidates.sort(
+            key=lambda directory: (
+                not (
+                    base_repos_directory and directory.startswith(base_repos_directory)
+                )
+            )
+        )
+        for directory in candidates:
+            if os.path.exists(os.path.join(directory, '.git')):
+                return directory
+        return None
+
     def update_repo_samples(self):
         self.repo_samples.clear()
         self.add_repos_from_base_directory(self.base_repos_directory)
@@ -170,14 +327,8 @@ def _unmarshal_git_config(raw_repo: Any) -> GitConfig | None:
     if not isinstance(raw_repo, dict):
         return None
 
-    directory = str(raw_repo.get('directory', '.'))
-    repo = GitConfig(directory=directory)
-
-    # Preserve serialized values for init=False fields when available.
-    for field_name, value in raw_repo.items():
-        if hasattr(repo, field_name):
-            setattr(repo, field_name, value)
-    return repo
+    # Serialized values are trusted, the repository index keeps them fresh
+    return GitConfig.from_dict(raw_repo)
 
 
 def _marshal_config(config: Config) -> dict[str, Any]:
@@ -194,6 +345,28 @@ def _marshal_config(config: Config) -> dict[str, Any]:
         'cursor_api_key': str(config.cursor_api_key),
         'log_level': str(config.log_level),
         'log_file': str(config.log_file),
+        'repo_scan_excludes': [str(pattern) for pattern in config.repo_scan_excludes],
+        'repo_scan_max_depth': int(config.repo_scan_max_depth),
+        'repo_scan_time_budget': float(config.repo_scan_time_budget),
+        'repo_scan_cursors': {
+            str(directory): [[str(path), int(depth)] for path, depth in cursor]
+            for directory, cursor in config.repo_scan_cursors.items()
+        },
+        'task_loading_workers': int(config.task_loading_workers),
+        'oneliner_concurrency': int(config.oneliner_concurrency),
+        'oneliner_engine': str(config.oneliner_engine),
+        'workspace_mode': str(config.workspace_mode),
+        'mirror_cache': bool(config.mirror_cache),
+        'mirror_budget_mb': int(config.mirror_budget_mb),
+        'mirror_refresh_interval': int(config.mirror_refresh_interval),
+        'multi_repo_concurrency': int(config.multi_repo_concurrency),
+        'pool_sizes': {
+            str(key): int(value) for key, value in config.pool_sizes.items()
+        },
+        'clone_profiles': {
+            str(name): profile.to_dict()
+            for name, profile in config.clone_profiles.items()
+        },
     }
 
 
@@ -239,6 +412,45 @@ def load_config_from_file(config_file: str | Path) -> Config:
     config.log_file = str(
         data.get('log_file', (Path(config.config_path) / 'tasks.log').as_posix())
     )
+    config.repo_samples = {}
+    repo_scan_excludes = data.get('repo_scan_excludes', DEFAULT_EXCLUDES)
+    config.repo_scan_excludes = (
+        [str(pattern) for pattern in repo_scan_excludes]
+        if isinstance(repo_scan_excludes, (list, tuple))
+        else list(DEFAULT_EXCLUDES)
+    )
+    config.repo_scan_max_depth = int(data.get('repo_scan_max_depth', 0))
+    config.repo_scan_time_budget = float(data.get('repo_scan_time_budget', 0))
+    repo_scan_cursors = data.get('repo_scan_cursors', {})
+    config.repo_scan_cursors = (
+        {
+            str(directory): [(str(path), int(depth)) for path, depth in cursor]
+            for directory, cursor in repo_scan_cursors.items()
+        }
+        if isinstance(repo_scan_cursors, dict)
+        else {}
+    )
+    config.task_loading_workers = int(data.get('task_loading_workers', 0))
+    config.oneliner_concurrency = int(data.get('oneliner_concurrency', 2))
+    config.oneliner_engine = str(data.get('oneliner_engine', 'local'))
+    config.workspace_mode = str(data.get('workspace_mode', WORKSPACE_MODE_CLONE))
+    config.mirror_cache = bool(data.get('mirror_cache', False))
+    config.mirror_budget_mb = int(data.get('mirror_budget_mb', 4096))
+    config.mirror_refresh_interval = int(data.get('mirror_refresh_interval', 30 * 60))
+    config.multi_repo_concurrency = int(data.get('multi_repo_concurrency', 4))
+    config.pool_sizes = {
+        str(key): max(0, int(value))
+        for key, value in (data.get('pool_sizes') or {}).items()
+    }
+    config.clone_profiles = {}
+    clone_profiles = data.get('clone_profiles', {})
+    for name, raw_profile in (
+        clone_profiles.items() if isinstance(clone_profiles, dict) else []
+    ):
+        try:
+            config.clone_profiles[str(name)] = CloneProfile.from_dict(raw_profile)
+        except (ValueError, TypeError, AttributeError) as e:
+            get_logger(__name__).warning('Invalid clone profile %s: %s', name, e)
 
     if not config.unique_repos:
         config.unique_repos = {
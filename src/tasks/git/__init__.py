@@ -1,3 +1,3 @@
-__all__ = ['GitConfig', 'find_repos', 'get_root_directory']
+__all__ = ['GitConfig', 'find_repos', 'get_root_directory', 'scan_repos']
 
-from tasks.git.git_config import GitConfig, find_repos, get_root_directory
+from tasks.git.git_config import GitConfig, find_repos, get_root_directory, scan_repos
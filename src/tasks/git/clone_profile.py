@@ -0,0 +1,75 @@
+from dataclasses import asdict, dataclass
+from typing import Any
+
+CLONE_MODE_FULL = 'full'
+CLONE_MODE_BLOBLESS = 'blobless'  # --filter=blob:none
+CLONE_MODE_TREELESS = 'treeless'  # --filter=tree:0
+CLONE_MODES = (CLONE_MODE_FULL, CLONE_MODE_BLOBLESS, CLONE_MODE_TREELESS)
+
+_FILTERS = {
+    CLONE_MODE_BLOBLESS: 'blob:none',
+    CLONE_MODE_TREELESS: 'tree:0',
+}
+
+
+@dataclass
+class CloneProfile:
+    """How the task clones of a repository are made"""
+
+    mode: str = CLONE_MODE_FULL
+    depth: int = 0  # 0 = full history
+    single_branch: bool = False
+    # complete the clone (history, blobs, branches) in background after the task is created
+    deepen: bool = False
+
+    def __post_init__(self):
+        if self.mode not in CLONE_MODES:
+            raise ValueError(f'Invalid clone mode: {self.mode}')
+        if self.depth < 0:
+            raise ValueError(f'Invalid clone depth: {self.depth}')
+
+    @property
+    def is_reduced(self) -> bool:
+        """True when the clone is missing history, objects or branches"""
+        return self.mode != CLONE_MODE_FULL or self.depth > 0 or self.single_branch
+
+    def clone_args(self) -> list[str]:
+        args = []
+        if self.mode in _FILTERS:
+            args.append(f'--filter={_FILTERS[self.mode]}')
+        if self.depth:
+            args.extend(['--depth', str(self.depth)])
+        if self.single_branch:
+            args.append('--single-branch')
+        elif self.depth:
+            # --depth implies --single-branch unless told otherwise
+            args.append('--no-single-branch')
+        return args
+
+    def deepen_commands(self) -> list[list[str]]:
+        """git commands (without 'git') that turn the clone into a full one"""
+        commands = []
+        if self.single_branch:
+            commands.append(['remote', 'set-branches', 'origin', '*'])
+        if self.mode in _FILTERS:
+            commands.append(['config', '--unset', 'remote.origin.partialclonefilter'])
+        fetch = ['fetch', '--quiet', 'origin']
+        if self.depth:
+            fetch.append('--unshallow')
+        if self.mode in _FILTERS:
+            fetch.append('--refetch')
+        if self.is_reduced:
+            commands.append(fetch)
+        return commands
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> 'CloneProfile':
+        return cls(
+            mode=str(data.get('mode', CLONE_MODE_FULL)),
+            depth=int(data.get('depth', 0)),
+            single_branch=bool(data.get('single_branch', False)),
+            deepen=bool(data.get('deepen', False)),
+        )
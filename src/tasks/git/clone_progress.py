@@ -0,0 +1,73 @@
+"""Parsing of the `git clone --progress` lines, e.g.
+
+Receiving objects:  45% (450/1000), 1.20 MiB | 2.40 MiB/s
+Resolving deltas:  30% (3/10)
+"""
+
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+_PROGRESS = re.compile(
+    r'^(?:remote:\s*)?(?P<phase>[A-Za-z][A-Za-z ]*?):\s+(?P<percent>\d+)%'
+    r'(?:\s+\((?P<done>\d+)/(?P<total>\d+)\))?'
+    r'(?:,\s+(?P<received>[\d.]+\s+\w+)\s+\|\s+(?P<rate>[\d.]+\s+\w+/s))?'
+)
+
+
+@dataclass
+class CloneProgress:
+    phase: str
+    percent: int
+    done: int = 0
+    total: int = 0
+    received: str = ''  # e.g. '1.20 MiB'
+    rate: str = ''  # e.g. '2.40 MiB/s'
+    eta: float | None = None  # seconds left in the phase
+
+    def describe(self) -> str:
+        text = f'{self.phase}: {self.percent}%'
+        if self.total:
+            text += f' ({self.done}/{self.total})'
+        if self.received:
+            text += f', {self.received}'
+        if self.rate:
+            text += f' | {self.rate}'
+        if self.eta is not None:
+            text += f' | ETA {int(self.eta) // 60}:{int(self.eta) % 60:02d}'
+        return text
+
+
+def parse_clone_progress(line: str) -> CloneProgress | None:
+    """The progress of a `git clone --progress` line, or None for other lines"""
+    if not (match := _PROGRESS.match(line.strip())):
+        return None
+    return CloneProgress(
+        phase=match['phase'],
+        percent=int(match['percent']),
+        done=int(match['done'] or 0),
+        total=int(match['total'] or 0),
+        received=match['received'] or '',
+        rate=match['rate'] or '',
+    )
+
+
+class CloneProgressTracker:
+    """Adds the ETA of each phase to the parsed progress lines"""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._phase = ''
+        self._started_at = 0.0
+
+    def update(self, line: str) -> CloneProgress | None:
+        if (progress := parse_clone_progress(line)) is None:
+            return None
+        now = self._clock()
+        if progress.phase != self._phase:
+            self._phase, self._started_at = progress.phase, now
+        elapsed = now - self._started_at
+        if 0 < progress.percent < 100 and elapsed > 0:
+            progress.eta = elapsed * (100 - progress.percent) / progress.percent
+        return progress
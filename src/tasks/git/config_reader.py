@@ -0,0 +1,366 @@
+"""Pure-Python reader for the git configuration of a working directory.
+
+Covers what `GitConfig` needs (remotes, push urls and `insteadOf` rewrites)
+without spawning `git`. Anything outside the supported subset raises
+`UnsupportedGitConfig`, so the caller can fall back to the git CLI.
+"""
+
+import os
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+
+MAX_INCLUDE_DEPTH = 10
+
+
+class UnsupportedGitConfig(Exception):
+    """The configuration uses a feature this reader does not understand"""
+
+
+@dataclass
+class RepositoryConfig:
+    git_dir: str
+    common_dir: str
+    entries: list[tuple[str, str]] = field(default_factory=list)
+
+    def get_all(self, key: str) -> list[str]:
+        key = _normalize_key(key)
+        values: list[str] = []
+        for entry_key, value in self.entries:
+            if entry_key == key:
+                if value:
+                    values.append(value)
+                else:
+                    # An empty value resets multi-valued keys (e.g. remote urls)
+                    values.clear()
+        return values
+
+    def get(self, key: str, default: str = '') -> str:
+        values = self.get_all(key)
+        return values[-1] if values else default
+
+    @property
+    def remotes(self) -> list[str]:
+        """Remote names in config order. Like `git remote`, any
+        `remote.<name>.<key>` entry declares a remote, even without url"""
+        remotes: list[str] = []
+        for key, _ in self.entries:
+            if key.startswith('remote.') and key.count('.') >= 2:
+                name = key[len('remote.') : key.rindex('.')]
+                if name not in remotes:
+                    remotes.append(name)
+        return remotes
+
+    def rewrites(self, push: bool = False) -> dict[str, str]:
+        """Return the `url.<base>.insteadOf` (or `pushInsteadOf`) prefixes"""
+        suffix = '.pushinsteadof' if push else '.insteadof'
+        rewrites: dict[str, str] = {}
+        for key, value in self.entries:
+            if key.startswith('url.') and key.endswith(suffix) and value:
+                rewrites[value] = key[len('url.') : -len(suffix)]
+        return rewrites
+
+    def remote_url(self, remote_name: str, push: bool = False) -> str:
+        """Mimic `git remote get-url [--push] <remote_name>`"""
+        urls = self.get_all(f'remote.{remote_name}.url')
+        if push:
+            if push_urls := self.get_all(f'remote.{remote_name}.pushurl'):
+                return rewrite_url(push_urls[0], self.rewrites())
+            if urls:
+                push_rewrites = self.rewrites(push=True)
+                rewritten = rewrite_url(urls[0], push_rewrites)
+                if rewritten != urls[0]:
+                    return rewritten
+        return rewrite_url(urls[0], self.rewrites()) if urls else ''
+
+
+def rewrite_url(url: str, rewrites: dict[str, str]) -> str:
+    """Apply the longest matching `insteadOf` prefix, like git does"""
+    best = ''
+    for prefix in rewrites:
+        if url.startswith(prefix) and len(prefix) > len(best):
+            best = prefix
+    if not best:
+        return url
+    return rewrites[best] + url[len(best) :]
+
+
+def resolve_git_dir(directory: str | Path) -> tuple[str, str] | None:
+    """Return (git_dir, common_dir) for a working directory, following
+    `gitdir:` pointers of worktrees and submodules"""
+    dot_git = os.path.join(directory, '.git')
+    if os.path.isdir(dot_git):
+        git_dir = dot_git
+    elif os.path.isfile(dot_git):
+        with open(dot_git, encoding='utf-8') as f:
+            content = f.read().strip()
+        if not content.startswith('gitdir:'):
+            raise UnsupportedGitConfig(f'Invalid .git file: {dot_git}')
+        git_dir = content.removeprefix('gitdir:').strip()
+        if not os.path.isabs(git_dir):
+            git_dir = os.path.normpath(os.path.join(directory, git_dir))
+        if not os.path.isdir(git_dir):
+            return None
+    else:
+        return None
+
+    common_dir = git_dir
+    commondir_file = os.path.join(git_dir, 'commondir')
+    if os.path.isfile(commondir_file):
+        with open(commondir_file, encoding='utf-8') as f:
+            common_dir = f.read().strip()
+        if not os.path.isabs(common_dir):
+            common_dir = os.path.normpath(os.path.join(git_dir, common_dir))
+    return git_dir, common_dir
+
+
+def read_repository_config(directory: str | Path) -> RepositoryConfig | None:
+    """Read the effective configuration (system, global and local) of the
+    repository at `directory`. Returns None when it is not a git directory"""
+    if not (git_dirs := resolve_git_dir(directory)):
+        return None
+    git_dir, common_dir = git_dirs
+    local_config = os.path.join(common_dir, 'config')
+    if not os.path.isfile(local_config):
+        return None
+
+    config = RepositoryConfig(git_dir=git_dir, common_dir=common_dir)
+    for config_file in _global_config_files():
+        config.entries.extend(_load_entries(config_file, config, 0))
+    config.entries.extend(_load_entries(local_config, config, 0))
+
+    worktree_config = os.path.join(git_dir, 'config.worktree')
+    if config.get('extensions.worktreeConfig').lower() in (
+        'true',
+        'yes',
+        'on',
+        '1',
+    ) and os.path.isfile(worktree_config):
+        config.entries.extend(_load_entries(worktree_config, config, 0))
+    return config
+
+
+def _global_config_files() -> list[str]:
+    files: list[str] = []
+    if not os.environ.get('GIT_CONFIG_NOSYSTEM'):
+        files.append(os.environ.get('GIT_CONFIG_SYSTEM', '/etc/gitconfig'))
+    if global_config := os.environ.get('GIT_CONFIG_GLOBAL'):
+        files.append(global_config)
+    else:
+        xdg_home = os.environ.get('XDG_CONFIG_HOME') or os.path.join(
+            os.path.expanduser('~'), '.config'
+        )
+        files.append(os.path.join(xdg_home, 'git', 'config'))
+        files.append(os.path.join(os.path.expanduser('~'), '.gitconfig'))
+    return [file for file in files if os.path.isfile(file)]
+
+
+def _load_entries(
+    config_file: str, config: RepositoryConfig, depth: int
+) -> list[tuple[str, str]]:
+    if depth > MAX_INCLUDE_DEPTH:
+        raise UnsupportedGitConfig(f'Include depth exceeded at {config_file}')
+    try:
+        stat = os.stat(config_file)
+    except OSError:
+        # git silently ignores missing include files
+        return []
+    parsed = _parse_config_file(
+        config_file, (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    )
+
+    entries: list[tuple[str, str]] = []
+    for key, value in parsed:
+        if key == 'include.path':
+            include = _include_path(value, config_file)
+            entries.extend(_load_entries(include, config, depth + 1))
+        elif key.startswith('includeif.') and key.endswith('.path'):
+            condition = key[len('includeif.') : -len('.path')]
+            if _include_condition_matches(condition, config_file, config):
+                include = _include_path(value, config_file)
+                entries.extend(_load_entries(include, config, depth + 1))
+        else:
+            entries.append((key, value))
+    return entries
+
+
+def _include_path(path: str, config_file: str) -> str:
+    path = os.path.expanduser(path)
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(config_file), path)
+    return path
+
+
+def _include_condition_matches(
+    condition: str, config_file: str, config: RepositoryConfig
+) -> bool:
+    if condition.startswith(('gitdir:', 'gitdir/i:')):
+        ignore_case = condition.startswith('gitdir/i:')
+        pattern = condition.split(':', 1)[1]
+        if pattern.startswith('./'):
+            pattern = os.path.join(os.path.dirname(config_file), pattern[2:])
+        elif pattern.startswith('~/'):
+            pattern = os.path.expanduser(pattern)
+        elif not os.path.isabs(pattern):
+            pattern = '**/' + pattern
+        if pattern.endswith('/'):
+            pattern += '**'
+        regex = _wildmatch_regex(pattern, ignore_case)
+        git_dir = config.git_dir.rstrip('/')
+        return any(
+            regex.fullmatch(candidate)
+            for candidate in {git_dir, os.path.realpath(git_dir)}
+        )
+
+    if condition.startswith('onbranch:'):
+        pattern = condition.removeprefix('onbranch:')
+        if pattern.endswith('/'):
+            pattern += '**'
+        branch = _current_branch(config.git_dir)
+        return bool(branch) and bool(_wildmatch_regex(pattern).fullmatch(branch))
+
+    raise UnsupportedGitConfig(f'Unsupported includeIf condition: {condition}')
+
+
+def _current_branch(git_dir: str) -> str:
+    try:
+        with open(os.path.join(git_dir, 'HEAD'), encoding='utf-8') as f:
+            head = f.read().strip()
+    except OSError:
+        return ''
+    if not head.startswith('ref:'):
+        # Detached HEAD: git never matches `onbranch:` conditions
+        return ''
+    ref = head.removeprefix('ref:').strip()
+    return ref.removeprefix('refs/heads/') if ref.startswith('refs/heads/') else ''
+
+
+@lru_cache(maxsize=256)
+def _wildmatch_regex(pattern: str, ignore_case: bool = False) -> re.Pattern:
+    regex = ''
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            regex += '(?:.*/)?'
+            i += 3
+        elif pattern.startswith('/**', i) and i + 3 == len(pattern):
+            regex += '(?:/.*)?'
+            i += 3
+        elif pattern.startswith('**', i):
+            regex += '.*'
+            i += 2
+        elif pattern[i] == '*':
+            regex += '[^/]*'
+            i += 1
+        elif pattern[i] == '?':
+            regex += '[^/]'
+            i += 1
+        elif pattern[i] == '[' and (end := pattern.find(']', i + 2)) > 0:
+            regex += '[' + pattern[i + 1 : end].replace('!', '^', 1) + ']'
+            i = end + 1
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+    return re.compile(regex, re.IGNORECASE if ignore_case else 0)
+
+
+@lru_cache(maxsize=1024)
+def _parse_config_file(
+    config_file: str, signature: tuple[int, int, int]
+) -> tuple[tuple[str, str], ...]:
+    """Parse a config file into (key, value) pairs. `signature` is the
+    (inode, mtime, size) of the file and only serves as cache key"""
+    with open(config_file, encoding='utf-8', errors='replace') as f:
+        content = f.read()
+    return tuple(parse_config(content, config_file))
+
+
+_SECTION_RE = re.compile(
+    r'\[\s*(?P<section>[A-Za-z0-9.-]+)\s*(?:"(?P<subsection>(?:[^"\\]|\\.)*)")?\s*\]'
+)
+_KEY_RE = re.compile(r'(?P<key>[A-Za-z][A-Za-z0-9-]*)\s*(?P<equal>=)?')
+
+
+def parse_config(content: str, source: str = '<string>') -> list[tuple[str, str]]:
+    entries: list[tuple[str, str]] = []
+    section = ''
+    lines = content.splitlines()
+    index = 0
+    while index < len(lines):
+        line = lines[index].strip()
+        index += 1
+        if not line or line[0] in '#;':
+            continue
+
+        if line.startswith('['):
+            match = _SECTION_RE.match(line)
+            if not match:
+                raise UnsupportedGitConfig(f'Invalid section in {source}: {line}')
+            section = match.group('section').lower()
+            if (subsection := match.group('subsection')) is not None:
+                section += '.' + re.sub(r'\\(.)', r'\1', subsection)
+            line = line[match.end() :].strip()
+            if not line or line[0] in '#;':
+                continue
+
+        if not section:
+            raise UnsupportedGitConfig(f'Key outside of a section in {source}')
+        match = _KEY_RE.match(line)
+        if not match:
+            raise UnsupportedGitConfig(f'Invalid line in {source}: {line}')
+        key = f'{section}.{match.group("key").lower()}'
+        if not match.group('equal'):
+            # Boolean shorthand: a key without value means true
+            entries.append((key, 'true'))
+            continue
+
+        raw_value = line[match.end() :]
+        while raw_value.endswith('\\') and not raw_value.endswith('\\\\'):
+            if index >= len(lines):
+                break
+            raw_value = raw_value[:-1] + lines[index]
+            index += 1
+        entries.append((key, _parse_value(raw_value, source)))
+    return entries
+
+
+_ESCAPES = {'n': '\n', 't': '\t', 'b': '\b', '\\': '\\', '"': '"'}
+
+
+def _parse_value(raw_value: str, source: str) -> str:
+    value = ''
+    pending_space = ''
+    quoted = False
+    i = 0
+    raw_value = raw_value.strip()
+    while i < len(raw_value):
+        char = raw_value[i]
+        i += 1
+        if char == '"':
+            quoted = not quoted
+            continue
+        if char == '\\':
+            if i >= len(raw_value) or raw_value[i] not in _ESCAPES:
+                raise UnsupportedGitConfig(f'Invalid escape in {source}')
+            value += pending_space + _ESCAPES[raw_value[i]]
+            pending_space = ''
+            i += 1
+            continue
+        if not quoted and char in '#;':
+            break
+        if not quoted and char.isspace():
+            if value:
+                pending_space += char
+            continue
+        value += pending_space + char
+        pending_space = ''
+    if quoted:
+        raise UnsupportedGitConfig(f'Unterminated quote in {source}')
+    return value
+
+
+def _normalize_key(key: str) -> str:
+    section, _, name = key.rpartition('.')
+    first, dot, subsection = section.partition('.')
+    return f'{first.lower()}{dot}{subsection}.{name.lower()}'
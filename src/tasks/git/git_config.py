@@ -1,11 +1,18 @@
 import os
 import re
 import subprocess
-from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, fields
 from pathlib import Path
 from typing import Generator
 from urllib.parse import urlparse
 
+from tasks.git.config_reader import (
+    UnsupportedGitConfig,
+    read_repository_config,
+    resolve_git_dir,
+)
+from tasks.git.repo_scanner import DEFAULT_EXCLUDES, scan_repo_directories
 from tasks.service.logging_service import get_logger
 
 
@@ -22,14 +29,21 @@ class GitConfig:
     def __post_init__(self):
         logger = get_logger(__name__)
         self.directory = os.path.abspath(self.directory)
-        if not os.path.exists(os.path.join(self.directory, '.git', 'config')):
+        try:
+            remote_name, remote_url = self._read_remote_from_repository_config()
+        except UnsupportedGitConfig as e:
+            logger.debug('Falling back to git CLI for %s: %s', self.directory, e)
+            remote_name, remote_url = self._read_remote_from_git()
+            if not (remote_name and remote_url):
+                remote_name, remote_url = self._read_remote_from_config_file()
+        except OSError as e:
+            logger.warning('Failed to read git config of %s: %s', self.directory, e)
+            remote_name, remote_url = None, None
+
+        if remote_name is None:
             logger.warning('Not a git directory: %s', self.directory)
             return
 
-        remote_name, remote_url = self._read_remote_from_git()
-        if not (remote_name and remote_url):
-            remote_name, remote_url = self._read_remote_from_config_file()
-
         if not (remote_name and remote_url):
             logger.warning(
                 'Misconfigured git directory: %s - remote_name: %s, remote_url: %s',
@@ -57,6 +71,28 @@ class GitConfig:
         self.readme_description = self.get_readme_description(self.directory)
         logger.info('%s', self)
 
+    @classmethod
+    def from_dict(cls, data: dict) -> 'GitConfig':
+        """Rebuild a GitConfig from its serialized fields, without reading
+        the repository again"""
+        repo = cls.__new__(cls)
+        for f in fields(cls):
+            setattr(repo, f.name, f.type(data.get(f.name, f.default)))
+        return repo
+
+    def _read_remote_from_repository_config(self) -> tuple[str | None, str | None]:
+        """Read the remote without spawning git, following the same rules as
+        `git remote` + `git remote get-url --push`.
+        Returns (None, None) when the directory is not a git repository"""
+        if not (repo_config := read_repository_config(self.directory)):
+            return None, None
+
+        remotes = repo_config.remotes
+        if not remotes:
+            return '', ''
+        remote_name = 'origin' if 'origin' in remotes else remotes[0]
+        return remote_name, repo_config.remote_url(remote_name, push=True)
+
     def _read_remote_from_git(self) -> tuple[str, str]:
         logger = get_logger(__name__)
         remotes_result = subprocess.run(
@@ -101,7 +137,11 @@ class GitConfig:
 
     def _read_remote_from_config_file(self) -> tuple[str, str]:
         current_remote_name = ''
-        config_path = os.path.join(self.directory, '.git', 'config')
+        if not (git_dirs := resolve_git_dir(self.directory)):
+            return '', ''
+        config_path = os.path.join(git_dirs[1], 'config')
+        if not os.path.isfile(config_path):
+            return '', ''
         for line in open(config_path, encoding='utf-8').readlines():
             line = line.strip()
             if line.startswith('[remote "'):
@@ -155,10 +195,47 @@ class GitConfig:
         return ''
 
 
-def find_repos(base_path: str | Path) -> Generator[GitConfig, None, None]:
-    for root, dirs, _ in os.walk(base_path):
-        if '.git' in dirs:
-            yield GitConfig(directory=root)
+def find_repos(
+    base_path: str | Path,
+    exclude: list[str] | tuple[str, ...] = DEFAULT_EXCLUDES,
+    max_depth: int = 0,
+    max_workers: int | None = None,
+) -> Generator[GitConfig, None, None]:
+    """Yield the repositories under base_path, in directory order.
+    Repository roots are not descended into, and the GitConfig objects are
+    built by a thread pool"""
+    result = scan_repo_directories(base_path, exclude=exclude, max_depth=max_depth)
+    yield from _load_git_configs(result.directories, max_workers)
+
+
+def scan_repos(
+    base_path: str | Path,
+    exclude: list[str] | tuple[str, ...] = DEFAULT_EXCLUDES,
+    max_depth: int = 0,
+    time_budget: float = 0,
+    cursor: list[tuple[str, int]] | None = None,
+    max_workers: int | None = None,
+) -> tuple[list[GitConfig], list[tuple[str, int]]]:
+    """Like find_repos, but stops after time_budget seconds (0 = unlimited).
+    Returns the repositories found and the cursor to resume the scan from
+    (empty when the scan is complete)"""
+    result = scan_repo_directories(
+        base_path,
+        exclude=exclude,
+        max_depth=max_depth,
+        time_budget=time_budget,
+        cursor=cursor,
+    )
+    return list(_load_git_configs(result.directories, max_workers)), result.cursor
+
+
+def _load_git_configs(
+    directories: list[str], max_workers: int | None
+) -> Generator[GitConfig, None, None]:
+    if not directories:
+        return
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        yield from executor.map(GitConfig, directories)
 
 
 def get_root_directory(directory: str) -> str | None:
@@ -0,0 +1,267 @@
+"""On-disk index of the local repositories, stored next to `.tasks.yaml`.
+
+Each repository is keyed by the (inode, mtime, size) signature of its git
+config file and README.md, so a warm start only stats those files and
+re-parses the repositories whose signature changed. Finding new
+repositories is left to `rebuild` (explicit or background), apart from the
+cheap re-listing of known parent directories whose mtime changed.
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+from tasks.git.config_reader import UnsupportedGitConfig, resolve_git_dir
+from tasks.git.git_config import GitConfig
+from tasks.git.repo_scanner import DEFAULT_EXCLUDES, scan_repo_directories
+from tasks.service.logging_service import get_logger
+
+REPO_INDEX_FILE = '.repos_index.json'
+REPO_INDEX_VERSION = 1
+
+Signature = tuple[int, int, int] | None
+
+
+def file_signature(path: str) -> Signature:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def git_config_file(directory: str) -> str:
+    """Path of the config file that holds the remotes of a working directory"""
+    try:
+        git_dirs = resolve_git_dir(directory)
+    except (OSError, UnsupportedGitConfig):
+        git_dirs = None
+    if not git_dirs:
+        return os.path.join(directory, '.git', 'config')
+    return os.path.join(git_dirs[1], 'config')
+
+
+class RepoIndex:
+    def __init__(self, index_file: str | Path) -> None:
+        self.index_file = Path(index_file)
+        # directory -> {'config_file', 'config_signature', 'readme_signature', 'repo'}
+        self._entries: dict[str, dict[str, Any]] = {}
+        # scanned root directory -> time of the last complete scan
+        self._roots: dict[str, float] = {}
+        # parent directory of indexed repositories -> mtime_ns
+        self._parents: dict[str, int] = {}
+        self._repos: dict[str, GitConfig] = {}
+        self._lock = threading.RLock()
+        self._dirty = False
+
+    def load(self) -> 'RepoIndex':
+        try:
+            with self.index_file.open('r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self
+        if not isinstance(data, dict) or data.get('version') != REPO_INDEX_VERSION:
+            return self
+        with self._lock:
+            self._roots = {str(k): float(v) for k, v in data.get('roots', {}).items()}
+            self._parents = {str(k): int(v) for k, v in data.get('parents', {}).items()}
+            for entry in data.get('repos', []):
+                entry['config_signature'] = _as_signature(entry.get('config_signature'))
+                entry['readme_signature'] = _as_signature(entry.get('readme_signature'))
+                self._entries[entry['repo']['directory']] = entry
+                self._repos[entry['repo']['directory']] = GitConfig.from_dict(
+                    entry['repo']
+                )
+        return self
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty and self.index_file.exists():
+                return
+            data = {
+                'version': REPO_INDEX_VERSION,
+                'roots': self._roots,
+                'parents': self._parents,
+                'repos': list(self._entries.values()),
+            }
+            self._dirty = False
+        try:
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.index_file.with_suffix('.tmp')
+            with tmp_file.open('w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_file, self.index_file)
+        except OSError as e:
+            get_logger(__name__).warning('Failed to save repository index: %s', e)
+
+    def is_indexed(self, root: str) -> bool:
+        """True when root had a complete scan"""
+        return os.path.abspath(root) in self._roots
+
+    def repos_under(self, root: str) -> list[GitConfig]:
+        root = os.path.abspath(root)
+        with self._lock:
+            return [
+                repo
+                for directory, repo in sorted(self._repos.items())
+                if directory == root or directory.startswith(root + os.sep)
+            ]
+
+    def refresh(self, exclude: list[str] | tuple[str, ...] = DEFAULT_EXCLUDES) -> None:
+        """Warm start: stat the indexed files, re-parse the repositories whose
+        signature changed, drop the removed ones and list the known parent
+        directories that changed, to pick up new sibling repositories"""
+        with self._lock:
+            entries = list(self._entries.values())
+            parents = dict(self._parents)
+
+        changed: list[str] = []
+        for entry in entries:
+            directory = entry['repo']['directory']
+            config_signature = file_signature(entry['config_file'])
+            if config_signature is None:
+                self._remove(directory)
+            elif (
+                config_signature != entry['config_signature']
+                or file_signature(os.path.join(directory, 'README.md'))
+                != entry['readme_signature']
+            ):
+                changed.append(directory)
+
+        for parent, mtime_ns in parents.items():
+            try:
+                current_mtime_ns = os.stat(parent).st_mtime_ns
+            except OSError:
+                with self._lock:
+                    self._parents.pop(parent, None)
+                    self._dirty = True
+                continue
+            if current_mtime_ns == mtime_ns:
+                continue
+            result = scan_repo_directories(parent, exclude=exclude, max_depth=1)
+            changed.extend(
+                directory
+                for directory in result.directories
+                if directory not in self._entries
+            )
+            with self._lock:
+                self._parents[parent] = current_mtime_ns
+                self._dirty = True
+
+        self._index_directories(changed)
+
+    def add(self, repo: GitConfig) -> None:
+        """Index a repository that was just created (e.g. a new task clone)"""
+        if repo.is_git_directory:
+            self._put(repo)
+
+    def record_scan(self, root: str, repos: list[GitConfig], complete: bool) -> None:
+        """Store the result of a scan of root; complete marks root as indexed"""
+        for repo in repos:
+            if repo.is_git_directory:
+                self._put(repo)
+        if complete:
+            with self._lock:
+                self._roots[os.path.abspath(root)] = time.time()
+                self._dirty = True
+
+    def rebuild(
+        self,
+        roots: list[str],
+        exclude: list[str] | tuple[str, ...] = DEFAULT_EXCLUDES,
+        max_depth: int = 0,
+    ) -> None:
+        """Rescan roots, parsing only new or changed repositories, and drop
+        the indexed repositories under them that no longer exist"""
+        for root in roots:
+            if not root:
+                continue
+            root = os.path.abspath(root)
+            result = scan_repo_directories(root, exclude=exclude, max_depth=max_depth)
+            found = set(result.directories)
+            for repo in self.repos_under(root):
+                if repo.directory not in found:
+                    self._remove(repo.directory)
+            self._index_directories(
+                [
+                    directory
+                    for directory in result.directories
+                    if self._is_changed(directory)
+                ]
+            )
+            with self._lock:
+                self._roots[root] = time.time()
+                self._dirty = True
+        self.save()
+
+    def rebuild_in_background(
+        self,
+        roots: list[str],
+        exclude: list[str] | tuple[str, ...] = DEFAULT_EXCLUDES,
+        max_depth: int = 0,
+    ) -> threading.Thread:
+        thread = threading.Thread(
+            target=self.rebuild,
+            args=(roots, exclude, max_depth),
+            name='repo-index-rebuild',
+            daemon=True,
+        )
+        thread.start()
+        return thread
+
+    def _is_changed(self, directory: str) -> bool:
+        entry = self._entries.get(directory)
+        return (
+            not entry
+            or file_signature(entry['config_file']) != entry['config_signature']
+            or file_signature(os.path.join(directory, 'README.md'))
+            != entry['readme_signature']
+        )
+
+    def _index_directories(self, directories: list[str]) -> None:
+        if not directories:
+            return
+        with ThreadPoolExecutor() as executor:
+            for repo in executor.map(GitConfig, directories):
+                if repo.is_git_directory:
+                    self._put(repo)
+                else:
+                    self._remove(repo.directory)
+
+    def _put(self, repo: GitConfig) -> None:
+        config_file = git_config_file(repo.directory)
+        entry = {
+            'config_file': config_file,
+            'config_signature': file_signature(config_file),
+            'readme_signature': file_signature(
+                os.path.join(repo.directory, 'README.md')
+            ),
+            'repo': asdict(repo),
+        }
+        parent = os.path.dirname(repo.directory)
+        try:
+            parent_mtime_ns = os.stat(parent).st_mtime_ns
+        except OSError:
+            parent_mtime_ns = 0
+        with self._lock:
+            self._entries[repo.directory] = entry
+            self._repos[repo.directory] = repo
+            self._parents.setdefault(parent, parent_mtime_ns)
+            self._dirty = True
+
+    def _remove(self, directory: str) -> None:
+        with self._lock:
+            if self._entries.pop(directory, None):
+                self._repos.pop(directory, None)
+                self._dirty = True
+
+
+def _as_signature(value: Any) -> Signature:
+    if isinstance(value, (list, tuple)) and len(value) == 3:
+        return int(value[0]), int(value[1]), int(value[2])
+    return None
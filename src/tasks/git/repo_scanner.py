@@ -0,0 +1,88 @@
+import os
+import time
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+from pathlib import Path
+
+# Directories that never contain repositories worth listing
+DEFAULT_EXCLUDES = ('.*', 'node_modules', '__pycache__', 'venv', 'site-packages')
+
+
+@dataclass
+class ScanResult:
+    directories: list[str] = field(default_factory=list)
+    # Pending (directory, depth) pairs; pass it back to resume an unfinished scan
+    cursor: list[tuple[str, int]] = field(default_factory=list)
+
+    @property
+    def complete(self) -> bool:
+        return not self.cursor
+
+
+def scan_repo_directories(
+    base_paths: str | Path | list[str | Path] = (),
+    exclude: list[str] | tuple[str, ...] = DEFAULT_EXCLUDES,
+    max_depth: int = 0,
+    time_budget: float = 0,
+    cursor: list[tuple[str, int]] | None = None,
+) -> ScanResult:
+    """Find repository roots under base_paths without descending into them.
+
+    exclude: glob patterns matched against directory names (or full paths,
+        for patterns containing '/')
+    max_depth: maximum depth below each base path (0 = unlimited)
+    time_budget: seconds to spend before returning a partial result (0 = unlimited)
+    cursor: the cursor of a previous partial result, to continue scanning
+    """
+    if isinstance(base_paths, (str, Path)):
+        base_paths = [base_paths]
+    if cursor is None:
+        cursor = [
+            (os.path.abspath(base_path), 0)
+            for base_path in reversed(base_paths)
+            if str(base_path) and os.path.isdir(base_path)
+        ]
+    stack = list(cursor)
+    result = ScanResult()
+    deadline = time.monotonic() + time_budget if time_budget > 0 else 0
+
+    visited = 0
+    while stack:
+        # Always visit at least one directory, so resuming makes progress
+        if deadline and visited and time.monotonic() > deadline:
+            break
+        visited += 1
+        directory, depth = stack.pop()
+        if _is_repo_root(directory):
+            result.directories.append(directory)
+            continue
+        if max_depth and depth >= max_depth:
+            continue
+        subdirectories = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False) and not _is_excluded(
+                        entry.name, entry.path, exclude
+                    ):
+                        subdirectories.append(entry.path)
+        except OSError:
+            continue
+        # Sorted and reversed so the stack pops directories in name order
+        subdirectories.sort(reverse=True)
+        stack.extend((path, depth + 1) for path in subdirectories)
+
+    result.cursor = stack
+    return result
+
+
+def _is_repo_root(directory: str) -> bool:
+    # `.git` is a directory for clones and a file for worktrees and submodules
+    return os.path.lexists(os.path.join(directory, '.git'))
+
+
+def _is_excluded(name: str, path: str, exclude: list[str] | tuple[str, ...]) -> bool:
+    return any(
+        fnmatchcase(name, pattern) or ('/' in pattern and fnmatchcase(path, pattern))
+        for pattern in exclude
+    )
@@ -0,0 +1,120 @@
+"""Task workspaces as `git worktree`s of one shared bare store per repository.
+
+The store is a bare clone under `<config-path>/stores/<project>/<repository>.git`
+with remote-tracking branches, so every task on a known repository only
+needs a fetch and a checkout, and the objects are stored once.
+"""
+
+import os
+import shutil
+import subprocess
+import time
+from pathlib import Path
+
+from tasks.git.config_reader import UnsupportedGitConfig, resolve_git_dir
+from tasks.git.git_config import GitConfig
+from tasks.service.logging_service import get_logger
+
+STORES_DIRECTORY = 'stores'
+WORKSPACE_MODE_CLONE = 'clone'  # one full clone per task
+WORKSPACE_MODE_WORKTREE = 'worktree'  # one worktree per task over a shared store
+
+
+def store_path(stores_directory: str | Path, remote_url: str) -> Path:
+    project_name, repository_name = GitConfig.get_repo_names(remote_url)
+    if not repository_name:
+        raise ValueError(f'Invalid remote url: {remote_url}')
+    return Path(stores_directory) / (project_name or '_') / f'{repository_name}.git'
+
+
+def is_worktree(directory: str | Path) -> bool:
+    """True when directory is a linked worktree (its git dir is not the
+    common dir)"""
+    try:
+        git_dirs = resolve_git_dir(directory)
+    except (OSError, UnsupportedGitConfig):
+        return False
+    return bool(git_dirs) and git_dirs[0] != git_dirs[1]
+
+
+def ensure_store(store: Path, remote_url: str, reference: str | None = None) -> Path:
+    """Create the bare store of remote_url, or fetch it when it exists"""
+    logger = get_logger(__name__)
+    started_at = time.monotonic()
+    if (store / 'HEAD').exists():
+        _git(['fetch', '--quiet', '--prune', 'origin'], cwd=store)
+    else:
+        store.parent.mkdir(parents=True, exist_ok=True)
+        args = ['clone', '--bare', '--quiet']
+        if reference:
+            args.extend(['--reference-if-able', str(reference), '--dissociate'])
+        _git([*args, remote_url, str(store)], cwd=store.parent)
+        _git(
+            ['config', 'remote.origin.fetch', '+refs/heads/*:refs/remotes/origin/*'],
+            cwd=store,
+        )
+        _git(['fetch', '--quiet', 'origin'], cwd=store)
+        _git(['remote', 'set-head', 'origin', '--auto'], cwd=store)
+    logger.info('Store %s ready in %.2fs', store, time.monotonic() - started_at)
+    return store
+
+
+def task_branch(task_id: str) -> str:
+    """The branch of a task worktree in the store"""
+    return f'task/{task_id}'
+
+
+def add_worktree(store: Path, directory: Path, branch: str) -> Path:
+    """Check out a new worktree of the store at directory, on a new branch
+    started from the remote default branch"""
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    _git(
+        ['worktree', 'add', '--quiet', '-B', branch, str(directory), 'origin/HEAD'],
+        cwd=store,
+    )
+    return directory
+
+
+def repair_worktree(directory: str | Path) -> None:
+    """Update the store after a worktree directory was moved"""
+    _git(['worktree', 'repair'], cwd=directory)
+
+
+def bundle_worktree(directory: str | Path, bundle_file: str | Path) -> Path:
+    """Write the HEAD and branch of a worktree to a git bundle, which
+    `git clone` restores without the store"""
+    refs = ['HEAD']
+    if branch := _git(['branch', '--show-current'], cwd=directory).strip():
+        refs.append(f'refs/heads/{branch}')
+    bundle_file = Path(bundle_file).absolute()
+    _git(['bundle', 'create', '--quiet', str(bundle_file), *refs], cwd=directory)
+    return bundle_file
+
+
+def remove_worktree(directory: str | Path, branch: str | None = None) -> None:
+    """Delete a worktree directory and its administrative files in the store,
+    and its branch (e.g. the task branch) when given"""
+    git_dirs = resolve_git_dir(directory)
+    shutil.rmtree(directory)
+    if not git_dirs:
+        return
+    _git(['worktree', 'prune'], cwd=git_dirs[1])
+    if branch:
+        try:
+            _git(['branch', '--quiet', '-D', branch], cwd=git_dirs[1])
+        except RuntimeError as e:
+            get_logger(__name__).warning('Failed to delete branch %s: %s', branch, e)
+
+
+def _git(args: list[str], cwd: str | Path) -> str:
+    res = subprocess.run(
+        ['git', *args],
+        check=False,
+        env=os.environ,
+        capture_output=True,
+        cwd=str(cwd),
+    )
+    if res.returncode != 0:
+        output = (res.stderr + res.stdout).decode('utf-8', errors='replace')
+        raise RuntimeError(f'Command: git {" ".join(args)}\nOutput: {output}')
+    return res.stdout.decode('utf-8', errors='replace')
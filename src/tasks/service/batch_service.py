@@ -0,0 +1,170 @@
+"""Batch task creation from a CSV or YAML manifest.
+
+CSV manifests have a header with the `task_id`, `repository` (or
+`remote_url`) and `description` columns; YAML manifests are a list of
+mappings with the same keys, or a mapping with that list under `tasks`.
+
+Rows run in parallel, at most `concurrency` at a time. The result of each
+row is kept in `<manifest>.state.json`, so a rerun skips the rows that were
+already created.
+"""
+
+import csv
+import json
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+import yaml
+
+from tasks.config.config import Config
+from tasks.service.logging_service import get_logger
+from tasks.service.task_service import new_task
+
+BATCH_STATUS_CREATED = 'created'
+BATCH_STATUS_SKIPPED = 'skipped'
+BATCH_STATUS_FAILED = 'failed'
+
+
+@dataclass
+class BatchRow:
+    task_id: str
+    remote_url: str
+    description: str = ''
+
+
+@dataclass
+class BatchResult:
+    row: BatchRow
+    status: str
+    task_id: str = ''  # id of the created task
+    elapsed: float = 0  # seconds
+    error: str = ''
+
+
+def read_batch_manifest(manifest_file: str | Path) -> list[BatchRow]:
+    manifest_file = Path(manifest_file)
+    with manifest_file.open('r', encoding='utf-8') as f:
+        if manifest_file.suffix.lower() == '.csv':
+            items: Any = list(csv.DictReader(f))
+        else:
+            try:
+                items = yaml.safe_load(f) or []
+            except yaml.YAMLError as e:
+                raise ValueError(f'Invalid batch manifest: {manifest_file}: {e}')
+    if isinstance(items, dict):
+        items = items.get('tasks') or []
+    if not isinstance(items, list):
+        raise ValueError(f'Invalid batch manifest: {manifest_file}')
+
+    rows = []
+    for index, item in enumerate(items, 1):
+        if not isinstance(item, dict):
+            raise ValueError(f'Invalid row {index} of {manifest_file}')
+        task_id = str(item.get('task_id') or '').strip()
+        remote_url = str(item.get('repository') or item.get('remote_url') or '').strip()
+        if not task_id or not remote_url:
+            raise ValueError(
+                f'Row {index} of {manifest_file} needs a task_id and a repository'
+            )
+        rows.append(BatchRow(task_id, remote_url, str(item.get('description') or '')))
+    return rows
+
+
+def batch_state_file(manifest_file: str | Path) -> Path:
+    manifest_file = Path(manifest_file)
+    return manifest_file.with_name(f'{manifest_file.name}.state.json')
+
+
+def run_batch(
+    config: Config,
+    manifest_file: str | Path,
+    concurrency: int = 4,
+    on_result: Callable[[BatchResult], None] | None = None,
+) -> list[BatchResult]:
+    """Create the tasks of a manifest, in manifest order in the results.
+    on_result is called as each row finishes"""
+    rows = read_batch_manifest(manifest_file)
+    state_file = batch_state_file(manifest_file)
+    state = _load_state(state_file)
+    state_lock = threading.Lock()
+    logger = get_logger(__name__)
+
+    # the state key of each row, numbered when a row is repeated
+    keys: list[str] = []
+    seen: Counter[str] = Counter()
+    for row in rows:
+        key = f'{row.task_id} {row.remote_url}'
+        seen[key] += 1
+        keys.append(key if seen[key] == 1 else f'{key} #{seen[key]}')
+
+    def run(index: int) -> BatchResult:
+        row, key = rows[index], keys[index]
+        if (done := state.get(key)) and done.get('status') == BATCH_STATUS_CREATED:
+            result = BatchResult(row, BATCH_STATUS_SKIPPED, done.get('task_id', ''))
+        else:
+            started_at = time.monotonic()
+            try:
+                task, message = new_task(
+                    config, row.task_id, row.remote_url, row.description
+                )
+            except Exception as e:
+                task, message = None, f'* Error: {e}'
+            elapsed = time.monotonic() - started_at
+            if task:
+                result = BatchResult(row, BATCH_STATUS_CREATED, task.id, elapsed)
+            else:
+                result = BatchResult(
+                    row, BATCH_STATUS_FAILED, elapsed=elapsed, error=_error(message)
+                )
+            with state_lock:
+                state[key] = {
+                    key: value for key, value in asdict(result).items() if key != 'row'
+                }
+                _save_state(state_file, state)
+        logger.info(
+            'Batch row %s %s: %s %s %.2fs %s',
+            row.task_id,
+            row.remote_url,
+            result.status,
+            result.task_id,
+            result.elapsed,
+            result.error,
+        )
+        if on_result:
+            on_result(result)
+        return result
+
+    with ThreadPoolExecutor(
+        max_workers=max(1, concurrency), thread_name_prefix='batch'
+    ) as executor:
+        return list(executor.map(run, range(len(rows))))
+
+
+def _error(message: str) -> str:
+    errors = [line for line in message.splitlines() if 'Error' in line]
+    return (errors[-1] if errors else message).strip('* ').strip()
+
+
+def _load_state(state_file: Path) -> dict[str, dict[str, Any]]:
+    try:
+        with state_file.open('r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _save_state(state_file: Path, state: dict[str, dict[str, Any]]) -> None:
+    tmp_file = state_file.with_suffix('.tmp')
+    try:
+        with tmp_file.open('w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_file, state_file)
+    except OSError as e:
+        get_logger(__name__).warning('Failed to save batch state: %s', e)
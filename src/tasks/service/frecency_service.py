@@ -0,0 +1,99 @@
+"""Frecency of the repositories the tasks are created for.
+
+Each task creation adds 1 to the score of its remote URL, and the scores
+decay by half every FRECENCY_HALF_LIFE, so the repositories used often and
+lately come first in the New Task picker. The scores are kept in
+`<config-path>/repo_frecency.json` with the time they were last updated.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from tasks.service.logging_service import get_logger
+
+FRECENCY_FILE = 'repo_frecency.json'
+FRECENCY_HALF_LIFE = 14 * 24 * 60 * 60  # seconds
+
+
+class RepoFrecency:
+    """remote url -> frecency score"""
+
+    def __init__(self, frecency_file: str | Path) -> None:
+        self.frecency_file = Path(frecency_file)
+        self._lock = threading.Lock()
+
+    def record(self, remote_url: str, now: float | None = None) -> None:
+        """Count a task created for remote_url"""
+        now = time.time() if now is None else now
+        with self._lock:
+            scores = self._load()
+            score, updated_at = scores.get(remote_url, (0.0, now))
+            scores[remote_url] = (_decay(score, now - updated_at) + 1, now)
+            self._save(scores)
+
+    def scores(self, now: float | None = None) -> dict[str, float]:
+        """The scores of the remote urls, decayed to now"""
+        now = time.time() if now is None else now
+        with self._lock:
+            scores = self._load()
+        return {
+            remote_url: _decay(score, now - updated_at)
+            for remote_url, (score, updated_at) in scores.items()
+        }
+
+    def _load(self) -> dict[str, tuple[float, float]]:
+        try:
+            with self.frecency_file.open('r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        scores = {}
+        for remote_url, entry in data.items():
+            try:
+                scores[str(remote_url)] = (
+                    float(entry['score']),
+                    float(entry['updated_at']),
+                )
+            except (KeyError, TypeError, ValueError):
+                continue
+        return scores
+
+    def _save(self, scores: dict[str, tuple[float, float]]) -> None:
+        tmp_file = self.frecency_file.with_suffix('.tmp')
+        try:
+            self.frecency_file.parent.mkdir(parents=True, exist_ok=True)
+            with tmp_file.open('w', encoding='utf-8') as f:
+                json.dump(
+                    {
+                        remote_url: {'score': score, 'updated_at': updated_at}
+                        for remote_url, (score, updated_at) in scores.items()
+                    },
+                    f,
+                    indent=2,
+                    sort_keys=True,
+                )
+            os.replace(tmp_file, self.frecency_file)
+        except OSError as e:
+            get_logger(__name__).warning('Failed to save repository frecency: %s', e)
+
+
+def _decay(score: float, elapsed: float) -> float:
+    return score * 0.5 ** (max(0.0, elapsed) / FRECENCY_HALF_LIFE)
+
+
+_frecencies: dict[str, RepoFrecency] = {}
+_frecencies_lock = threading.Lock()
+
+
+def get_repo_frecency(config_path: str | Path) -> RepoFrecency:
+    """The repository frecency of a configuration directory"""
+    frecency_file = str(Path(config_path) / FRECENCY_FILE)
+    with _frecencies_lock:
+        if frecency_file not in _frecencies:
+            _frecencies[frecency_file] = RepoFrecency(frecency_file)
+        return _frecencies[frecency_file]
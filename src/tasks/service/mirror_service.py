@@ -0,0 +1,316 @@
+"""Local mirror cache: `git clone --mirror` copies of the known repositories
+under `<config-path>/mirrors`, refreshed in background, so new task clones
+are copied from disk and only `origin` points to the network.
+
+Each mirror records when and how often it was used to create a task; when
+the mirrors take more than the disk budget the least recently used ones are
+removed, except those a task is being cloned from.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Iterator
+
+from tasks.git.git_config import GitConfig
+from tasks.service.logging_service import get_logger
+
+MIRRORS_DIRECTORY = 'mirrors'
+MIRRORS_STATE_FILE = 'mirrors.json'
+
+
+@dataclass
+class MirrorEntry:
+    remote_url: str
+    path: str
+    size: int = 0  # bytes
+    uses: int = 0  # tasks created from the mirror
+    last_used: float = 0  # epoch seconds
+    fetched_at: float = 0  # epoch seconds
+
+
+class MirrorCache:
+    """remote url -> mirror, with the state stored in `mirrors.json`"""
+
+    def __init__(self, directory: str | Path, budget: int) -> None:
+        self.directory = Path(directory)
+        self.budget = budget  # bytes, 0 = unlimited
+        self._entries: dict[str, MirrorEntry] = {}
+        self._skipped: set[str] = set()  # evicted before being used
+        self._in_use: dict[str, int] = {}  # remote url -> clones from the mirror
+        self._lock = threading.RLock()
+        self._url_locks: dict[str, threading.Lock] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def state_file(self) -> Path:
+        return self.directory / MIRRORS_STATE_FILE
+
+    def load(self) -> 'MirrorCache':
+        try:
+            with self.state_file.open('r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self
+        if isinstance(data, list):
+            # before the skipped mirrors were saved
+            data = {'mirrors': data}
+        if not isinstance(data, dict):
+            return self
+        with self._lock:
+            skipped = data.get('skipped', [])
+            if isinstance(skipped, list):
+                self._skipped.update(str(remote_url) for remote_url in skipped)
+            for item in data.get('mirrors', []):
+                try:
+                    entry = MirrorEntry(**item)
+                except TypeError:
+                    continue
+                if (Path(entry.path) / 'HEAD').exists():
+                    self._entries[entry.remote_url] = entry
+        return self
+
+    def save(self) -> None:
+        with self._lock:
+            data = {
+                'mirrors': [asdict(entry) for entry in self._entries.values()],
+                'skipped': sorted(self._skipped),
+            }
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.state_file.with_suffix('.tmp')
+            with tmp_file.open('w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_file, self.state_file)
+        except OSError as e:
+            get_logger(__name__).warning('Failed to save mirror state: %s', e)
+
+    @property
+    def entries(self) -> list[MirrorEntry]:
+        with self._lock:
+            return list(self._entries.values())
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            return sum(entry.size for entry in self._entries.values())
+
+    def mirror_path(self, remote_url: str) -> Path:
+        project_name, repository_name = GitConfig.get_repo_names(remote_url)
+        if not repository_name:
+            raise ValueError(f'Invalid remote url: {remote_url}')
+        return self.directory / (project_name or '_') / f'{repository_name}.git'
+
+    def find(self, remote_url: str) -> Path | None:
+        """The mirror of remote_url, without counting it as used"""
+        with self._lock:
+            entry = self._entries.get(remote_url)
+        return Path(entry.path) if entry else None
+
+    def use(self, remote_url: str) -> Path | None:
+        """The mirror of remote_url to clone a task from, or None when there is
+        none yet. Counts as a use for the eviction order"""
+        with self._lock:
+            self._skipped.discard(remote_url)
+            entry = self._entries.get(remote_url)
+            if entry is None:
+                return None
+            entry.uses += 1
+            entry.last_used = time.time()
+        self.save()
+        return Path(entry.path)
+
+    @contextmanager
+    def borrow(self, remote_url: str) -> Iterator[Path | None]:
+        """use() the mirror of remote_url, which is not evicted until the
+        block exits, e.g. while a task is cloned from it"""
+        with self._lock:
+            # counted before use() looks the mirror up, so that evict() cannot
+            # remove it in between
+            self._in_use[remote_url] = self._in_use.get(remote_url, 0) + 1
+        try:
+            yield self.use(remote_url)
+        finally:
+            with self._lock:
+                if count := self._in_use.pop(remote_url) - 1:
+                    self._in_use[remote_url] = count
+
+    def update(self, remote_url: str, used: bool = False) -> MirrorEntry:
+        """Create the mirror of remote_url, or fetch it when it exists, then
+        evict mirrors over the budget. used counts it as used by a task"""
+        with self._lock:
+            url_lock = self._url_locks.setdefault(remote_url, threading.Lock())
+        with url_lock:
+            entry = self._update(remote_url)
+        if used:
+            with self._lock:
+                entry.uses += 1
+                entry.last_used = time.time()
+        self.evict()
+        self.save()
+        return entry
+
+    def _update(self, remote_url: str) -> MirrorEntry:
+        logger = get_logger(__name__)
+        started_at = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(remote_url)
+        if entry is not None and (Path(entry.path) / 'HEAD').exists():
+            _git(['remote', 'update', '--prune'], cwd=entry.path)
+        else:
+            path = self.mirror_path(remote_url)
+            if path.exists():
+                shutil.rmtree(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _git(['clone', '--mirror', '--quiet', remote_url, str(path)], path.parent)
+            entry = MirrorEntry(remote_url=remote_url, path=str(path))
+        entry.size = _directory_size(entry.path)
+        entry.fetched_at = time.time()
+        with self._lock:
+            self._entries[remote_url] = entry
+        logger.info(
+            'Mirror %s updated in %.2fs (%d bytes)',
+            remote_url,
+            time.monotonic() - started_at,
+            entry.size,
+        )
+        return entry
+
+    def evict(self) -> list[MirrorEntry]:
+        """Remove the least recently used mirrors until they fit the budget,
+        keeping the borrowed ones"""
+        evicted = []
+        if not self.budget:
+            return evicted
+        with self._lock:
+            entries = sorted(
+                self._entries.values(), key=lambda e: (e.last_used, e.uses)
+            )
+            total = sum(entry.size for entry in entries)
+            for entry in entries:
+                if total <= self.budget:
+                    break
+                if entry.remote_url in self._in_use:
+                    continue
+                del self._entries[entry.remote_url]
+                if not entry.uses:
+                    self._skipped.add(entry.remote_url)
+                total -= entry.size
+                evicted.append(entry)
+        for entry in evicted:
+            shutil.rmtree(entry.path, ignore_errors=True)
+            get_logger(__name__).info(
+                'Mirror %s evicted (%d bytes)', entry.remote_url, entry.size
+            )
+        return evicted
+
+    def schedule(self, remote_url: str) -> threading.Thread:
+        """Create or fetch the mirror of remote_url in a background thread,
+        for a task that could not use it yet"""
+
+        def update() -> None:
+            try:
+                self.update(remote_url, used=True)
+            except Exception as e:
+                get_logger(__name__).warning(
+                    'Failed to update mirror of %s: %s', remote_url, e
+                )
+
+        thread = threading.Thread(target=update, name='mirror-update', daemon=True)
+        thread.start()
+        return thread
+
+    def refresh(self, remote_urls: list[str]) -> None:
+        """Fetch the existing mirrors and create the missing ones, the most
+        used repositories first. Mirrors evicted before being used are not
+        created again until a task uses them"""
+        logger = get_logger(__name__)
+        with self._lock:
+            known = dict(self._entries)
+            skipped = set(self._skipped)
+
+        def order(remote_url: str) -> tuple[int, float]:
+            entry = known.get(remote_url)
+            return (-entry.uses, -entry.last_used) if entry else (0, 0)
+
+        for remote_url in sorted(set(remote_urls), key=order):
+            if self._stop.is_set():
+                return
+            if not remote_url or remote_url in skipped:
+                continue
+            try:
+                self.update(remote_url)
+            except Exception as e:
+                logger.warning('Failed to update mirror of %s: %s', remote_url, e)
+
+    def start(
+        self, remote_urls: Callable[[], list[str]], interval: float
+    ) -> threading.Thread:
+        """Refresh the mirrors of remote_urls() every interval seconds in a
+        background thread"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return self._thread
+            self._stop.clear()
+
+            def run() -> None:
+                while not self._stop.is_set():
+                    self.refresh(remote_urls())
+                    self._stop.wait(interval)
+
+            self._thread = threading.Thread(
+                target=run, name='mirror-refresh', daemon=True
+            )
+            self._thread.start()
+            return self._thread
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+_caches: dict[str, MirrorCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_mirror_cache(config_path: str | Path, budget: int = 0) -> MirrorCache:
+    """The mirror cache of a configuration directory"""
+    directory = str(Path(config_path) / MIRRORS_DIRECTORY)
+    with _caches_lock:
+        cache = _caches.get(directory)
+        if cache is None:
+            cache = MirrorCache(directory, budget).load()
+            _caches[directory] = cache
+        cache.budget = budget
+        return cache
+
+
+def _directory_size(directory: str | Path) -> int:
+    size = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            try:
+                size += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return size
+
+
+def _git(args: list[str], cwd: str | Path) -> str:
+    res = subprocess.run(
+        ['git', *args],
+        check=False,
+        env=os.environ,
+        capture_output=True,
+        cwd=str(cwd),
+    )
+    if res.returncode != 0:
+        output = (res.stderr + res.stdout).decode('utf-8', errors='replace')
+        raise RuntimeError(f'Command: git {" ".join(args)}\nOutput: {output}')
+    return res.stdout.decode('utf-8', errors='replace')
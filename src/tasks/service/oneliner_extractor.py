@@ -0,0 +1,150 @@
+"""Offline extractive oneliner: picks the most representative sentence of a
+markdown task description, without calling any external tool.
+
+Headings, code blocks, links, URLs and form-like boilerplate are dropped,
+the remaining text is split into sentences, and each sentence is scored by
+how frequent its content words are in the whole description (stopwords of
+the detected language, English or Portuguese, are ignored), with a bonus
+for earlier sentences and a penalty for very short or very long ones.
+"""
+
+import re
+from collections import Counter
+
+MAX_ONELINER_LENGTH = 120
+
+STOPWORDS = {
+    'en': frozenset(
+        'a an and are as at be been but by can do does for from has have how i if in '
+        'into is it its of on or our should so that the their them then there these '
+        'this to was we were what when which while who will with would you your '
+        'not no all any also must may need needs using use'.split()
+    ),
+    'pt': frozenset(
+        'a ao aos as até com como da das de dele deles do dos e ela elas ele eles em '
+        'entre era essa esse esta este eu foi for isso isto já mais mas me mesmo na '
+        'nas nem no nos o os ou para pela pelas pelo pelos por qual quando que se '
+        'sem ser seu sua são também tem um uma umas uns não deve devem precisa'.split()
+    ),
+}
+
+BOILERPLATE = frozenset(
+    [
+        'description',
+        'summary',
+        'acceptance criteria',
+        'steps to reproduce',
+        'expected behavior',
+        'actual behavior',
+        'notes',
+        'todo',
+        'n/a',
+        'descrição',
+        'resumo',
+        'critérios de aceite',
+        'critérios de aceitação',
+        'passos para reproduzir',
+        'comportamento esperado',
+        'observações',
+    ]
+)
+
+_CODE_BLOCK = re.compile(r'^(```|~~~).*?^\1', re.MULTILINE | re.DOTALL)
+_HTML = re.compile(r'<!--.*?-->|<[^>\n]+>', re.DOTALL)
+_IMAGE = re.compile(r'!\[[^\]]*\]\([^)]*\)')
+_LINK = re.compile(r'\[([^\]]*)\]\([^)]*\)')
+_URL = re.compile(r'\b(?:https?|ftp)://\S+|\bwww\.\S+')
+_LIST_MARKER = re.compile(r'^\s*(?:[-*+>]|\d+[.)]|\[[ xX]\])\s+')
+_EMPHASIS = re.compile(r'[*_`~]+')
+_SENTENCE_END = re.compile(r'(?<=[.!?;])\s+')
+_WORD = re.compile(r'[^\W\d_]+(?:-[^\W\d_]+)*')
+
+
+def extract_oneliner(description: str) -> str:
+    """The best sentence of a markdown description, at most
+    MAX_ONELINER_LENGTH characters"""
+    sentences, heading = _sentences(description)
+    if not sentences:
+        return _shorten(heading or ''.join(description.strip().splitlines()[:1]))
+
+    words = [_words(sentence) for sentence in sentences]
+    stopwords = STOPWORDS[detect_language([w for ws in words for w in ws])]
+    frequencies = Counter(w for ws in words for w in ws if w not in stopwords)
+
+    def score(index: int) -> float:
+        content = [w for w in words[index] if w not in stopwords]
+        if not content:
+            return 0.0
+        relevance = sum(frequencies[w] for w in content) / len(content)
+        position = 1 / (1 + index)
+        length = len(words[index])
+        fit = 1.0 if 5 <= length <= 25 else 0.5
+        return (relevance + position) * fit
+
+    best = max(range(len(sentences)), key=lambda index: (score(index), -index))
+    return _shorten(sentences[best])
+
+
+def detect_language(words: list[str]) -> str:
+    """'en' or 'pt', by the number of stopwords of each language"""
+    counts = {
+        language: sum(1 for word in words if word in stopwords)
+        for language, stopwords in STOPWORDS.items()
+    }
+    return max(counts, key=lambda language: (counts[language], language == 'en'))
+
+
+def _sentences(description: str) -> tuple[list[str], str]:
+    """Clean sentences of the description and its first heading"""
+    text = _CODE_BLOCK.sub('\n', description)
+    text = _HTML.sub(' ', text)
+    text = _IMAGE.sub(' ', text)
+    text = _LINK.sub(r'\1', text)
+    text = _URL.sub(' ', text)
+
+    heading = ''
+    paragraphs: list[list[str]] = [[]]
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith('#'):
+            heading = heading or _clean(stripped.lstrip('#'))
+            paragraphs.append([])
+            continue
+        stripped = _clean(_LIST_MARKER.sub('', stripped))
+        if not stripped or _is_boilerplate(stripped):
+            paragraphs.append([])
+            continue
+        paragraphs[-1].append(stripped)
+
+    sentences = []
+    for paragraph in paragraphs:
+        for sentence in _SENTENCE_END.split(' '.join(paragraph)):
+            sentence = sentence.strip(' :-|')
+            if _words(sentence):
+                sentences.append(sentence)
+    return sentences, heading
+
+
+def _clean(text: str) -> str:
+    return ' '.join(_EMPHASIS.sub('', text).split())
+
+
+def _is_boilerplate(line: str) -> bool:
+    label = line.lower().rstrip(':').strip()
+    if label in BOILERPLATE:
+        return True
+    # form labels and key: value lines (Ticket: ABC-123, Sprint: 42)
+    key, _, value = line.partition(':')
+    return bool(value) and len(key.split()) <= 2 and len(_words(value)) <= 2
+
+
+def _words(text: str) -> list[str]:
+    return [word.lower() for word in _WORD.findall(text)]
+
+
+def _shorten(text: str) -> str:
+    text = text.strip()
+    if len(text) <= MAX_ONELINER_LENGTH:
+        return text
+    cut = text[: MAX_ONELINER_LENGTH - 1].rsplit(' ', 1)[0]
+    return cut.rstrip(' ,;:') + '…'
@@ -0,0 +1,346 @@
+"""Task oneliners: generation with the `agent` CLI, a persistent cache keyed
+by the hash of the description, and a background queue that keeps the
+generation off the task loading path.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+from tasks.service.logging_service import get_logger
+from tasks.service.oneliner_extractor import extract_oneliner
+from tasks.task.manifest import write_manifest
+from tasks.task.task import Task
+
+ONELINER_CACHE_FILE = 'oneliners.json'
+ONELINER_FILE = 'oneliner.txt'
+ONELINER_BATCH_SIZE = 20  # descriptions per agent call
+ONELINER_ENGINE_LOCAL = 'local'  # offline extractive summary
+ONELINER_ENGINE_AGENT = 'agent'  # Cursor agent CLI
+ONELINER_ENGINES = (ONELINER_ENGINE_LOCAL, ONELINER_ENGINE_AGENT)
+
+
+def description_hash(description: str) -> str:
+    return hashlib.sha256(description.strip().encode('utf-8')).hexdigest()
+
+
+def fallback_oneliner(description: str) -> str:
+    """First line of the description, shown until the oneliner is generated"""
+    return ''.join(description.strip().splitlines()[:1])
+
+
+def generate_oneliner(
+    description: str, api_key: str, engine: str = ONELINER_ENGINE_LOCAL
+) -> str:
+    """Oneliner of a description with the chosen engine"""
+    if engine == ONELINER_ENGINE_AGENT:
+        return get_task_oneliner(description, api_key)
+    return extract_oneliner(description)
+
+
+def write_oneliner_file(directory: str | Path, oneliner: str) -> None:
+    oneliner_file = Path(directory) / 'TASK' / ONELINER_FILE
+    oneliner_file.parent.mkdir(parents=True, exist_ok=True)
+    oneliner_file.write_text(oneliner.strip())
+
+
+class OnelinerCache:
+    """description hash -> oneliner, stored next to `.tasks.yaml`"""
+
+    def __init__(self, cache_file: str | Path) -> None:
+        self.cache_file = Path(cache_file)
+        self._oneliners: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def load(self) -> 'OnelinerCache':
+        try:
+            with self.cache_file.open('r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self
+        if isinstance(data, dict):
+            with self._lock:
+                self._oneliners = {str(k): str(v) for k, v in data.items()}
+        return self
+
+    def save(self) -> None:
+        with self._lock:
+            data = dict(self._oneliners)
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_file.with_suffix('.tmp')
+            with tmp_file.open('w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_file, self.cache_file)
+        except OSError as e:
+            get_logger(__name__).warning('Failed to save oneliner cache: %s', e)
+
+    def get(self, description: str) -> str | None:
+        with self._lock:
+            return self._oneliners.get(description_hash(description))
+
+    def put(self, description: str, oneliner: str) -> None:
+        with self._lock:
+            self._oneliners[description_hash(description)] = oneliner
+
+
+class OnelinerQueue:
+    """Generates oneliners in background threads, in batches of up to
+    ONELINER_BATCH_SIZE descriptions per agent call and at most `concurrency`
+    calls at a time. Tasks with the same description share a generation"""
+
+    def __init__(self, cache: OnelinerCache, api_key: str, concurrency: int = 2):
+        self.cache = cache
+        self.api_key = api_key
+        self.concurrency = max(1, concurrency)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix='oneliner'
+        )
+        # description hash -> (description, tasks waiting for it)
+        self._pending: dict[
+            str, tuple[str, list[tuple[Task, Callable[[Task], None] | None]]]
+        ] = {}
+        self._queued: list[str] = []
+        self._lock = threading.Lock()
+        self._running = 0
+        self._idle = threading.Event()
+        self._idle.set()
+
+    def request(
+        self,
+        task: Task,
+        description: str,
+        on_done: Callable[[Task], None] | None = None,
+    ) -> str:
+        """The cached oneliner of description, or its first line while the
+        oneliner is generated; on_done is called with the task once
+        task.oneliner, TASK/oneliner.txt and the manifest are updated"""
+        if (oneliner := self.cache.get(description)) is not None:
+            write_oneliner_file(task.directory, oneliner)
+            return oneliner
+        key = description_hash(description)
+        with self._lock:
+            if key in self._pending:
+                self._pending[key][1].append((task, on_done))
+            else:
+                self._pending[key] = (description, [(task, on_done)])
+                self._queued.append(key)
+                if self._running < self.concurrency:
+                    self._running += 1
+                    self._idle.clear()
+                    self._executor.submit(self._drain)
+        return fallback_oneliner(description)
+
+    def join(self, timeout: float | None = None) -> bool:
+        """Wait until the queue is empty"""
+        return self._idle.wait(timeout)
+
+    def _drain(self) -> None:
+        while True:
+            with self._lock:
+                batch = self._queued[:ONELINER_BATCH_SIZE]
+                del self._queued[:ONELINER_BATCH_SIZE]
+                if not batch:
+                    self._running -= 1
+                    if not self._running:
+                        self._idle.set()
+                    return
+                descriptions = [self._pending[key][0] for key in batch]
+            self._update_tasks(batch, descriptions)
+
+    def _update_tasks(self, keys: list[str], descriptions: list[str]) -> None:
+        logger = get_logger(__name__)
+        try:
+            oneliners = get_task_oneliners(descriptions, self.api_key)
+        except Exception as e:
+            logger.warning('oneliner: generation failed: %s', e)
+            oneliners = None
+        if oneliners is not None:
+            for description, oneliner in zip(descriptions, oneliners):
+                self.cache.put(description, oneliner)
+            self.cache.save()
+        for index, key in enumerate(keys):
+            with self._lock:
+                _, waiting = self._pending.pop(key, ('', []))
+            if oneliners is None:
+                continue
+            for task, on_done in waiting:
+                try:
+                    task.oneliner = oneliners[index]
+                    write_oneliner_file(task.directory, task.oneliner)
+                    write_manifest(task)
+                    if on_done:
+                        on_done(task)
+                except Exception as e:
+                    logger.warning('oneliner: failed to update %s: %s', task.id, e)
+
+
+_queues: dict[str, OnelinerQueue] = {}
+_queues_lock = threading.Lock()
+
+
+def get_oneliner_queue(
+    config_path: str | Path, api_key: str, concurrency: int = 2
+) -> OnelinerQueue:
+    """The oneliner queue of a configuration directory"""
+    cache_file = str(Path(config_path) / ONELINER_CACHE_FILE)
+    with _queues_lock:
+        queue = _queues.get(cache_file)
+        if queue is None:
+            queue = OnelinerQueue(
+                OnelinerCache(cache_file).load(), api_key, concurrency
+            )
+            _queues[cache_file] = queue
+        queue.api_key = api_key
+        return queue
+
+
+def get_task_oneliner(description: str, api_key: str) -> str:
+    logger = get_logger(__name__)
+    if not description:
+        logger.warning('oneliner: no description')
+        return ''
+    if description.count('\n') == 0:
+        logger.warning('oneliner: using description as is')
+        return description.strip()
+    default_oneliner = ''.join(description.splitlines()[:1])
+    if (
+        not shutil.which('agent') or not api_key
+    ):  # Use cursor agent to generate the oneliner
+        logger.warning('oneliner: no agent found. using default oneliner')
+        return default_oneliner
+
+    with tempfile.TemporaryDirectory(dir='.') as tmp_dir:
+        task_file = Path(tmp_dir) / 'task.md'
+        task_file.write_text(description)
+        prompt = (
+            f'create just a one line description from the content of @{task_file.as_posix()}. '
+            'Output only the one line description, no other text. '
+            'Use the same language as the description.'
+        )
+
+        result = subprocess.run(
+            args=[
+                'agent',
+                '--output-format',
+                'json',
+                '--print',
+                '--trust',
+                '--api-key',
+                api_key,
+                prompt,
+            ],
+            capture_output=True,
+            text=True,
+        )
+
+        if result.returncode != 0:
+            logger.warning(
+                'oneliner: failed to get oneliner: %s',
+                result.stderr,
+            )
+            return default_oneliner
+
+        json_result = json.loads(result.stdout)
+        if (
+            json_result['type'] == 'result'
+            and json_result['subtype'] == 'success'
+            and not json_result['is_error']
+        ):
+            logger.info('oneliner: got oneliner: %s', json_result['result'])
+            return json_result['result']
+
+        logger.warning('oneliner: failed to get oneliner: %s', result.stdout)
+        return default_oneliner
+
+    # args = ['agent', 'generate', description]
+
+    # agent "create a one line description from the content of @TASK/125364-0.md" --output-format json --print
+
+    # {"type":"result","subtype":"success","is_error":false,"duration_ms":7172,"duration_api_ms":7172,"result":"Implement E2E tests for Company endpoints covering listing with filters/pagination, ID lookup, cache behavior, and context.","session_id":"198eb041-fdd9-401c-8646-961bd30e5e4f","request_id":"21e30550-9306-4a91-a529-9287a6245221"}
+
+
+def get_task_oneliners(descriptions: list[str], api_key: str) -> list[str]:
+    """Oneliners of many descriptions with a single agent call. Items the
+    agent does not answer (or answers badly) get the first line fallback"""
+    logger = get_logger(__name__)
+    oneliners = [
+        description.strip() if description.count('\n') == 0 else None
+        for description in descriptions
+    ]
+    indexes = [index for index, oneliner in enumerate(oneliners) if oneliner is None]
+    if len(indexes) == 1:
+        oneliners[indexes[0]] = get_task_oneliner(descriptions[indexes[0]], api_key)
+        indexes = []
+    if indexes and shutil.which('agent') and api_key:
+        results = _run_batch_agent([descriptions[index] for index in indexes], api_key)
+        for index, result in zip(indexes, results):
+            oneliners[index] = result
+    elif indexes:
+        logger.warning('oneliner: no agent found. using default oneliners')
+    return [
+        oneliner if oneliner else ''.join(description.splitlines()[:1])
+        for description, oneliner in zip(descriptions, oneliners)
+    ]
+
+
+def _run_batch_agent(descriptions: list[str], api_key: str) -> list[str | None]:
+    logger = get_logger(__name__)
+    with tempfile.TemporaryDirectory(dir='.') as tmp_dir:
+        task_files = []
+        for index, description in enumerate(descriptions, 1):
+            task_file = Path(tmp_dir) / f'task-{index}.md'
+            task_file.write_text(description)
+            task_files.append(f'@{task_file.as_posix()}')
+        prompt = (
+            f'create just a one line description from the content of each of these '
+            f'{len(task_files)} files, in this order: {" ".join(task_files)}. '
+            'Output only a JSON array with one string per file, no other text. '
+            'Use the same language as each description.'
+        )
+        result = subprocess.run(
+            args=[
+                'agent',
+                '--output-format',
+                'json',
+                '--print',
+                '--trust',
+                '--api-key',
+                api_key,
+                prompt,
+            ],
+            capture_output=True,
+            text=True,
+        )
+    if result.returncode != 0:
+        logger.warning('oneliner: failed to get oneliners: %s', result.stderr)
+        return [None] * len(descriptions)
+    try:
+        json_result = json.loads(result.stdout)
+        if (
+            json_result['type'] != 'result'
+            or json_result['subtype'] != 'success'
+            or json_result['is_error']
+        ):
+            raise ValueError('agent did not succeed')
+        text = json_result['result']
+        items = json.loads(text[text.index('[') : text.rindex(']') + 1])
+    except (ValueError, KeyError, TypeError) as e:
+        logger.warning('oneliner: failed to parse oneliners: %s - %s', e, result.stdout)
+        return [None] * len(descriptions)
+    if not isinstance(items, list):
+        return [None] * len(descriptions)
+    logger.info(
+        'oneliner: got %d oneliners for %d descriptions', len(items), len(descriptions)
+    )
+    return [
+        item.strip() if isinstance(item, str) and item.strip() else None
+        for item in (items + [None] * len(descriptions))[: len(descriptions)]
+    ]
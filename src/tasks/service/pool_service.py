@@ -0,0 +1,199 @@
+"""Spare workspace pool: clean, up-to-date clones of the frequently used
+repositories kept under `<tasks-directory>/.pool`, so a new task only renames
+one into `in_progress` instead of cloning.
+
+A spare is cloned into a temporary directory and renamed into the pool when
+it is complete, so only finished clones can be claimed, and a claim is a
+single rename, so two claims never get the same spare.
+"""
+
+import os
+import shutil
+import subprocess
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from tasks.git.git_config import GitConfig
+from tasks.service.logging_service import get_logger
+
+POOL_DIRECTORY = '.pool'
+_PARTIAL_PREFIX = '.partial-'
+
+
+@dataclass
+class PoolState:
+    remote_url: str
+    directory: Path
+    spares: int
+    size: int  # spares to keep
+    filling: bool
+    refilled_at: float = 0  # epoch seconds, 0 = never
+
+
+class WorkspacePool:
+    """remote url -> spare clones under pool_directory/<project>/<repository>"""
+
+    def __init__(self, pool_directory: str | Path) -> None:
+        self.pool_directory = Path(pool_directory)
+        self._lock = threading.Lock()
+        self._filling: dict[str, threading.Thread] = {}
+        self._sizes: dict[str, int] = {}
+        self._refilled_at: dict[str, float] = {}
+
+    def spares_directory(self, remote_url: str) -> Path:
+        project_name, repository_name = GitConfig.get_repo_names(remote_url)
+        if not repository_name:
+            raise ValueError(f'Invalid remote url: {remote_url}')
+        return self.pool_directory / (project_name or '_') / repository_name
+
+    def spares(self, remote_url: str) -> list[Path]:
+        directory = self.spares_directory(remote_url)
+        try:
+            entries = sorted(os.scandir(directory), key=lambda e: e.name)
+        except OSError:
+            return []
+        return [
+            Path(entry.path)
+            for entry in entries
+            if entry.is_dir() and not entry.name.startswith(_PARTIAL_PREFIX)
+        ]
+
+    def claim(self, remote_url: str, directory: Path) -> Path | None:
+        """Move a spare of remote_url to directory, or None when there is none"""
+        directory.parent.mkdir(parents=True, exist_ok=True)
+        for spare in self.spares(remote_url):
+            try:
+                os.rename(spare, directory)
+            except OSError:
+                # claimed by someone else, or directory exists
+                continue
+            get_logger(__name__).info('Claimed spare %s as %s', spare, directory)
+            return directory
+        return None
+
+    def refill(
+        self, remote_url: str, size: int, clone: Callable[[Path], Path]
+    ) -> threading.Thread | None:
+        """Update the spares of remote_url and clone the missing ones with
+        clone(directory) in a background thread. None when a refill of
+        remote_url is already running"""
+        with self._lock:
+            self._sizes[remote_url] = size
+            thread = self._filling.get(remote_url)
+            if thread and thread.is_alive():
+                return None
+            thread = threading.Thread(
+                target=self._fill,
+                args=(remote_url, size, clone),
+                name='pool-refill',
+                daemon=True,
+            )
+            self._filling[remote_url] = thread
+        thread.start()
+        return thread
+
+    def _fill(self, remote_url: str, size: int, clone: Callable[[Path], Path]) -> None:
+        logger = get_logger(__name__)
+        started_at = time.monotonic()
+        directory = self.spares_directory(remote_url)
+        for partial in directory.glob(f'{_PARTIAL_PREFIX}*'):
+            shutil.rmtree(partial, ignore_errors=True)
+        spares = self.spares(remote_url)
+        for spare in spares[size:]:
+            shutil.rmtree(spare, ignore_errors=True)
+        for spare in spares[:size]:
+            # out of the claimable names while it is updated
+            updating = spare.with_name(f'{_PARTIAL_PREFIX}{spare.name}')
+            try:
+                os.rename(spare, updating)
+            except OSError:
+                continue  # claimed meanwhile
+            try:
+                update_spare(updating)
+                os.rename(updating, spare)
+            except Exception as e:
+                logger.warning('Failed to update spare %s: %s', spare, e)
+                shutil.rmtree(updating, ignore_errors=True)
+        for _ in range(size - len(self.spares(remote_url))):
+            name = f'{time.time_ns()}-{uuid.uuid4().hex[:8]}'
+            partial = directory / f'{_PARTIAL_PREFIX}{name}'
+            try:
+                clone(partial)
+                os.rename(partial, directory / name)
+            except Exception as e:
+                logger.warning('Failed to clone spare of %s: %s', remote_url, e)
+                shutil.rmtree(partial, ignore_errors=True)
+                break
+        with self._lock:
+            self._refilled_at[remote_url] = time.time()
+        logger.info(
+            'Pool of %s refilled in %.2fs: %d/%d spares',
+            remote_url,
+            time.monotonic() - started_at,
+            len(self.spares(remote_url)),
+            size,
+        )
+
+    def join(self, timeout: float | None = None) -> None:
+        """Wait for the running refills"""
+        with self._lock:
+            threads = list(self._filling.values())
+        for thread in threads:
+            thread.join(timeout)
+
+    def state(self) -> list[PoolState]:
+        with self._lock:
+            sizes = dict(self._sizes)
+            filling = {url for url, t in self._filling.items() if t.is_alive()}
+            refilled_at = dict(self._refilled_at)
+        return [
+            PoolState(
+                remote_url=remote_url,
+                directory=self.spares_directory(remote_url),
+                spares=len(self.spares(remote_url)),
+                size=size,
+                filling=remote_url in filling,
+                refilled_at=refilled_at.get(remote_url, 0),
+            )
+            for remote_url, size in sorted(sizes.items())
+        ]
+
+
+def update_spare(directory: Path) -> None:
+    """Fetch a spare and check out the current remote default branch"""
+    _git(['fetch', '--quiet', '--prune', 'origin'], directory)
+    _git(['remote', 'set-head', 'origin', '--auto'], directory)
+    ref = _git(['symbolic-ref', '--short', 'refs/remotes/origin/HEAD'], directory)
+    branch = ref.strip().removeprefix('origin/')
+    _git(['checkout', '--quiet', '-B', branch, 'origin/HEAD'], directory)
+
+
+def _git(args: list[str], cwd: str | Path) -> str:
+    res = subprocess.run(
+        ['git', *args],
+        check=False,
+        env=os.environ,
+        capture_output=True,
+        cwd=str(cwd),
+    )
+    if res.returncode != 0:
+        output = (res.stderr + res.stdout).decode('utf-8', errors='replace')
+        raise RuntimeError(f'Command: git {" ".join(args)}\nOutput: {output}')
+    return res.stdout.decode('utf-8', errors='replace')
+
+
+_pools: dict[str, WorkspacePool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_workspace_pool(tasks_directory: str | Path) -> WorkspacePool:
+    """The spare pool of a tasks directory"""
+    pool_directory = str(Path(tasks_directory) / POOL_DIRECTORY)
+    with _pools_lock:
+        if pool_directory not in _pools:
+            _pools[pool_directory] = WorkspacePool(pool_directory)
+        return _pools[pool_directory]
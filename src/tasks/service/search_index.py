@@ -0,0 +1,183 @@
+"""In-memory trigram index of short texts, for type-ahead filtering.
+
+Each entry has a few fields (e.g. task id, repository, project, oneliner).
+The index maps every trigram of the fields, and the first one and two
+characters of every word, to the entries that contain it, with the best
+place it occurs at: the start of a field, the start of a word or inside a
+word, and in which field. A query is split in words (terms); the entries
+matching every term are the intersection of the posting sets of the term
+trigrams, so a keystroke never rescans the texts of all the entries.
+
+Matches are ranked by the place of each term: field prefix, then word
+prefix, then substring, then fuzzy (all the trigrams of the term, not next
+to each other), earlier fields first; a term that is a whole word first
+among them (11 before 110 for 11-0 and 110-0), then in insertion order.
+
+The index can be filled from a background thread while it is searched.
+"""
+
+import re
+import threading
+from typing import Collection, Hashable, Iterable
+
+# ranks of a place: kind * _MAX_FIELDS + field index, lower is better
+_MAX_FIELDS = 16
+_FIELD_START, _WORD_START, _INSIDE, _FUZZY = range(4)
+_SEPARATOR = '\x00'
+# prefix of the whole words among the grams
+_WORD_PREFIX = '\x01'
+_WORD = re.compile(r'[^\W_]+')
+
+
+class SearchIndex:
+    """key -> fields, searched by trigrams"""
+
+    def __init__(self) -> None:
+        self._ids: dict[Hashable, int] = {}
+        self._keys: dict[int, Hashable] = {}
+        # id -> casefolded fields joined by _SEPARATOR
+        self._texts: dict[int, str] = {}
+        # trigram, or 1-2 characters starting a word -> id -> best rank
+        self._grams: dict[str, dict[int, int]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._ids
+
+    def add(self, key: Hashable, fields: Iterable[str]) -> None:
+        """Index the fields of key, replacing its previous fields"""
+        fields = [field.casefold() for field in fields]
+        if len(fields) > _MAX_FIELDS:
+            raise ValueError(f'At most {_MAX_FIELDS} fields can be indexed')
+        text = _SEPARATOR.join(fields)
+        with self._lock:
+            if (doc := self._ids.get(key)) is not None:
+                if self._texts[doc] == text:
+                    return
+                self._unindex(doc)
+            else:
+                doc = self._next_id
+                self._next_id += 1
+                self._ids[key] = doc
+                self._keys[doc] = key
+            self._texts[doc] = text
+            for gram, rank in _grams(fields).items():
+                self._grams.setdefault(gram, {})[doc] = rank
+
+    def remove(self, key: Hashable) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def retain(self, keys: Collection[Hashable]) -> None:
+        """Remove the keys not in keys"""
+        with self._lock:
+            for key in [key for key in self._ids if key not in keys]:
+                self._remove(key)
+
+    def _remove(self, key: Hashable) -> None:
+        if (doc := self._ids.pop(key, None)) is None:
+            return
+        self._unindex(doc)
+        del self._keys[doc]
+        del self._texts[doc]
+
+    def _unindex(self, doc: int) -> None:
+        for gram in _grams(self._texts[doc].split(_SEPARATOR)):
+            postings = self._grams[gram]
+            del postings[doc]
+            if not postings:
+                del self._grams[gram]
+
+    def search(self, query: str, subsequences: bool = False) -> list[Hashable]:
+        """The keys matching every word of query, best matches first; all
+        the keys, in insertion order, for an empty query.
+        With subsequences, the entries with the characters of every word in
+        a field, in order (srv15 for service-15), come after them: a linear
+        scan, for small indexes"""
+        terms = query.casefold().split()
+        with self._lock:
+            if not terms:
+                return list(self._ids)
+            keys = self._search(terms)
+            if subsequences:
+                keys += self._search_subsequences(terms, set(keys))
+            return keys
+
+    def _search_subsequences(
+        self, terms: list[str], found: set[Hashable]
+    ) -> list[Hashable]:
+        patterns = [
+            re.compile(f'[^{_SEPARATOR}]*?'.join(map(re.escape, term)))
+            for term in terms
+        ]
+        return [
+            key
+            for doc, text in self._texts.items()
+            if (key := self._keys[doc]) not in found
+            and all(pattern.search(text) for pattern in patterns)
+        ]
+
+    def _search(self, terms: list[str]) -> list[Hashable]:
+        # per term, the postings of its grams, the ranks of its start and
+        # the entries where it is a whole word
+        matches: list[tuple[str, dict[int, int], dict[int, int]]] = []
+        postings: list[dict[int, int]] = []
+        for term in terms:
+            grams = {term[i : i + 3] for i in range(max(1, len(term) - 2))}
+            for gram in grams:
+                if (gram_postings := self._grams.get(gram)) is None:
+                    return []
+                postings.append(gram_postings)
+            words = self._grams.get(_WORD_PREFIX + term, {})
+            matches.append((term, self._grams[term[:3]], words))
+
+        postings.sort(key=len)
+        candidates = postings[0].keys()
+        for gram_postings in postings[1:]:
+            if not candidates:
+                return []
+            # iterates over the smaller of both
+            candidates = gram_postings.keys() & candidates
+
+        texts = self._texts
+        ranked = []
+        for doc in candidates:
+            rank = 0
+            for term, starts, words in matches:
+                rank += 2 * starts[doc] + (doc not in words)
+                if len(term) > 3 and term not in texts[doc]:
+                    rank += 2 * _FUZZY * _MAX_FIELDS
+            ranked.append((rank, doc))
+        ranked.sort()
+        keys = self._keys
+        return [keys[doc] for _, doc in ranked]
+
+
+def _grams(fields: list[str]) -> dict[str, int]:
+    """The trigrams of fields, the 1-2 characters starting their words and
+    their whole words, with the best rank of their places"""
+    grams: dict[str, int] = {}
+    fields_backwards = list(enumerate(fields))[::-1]
+    # from the worst ranks to the best ones, each overwriting the previous
+    for index, field in fields_backwards:
+        grams.update(
+            dict.fromkeys(
+                (field[i : i + 3] for i in range(len(field) - 2)),
+                _INSIDE * _MAX_FIELDS + index,
+            )
+        )
+    for index, field in fields_backwards:
+        rank = _WORD_START * _MAX_FIELDS + index
+        for word in _WORD.finditer(field):
+            i = word.start()
+            grams[field[i]] = grams[field[i : i + 2]] = rank
+            grams[field[i : i + 3]] = grams[_WORD_PREFIX + word[0]] = rank
+    for index, field in fields_backwards:
+        if field:
+            rank = _FIELD_START * _MAX_FIELDS + index
+            grams[field[0]] = grams[field[:2]] = grams[field[:3]] = rank
+    return grams
@@ -0,0 +1,196 @@
+"""SQLite index of the task workspaces under `in_progress` and `done`.
+
+Rows are derived from the directory names only (no git calls), and the
+index is reconciled incrementally: a status directory whose mtime did not
+change is not listed again, and only new or changed entries are written.
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+from tasks.consts import TaskStatus
+from tasks.service.logging_service import get_logger
+from tasks.task.task import parse_task_id
+
+TASK_INDEX_FILE = 'tasks_index.sqlite3'
+INDEXED_STATUSES = (TaskStatus.IN_PROGRESS, TaskStatus.DONE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    path TEXT PRIMARY KEY,
+    number TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    repository TEXT NOT NULL,
+    status TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_number_version ON tasks (number, version);
+CREATE TABLE IF NOT EXISTS status_directories (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL
+);
+"""
+
+
+@dataclass
+class TaskIndexEntry:
+    path: str
+    number: str
+    version: int
+    repository: str
+    status: TaskStatus
+    created_at: datetime
+    updated_at: datetime
+
+    @property
+    def task_id(self) -> str:
+        return f'{self.number}-{self.version}'
+
+    @property
+    def directory(self) -> Path:
+        return Path(self.path)
+
+
+def parse_task_directory_name(name: str) -> tuple[str, int, str]:
+    """Split a task directory name into (number, version, repository)
+    Ex: 1234-0-repository-name -> ('1234', 0, 'repository-name')
+    """
+    number, version = parse_task_id(name)
+    parts = name.split('-', 2)
+    if len(parts) == 3 and parts[1].isdigit():
+        repository = parts[2]
+    else:
+        repository = name.split('-', 1)[1] if '-' in name else ''
+    return number, int(version), repository
+
+
+class TaskIndex:
+    def __init__(self, db_file: str | Path) -> None:
+        self.db_file = Path(db_file)
+        self._lock = threading.Lock()
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as connection:
+            connection.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """A connection committed on success and always closed"""
+        connection = sqlite3.connect(self.db_file, timeout=10)
+        with closing(connection), connection:
+            yield connection
+
+    def reconcile(self, tasks_directory: str | Path) -> None:
+        """Bring the index up to date with the status directories"""
+        with self._lock, self._connect() as connection:
+            for status in INDEXED_STATUSES:
+                self._reconcile_status(
+                    connection, Path(tasks_directory) / status.value, status
+                )
+
+    def _reconcile_status(
+        self, connection: sqlite3.Connection, status_directory: Path, status: TaskStatus
+    ) -> None:
+        path = str(status_directory)
+        try:
+            mtime_ns = status_directory.stat().st_mtime_ns
+        except OSError:
+            connection.execute(
+                "DELETE FROM tasks WHERE status = ? AND path LIKE ? ESCAPE '\\'",
+                (status.value, _like_children(path)),
+            )
+            return
+        row = connection.execute(
+            'SELECT mtime_ns FROM status_directories WHERE path = ?', (path,)
+        ).fetchone()
+        if row and row[0] == mtime_ns:
+            return
+
+        indexed = dict(
+            connection.execute(
+                'SELECT path, mtime_ns FROM tasks '
+                "WHERE status = ? AND path LIKE ? ESCAPE '\\'",
+                (status.value, _like_children(path)),
+            ).fetchall()
+        )
+        upserts = []
+        with os.scandir(status_directory) as entries:
+            for entry in entries:
+                if not entry.is_dir():
+                    continue
+                stat = entry.stat()
+                if indexed.pop(entry.path, None) == stat.st_mtime_ns:
+                    continue
+                number, version, repository = parse_task_directory_name(entry.name)
+                upserts.append(
+                    (
+                        entry.path,
+                        number,
+                        version,
+                        repository,
+                        status.value,
+                        stat.st_mtime_ns,
+                        stat.st_ctime,
+                        stat.st_mtime,
+                    )
+                )
+        connection.executemany(
+            'INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?)', upserts
+        )
+        connection.executemany(
+            'DELETE FROM tasks WHERE path = ?', [(p,) for p in indexed]
+        )
+        connection.execute(
+            'INSERT OR REPLACE INTO status_directories VALUES (?, ?)', (path, mtime_ns)
+        )
+        get_logger(__name__).debug(
+            'Task index %s: %d updated, %d removed', path, len(upserts), len(indexed)
+        )
+
+    def find(self, task_number: str) -> list[TaskIndexEntry]:
+        """Entries of a task number, ordered by version"""
+        with self._connect() as connection:
+            rows = connection.execute(
+                'SELECT path, number, version, repository, status, created_at, '
+                'updated_at FROM tasks WHERE number = ? ORDER BY version, path',
+                (task_number,),
+            ).fetchall()
+        return [_entry_from_row(row) for row in rows]
+
+    def last(self, task_number: str) -> TaskIndexEntry | None:
+        """Entry with the highest version of a task number"""
+        with self._connect() as connection:
+            row = connection.execute(
+                'SELECT path, number, version, repository, status, created_at, '
+                'updated_at FROM tasks WHERE number = ? '
+                'ORDER BY version DESC, path LIMIT 1',
+                (task_number,),
+            ).fetchone()
+        return _entry_from_row(row) if row else None
+
+
+def _like_children(path: str) -> str:
+    """LIKE pattern of the paths under path, its wildcards escaped"""
+    prefix = path + os.sep
+    escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return escaped + '%'
+
+
+def _entry_from_row(row: tuple) -> TaskIndexEntry:
+    path, number, version, repository, status, created_at, updated_at = row
+    return TaskIndexEntry(
+        path=path,
+        number=number,
+        version=int(version),
+        repository=repository,
+        status=TaskStatus(status),
+        created_at=datetime.fromtimestamp(created_at),
+        updated_at=datetime.fromtimestamp(updated_at),
+    )
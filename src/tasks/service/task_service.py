@@ -1,68 +1,304 @@
-import json
+import glob
 import os
+import re
 import shutil
 import subprocess
-import tempfile
+import threading
+import time
+import uuid
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime
+from functools import partial
 from pathlib import Path
+from typing import Callable, Iterator
 
 from tasks.config.config import Config
 from tasks.consts import TaskStatus
 from tasks.git import GitConfig
+from tasks.git.clone_profile import CloneProfile
+from tasks.git.clone_progress import CloneProgress, CloneProgressTracker
+from tasks.git.worktree import (
+    WORKSPACE_MODE_WORKTREE,
+    add_worktree,
+    bundle_worktree,
+    ensure_store,
+    is_worktree,
+    remove_worktree,
+    repair_worktree,
+    store_path,
+    task_branch,
+)
+from tasks.service.frecency_service import get_repo_frecency
 from tasks.service.logging_service import get_logger
+from tasks.service.mirror_service import get_mirror_cache
+from tasks.service.oneliner_service import (
+    ONELINER_ENGINE_AGENT,
+    ONELINER_FILE,
+    generate_oneliner,
+    get_oneliner_queue,
+    write_oneliner_file,
+)
+from tasks.service.pool_service import get_workspace_pool
+from tasks.service.task_index import TaskIndexEntry
+from tasks.service.version_allocator import get_version_allocator
+from tasks.task.manifest import (
+    read_manifest,
+    task_status_from_directory,
+    write_manifest,
+)
 from tasks.task.task import Task, parse_task_id
 
+STAGING_DIRECTORY = '.staging'  # speculative clones, under the tasks directory
+STAGING_MAX_AGE = 60 * 60  # seconds before a leftover staged clone is removed
+
+
+@dataclass
+class TaskChange:
+    """A task created, moved or removed by this module"""
+
+    task: Task
+    previous_directory: Path | None = None
+    removed: bool = False
+
+
+TaskListener = Callable[[TaskChange], None]
+
+_task_listeners: list[TaskListener] = []
+# serializes the config and repository index updates of concurrent task creations
+_config_lock = threading.Lock()
+
+
+def add_task_listener(listener: TaskListener) -> None:
+    if listener not in _task_listeners:
+        _task_listeners.append(listener)
+
+
+def remove_task_listener(listener: TaskListener) -> None:
+    if listener in _task_listeners:
+        _task_listeners.remove(listener)
+
+
+def _notify_task_listeners(change: TaskChange) -> None:
+    for listener in list(_task_listeners):
+        try:
+            listener(change)
+        except Exception as e:
+            get_logger(__name__).warning('Task listener failed: %s', e)
+
 
 def new_task(
     config: Config,
     task_id: str,
     remote_url: str,
     task_description: str,
+    staged_directory: Path | None = None,
+    progress: Callable[[CloneProgress], None] | None = None,
+    cancel: threading.Event | None = None,
 ) -> tuple[Task, str]:
     """Create a new task, cloning the repository and creating the task helper files
-    returns the new task and a message to be displayed to the user
+    returns the new task and a message to be displayed to the user.
+    A staged_directory (see stage_workspace) is used instead of a new clone;
+    progress receives the clone progress and cancel stops the clone
     """
     logger = get_logger(__name__)
     logger.info('Creating new task: %s for %s', task_id, remote_url)
     logger.info('Task description: %s', task_description)
     task_dict = OrderedDict()
+    task_id, task_description = _next_task_id(
+        config, task_id, task_description, task_dict
+    )
+    task = None
+    try:
+        task = _create_task(
+            config,
+            task_id,
+            remote_url,
+            task_description,
+            task_dict,
+            staged_directory=staged_directory,
+            progress=progress,
+            cancel=cancel,
+        )
+    finally:
+        if not task:
+            release_task_id(config, task_id)
+
+    message = '\n'.join(str(line) for line in task_dict.values())
+    for line in task_dict.values():
+        logger.info(line)
+    return task, message
+
+
+def new_multi_repo_task(
+    config: Config,
+    task_id: str,
+    remote_urls: list[str],
+    task_description: str,
+    progress: Callable[[str, CloneProgress], None] | None = None,
+    cancel: threading.Event | None = None,
+) -> tuple[list[Task], str]:
+    """Create one task over several repositories: a `<task-id>-<repository>`
+    workspace per repository, cloned concurrently (multi_repo_concurrency at
+    a time), sharing the description and the group in their manifests.
+    When a clone fails the workspaces already created are removed.
+    progress is called with the repository name and its clone progress"""
+    remote_urls = list(dict.fromkeys(url for url in remote_urls if url))
+    if len(remote_urls) == 1:
+        task, message = new_task(
+            config, task_id, remote_urls[0], task_description, None, None, cancel
+        )
+        return ([task] if task else []), message
+
+    logger = get_logger(__name__)
+    logger.info('Creating new task: %s for %s', task_id, ', '.join(remote_urls))
+    task_dict = OrderedDict()
+    task_id, task_description = _next_task_id(
+        config, task_id, task_description, task_dict
+    )
+    group = [GitConfig.get_repo_names(url)[1] for url in remote_urls]
+
+    def create(remote_url: str) -> tuple[Task | None, dict[str, str]]:
+        repo_dict = OrderedDict()
+        repo_progress = None
+        if progress:
+            repo_progress = partial(progress, GitConfig.get_repo_names(remote_url)[1])
+        task = _create_task(
+            config,
+            task_id,
+            remote_url,
+            task_description,
+            repo_dict,
+            progress=repo_progress,
+            cancel=cancel,
+            group=group,
+        )
+        return task, repo_dict
+
+    started_at = time.monotonic()
+    results = []
+    try:
+        with ThreadPoolExecutor(
+            max_workers=max(1, config.multi_repo_concurrency),
+            thread_name_prefix='task-clone',
+        ) as executor:
+            results = list(executor.map(create, remote_urls))
+    finally:
+        if not results or not all(task for task, _ in results):
+            release_task_id(config, task_id)
+    for index, (_, repo_dict) in enumerate(results):
+        task_dict[f'repository_{index}'] = '\n'.join(repo_dict.values())
+    tasks = [task for task, _ in results if task]
+    if len(tasks) < len(remote_urls):
+        for task in tasks:
+            _remove_workspace(task.directory, task.id)
+            _notify_task_listeners(TaskChange(task, task.directory, removed=True))
+        tasks = []
+        task_dict['rollback'] = '* Task not created: not every repository was cloned'
+    else:
+        task_dict['elapsed'] = (
+            f'* {len(tasks)} repositories in {time.monotonic() - started_at:.1f}s'
+        )
+
+    message = '\n'.join(str(line) for line in task_dict.values())
+    for line in task_dict.values():
+        logger.info(line)
+    return tasks, message
 
-    tasks_folder = config.doing_tasks_directory
+
+def _next_task_id(
+    config: Config,
+    task_id: str,
+    task_description: str,
+    task_dict: dict[str, str],
+) -> tuple[str, str]:
+    """The id of a new task (the next version of its task number, from the
+    version allocator) and its description (the last version's one when empty).
+    A version that is not created must be given back with release_task_id"""
     task_number, task_version = parse_task_id(task_id)
 
-    if existing_tasks := get_existing_tasks(config, task_number):
-        last_task = existing_tasks[-1]
+    def taken(version: int) -> bool:
+        # by a task of any repository, the index may be stale
+        pattern = f'{glob.escape(task_number)}-{version}-*'
+        return any(
+            next(directory.glob(pattern), None)
+            for directory in (config.doing_tasks_directory, config.done_tasks_directory)
+        )
 
-        if not task_description:
-            # Get the last task description and increment the task version
-            task_readme_file = Path(last_task.directory) / 'TASK' / f'{last_task.id}.md'
-            if task_readme_file.exists():
-                with open(task_readme_file, 'r') as f:
-                    task_description = f.read()
-                task_dict['task_description'] = '* Using last task description'
+    def last_version() -> int | None:
+        last_task = get_last_task_entry(config, task_number)
+        return last_task.version if last_task else None
 
+    version = get_version_allocator(config.config_path).allocate(
+        task_number, last_version, taken
+    )
+    if version > 0:
+        # Get the last task description and increment the task version
+        if (
+            not task_description
+            and (last_task := get_last_task_entry(config, task_number))
+            and (task_description := read_task_description(last_task))
+        ):
+            task_dict['task_description'] = '* Using last task description'
         old_task_version = f'{task_number}-{task_version}'
-        task_version = str(int(last_task.id.split('-')[1]) + 1)
+        task_version = str(version)
         task_dict['task_version'] = (
             f'New task [{task_number}-{task_version}] - {old_task_version} already exists'
         )
-
     else:
         task_version = '0'
         task_dict['task_version'] = f'New task {task_number}-{task_version}'
 
-    task_id = f'{task_number}-{task_version}'
+    return f'{task_number}-{task_version}', task_description
+
 
+def release_task_id(config: Config, task_id: str) -> None:
+    """Give back the version of a task whose creation failed"""
+    task_number, task_version = parse_task_id(task_id)
+    get_version_allocator(config.config_path).release(task_number, int(task_version))
+
+
+def _create_task(
+    config: Config,
+    task_id: str,
+    remote_url: str,
+    task_description: str,
+    task_dict: dict[str, str],
+    staged_directory: Path | None = None,
+    progress: Callable[[CloneProgress], None] | None = None,
+    cancel: threading.Event | None = None,
+    group: list[str] | None = None,
+) -> Task | None:
+    """Create the workspace of task_id for remote_url. Errors are reported in
+    task_dict and return None"""
     project_name, repository_name = GitConfig.get_repo_names(remote_url)
     task_dict['project_name'] = (
         f'* Project name: {project_name} / Repository name: {repository_name}'
     )
-    new_task_folder = tasks_folder / f'{task_id}-{repository_name}'
+    new_task_folder = config.doing_tasks_directory / f'{task_id}-{repository_name}'
     task: Task | None = None
     try:
-        new_task_folder = clone_repository(remote_url, new_task_folder)
-        task_dict['git'] = f'* Cloned repository {remote_url} to {new_task_folder}'
+        if staged_directory and staged_directory.exists():
+            profile = config.clone_profile(repository_name)
+            _move_workspace(staged_directory, new_task_folder)
+            task_dict['git'] = f'* Used the clone of {remote_url} made in background'
+        elif config.workspace_mode == WORKSPACE_MODE_WORKTREE:
+            # clone profiles do not apply to the shared store
+            profile = CloneProfile()
+            with _clone_sources(config, remote_url, task_dict) as (reference, mirror):
+                store = ensure_store(
+                    store_path(config.worktree_stores_directory, remote_url),
+                    remote_url,
+                    str(mirror) if mirror else reference,
+                )
+            new_task_folder = add_worktree(store, new_task_folder, task_branch(task_id))
+            task_dict['git'] = f'* Created worktree of {store} at {new_task_folder}'
+        else:
+            new_task_folder, profile = _clone_workspace(
+                config, remote_url, new_task_folder, task_dict, cancel, progress
+            )
         if not new_task_folder.exists():
             raise RuntimeError(
                 f'Failed to clone repository: {remote_url} to {new_task_folder}'
@@ -78,8 +314,12 @@ def new_task(
             f.write(task_description)
 
         repo = GitConfig(directory=str(new_task_folder))
-        config.unique_repos[repository_name] = remote_url
-        config.save()
+        with _config_lock:
+            config.repo_index.add(repo)
+            config.repo_index.save()
+            config.unique_repos[repository_name] = remote_url
+            config.save()
+        get_repo_frecency(config.config_path).record(remote_url)
         task = Task(
             task_id,
             repo,
@@ -87,15 +327,127 @@ def new_task(
             datetime.fromtimestamp(new_task_folder.stat().st_ctime),
             datetime.now(),
         )
+        task.group = list(group or [])
 
-        task.oneliner = get_task_oneliner(task_description, config.cursor_api_key)
+        task.oneliner = generate_oneliner(
+            task_description, config.cursor_api_key, config.oneliner_engine
+        )
+        write_oneliner_file(new_task_folder, task.oneliner)
+        write_manifest(task)
+        _notify_task_listeners(TaskChange(task))
+        if profile.deepen and profile.is_reduced:
+            deepen_repository(new_task_folder, profile)
+            task_dict['deepen'] = '* Completing the clone in background'
     except Exception as e:
         task_dict['error'] = f'* Error: {e}'
+    return task
 
-    message = '\n'.join(str(line) for line in task_dict.values())
-    for line in task_dict.values():
-        logger.info(line)
-    return task, message
+
+@contextmanager
+def _clone_sources(
+    config: Config, remote_url: str, task_dict: dict[str, str]
+) -> Iterator[tuple[str | None, Path | None]]:
+    """The local sample and the mirror to clone remote_url from, the mirror
+    being kept from eviction until the block exits"""
+    if reference := config.find_repo_sample(remote_url):
+        task_dict['reference'] = f'* Using local objects from {reference}'
+    if not config.mirror_cache:
+        yield reference, None
+        return
+    mirrors = get_mirror_cache(config.config_path, config.mirror_budget)
+    with mirrors.borrow(remote_url) as mirror:
+        if mirror:
+            task_dict['mirror'] = f'* Using mirror {mirror}'
+        else:
+            mirrors.schedule(remote_url)
+            task_dict['mirror'] = '* Creating the mirror in background'
+        yield reference, mirror
+
+
+def _clone_workspace(
+    config: Config,
+    remote_url: str,
+    directory: Path,
+    task_dict: dict[str, str],
+    cancel: threading.Event | None = None,
+    progress: Callable[[CloneProgress], None] | None = None,
+) -> tuple[Path, CloneProfile]:
+    """Claim a spare workspace of remote_url into directory, or clone it"""
+    _, repository_name = GitConfig.get_repo_names(remote_url)
+    profile = config.clone_profile(repository_name)
+    try:
+        if config.pool_sizes.get(repository_name) and (
+            claimed := get_workspace_pool(config.tasks_directory).claim(
+                remote_url, directory
+            )
+        ):
+            task_dict['git'] = f'* Claimed a spare workspace of {remote_url}'
+            return claimed, profile
+        with _clone_sources(config, remote_url, task_dict) as (reference, mirror):
+            if profile.is_reduced:
+                task_dict['profile'] = (
+                    f'* Clone profile: {" ".join(profile.clone_args())}'
+                )
+            directory = clone_repository(
+                remote_url, directory, reference, profile, mirror, cancel, progress
+            )
+        task_dict['git'] = f'* Cloned repository {remote_url} to {directory}'
+        return directory, profile
+    finally:
+        refill_workspace_pool(config, remote_url)
+
+
+def stage_workspace(
+    config: Config,
+    remote_url: str,
+    cancel: threading.Event,
+    progress: Callable[[CloneProgress], None] | None = None,
+) -> Path | None:
+    """Clone remote_url into `<tasks-directory>/.staging` ahead of new_task.
+    Returns None when cancelled (the clone is removed) or in worktree mode,
+    where creating the workspace is already cheap; progress receives the
+    clone progress"""
+    if config.workspace_mode == WORKSPACE_MODE_WORKTREE:
+        return None
+    staging_directory = Path(config.tasks_directory) / STAGING_DIRECTORY
+    _discard_stale_workspaces(staging_directory)
+    _, repository_name = GitConfig.get_repo_names(remote_url)
+    directory = staging_directory / f'{uuid.uuid4().hex[:12]}-{repository_name}'
+    task_dict: dict[str, str] = {}
+    try:
+        directory, _ = _clone_workspace(
+            config, remote_url, directory, task_dict, cancel, progress
+        )
+    except Exception:
+        discard_staged_workspace(directory)
+        if cancel.is_set():
+            return None
+        raise
+    if cancel.is_set():
+        discard_staged_workspace(directory)
+        return None
+    get_logger(__name__).info('Staged %s: %s', directory, task_dict.get('git', ''))
+    return directory
+
+
+def discard_staged_workspace(directory: Path | None) -> None:
+    if directory and directory.exists():
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def _discard_stale_workspaces(staging_directory: Path) -> None:
+    """Remove the staged workspaces left behind by a previous run"""
+    try:
+        entries = list(os.scandir(staging_directory))
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            stale = time.time() - entry.stat().st_mtime > STAGING_MAX_AGE
+        except OSError:
+            continue
+        if stale:
+            shutil.rmtree(entry.path, ignore_errors=True)
 
 
 def get_task_data_candidate(
@@ -107,34 +459,26 @@ def get_task_data_candidate(
     new_task_folder = (
         Path(config.doing_tasks_directory) / f'{task_id}-{repository_name}'
     ).as_posix()
-    if not (existing_tasks := get_existing_tasks(config, task_number)):
+    if not (last_task := get_last_task_entry(config, task_number)):
         return f'{task_number}-{task_version}', '', '', '', ''
 
-    last_task = existing_tasks[-1]
-    task_description, task_oneliner = '', ''
-
-    # Get the last task description and increment the task version
-    task_readme_file = Path(last_task.directory) / 'TASK' / f'{last_task.id}.md'
-    if task_readme_file.exists():
-        with open(task_readme_file, 'r') as f:
-            task_description = f.read()
-    task_oneliner_file = Path(last_task.directory) / 'TASK' / 'oneliner.txt'
+    task_description = read_task_description(last_task)
+    task_oneliner = ''
+    task_oneliner_file = last_task.directory / 'TASK' / 'oneliner.txt'
     if task_oneliner_file.exists():
         with open(task_oneliner_file, 'r') as f:
             task_oneliner = f.read()
-    task_version = str(int(task_version) + 1)
 
-    task_id = f'{task_number}-{task_version}'
+    task_id = f'{task_number}-{last_task.version + 1}'
     new_task_folder = (
-        Path(config.doing_tasks_directory)
-        / f'{task_id}-{last_task.repo.repository_name}'
+        Path(config.doing_tasks_directory) / f'{task_id}-{last_task.repository}'
     ).as_posix()
 
     return (
         task_id,
         task_description,
         task_oneliner,
-        last_task.repo.repository_name,
+        last_task.repository,
         new_task_folder,
     )
 
@@ -143,6 +487,18 @@ def read_task_from_directory(directory: Path, config: Config) -> Task | None:
     # Ex: tasks/in_progress/00001-0-repository_name
     logger = get_logger(__name__)
     logger.info('Reading task: %s', directory)
+    status = task_status_from_directory(directory)
+    if task := read_manifest(directory):
+        changed = task.status != status
+        task.status = status
+        if not (directory / 'TASK' / ONELINER_FILE).exists():
+            oneliner = task.oneliner
+            request_task_oneliner(config, task)
+            changed = changed or task.oneliner != oneliner
+        if changed:
+            write_manifest(task)
+        return task
+
     task_number, task_version = parse_task_id(directory.stem)
     task_id = f'{task_number}-{task_version}'
 
@@ -150,13 +506,6 @@ def read_task_from_directory(directory: Path, config: Config) -> Task | None:
     if not repo.is_git_directory:
         return None
 
-    if TaskStatus.DONE.value in str(directory):
-        status = TaskStatus.DONE
-    elif TaskStatus.IN_PROGRESS.value in str(directory):
-        status = TaskStatus.IN_PROGRESS
-    else:
-        status = TaskStatus.TODO
-
     created_at = datetime.fromtimestamp(directory.stat().st_ctime)
     updated_at = datetime.fromtimestamp(directory.stat().st_mtime)
 
@@ -168,46 +517,108 @@ def read_task_from_directory(directory: Path, config: Config) -> Task | None:
         updated_at=updated_at,
     )
 
-    oneliner_file = directory / 'TASK' / 'oneliner.txt'
-    if oneliner_file.exists():
-        with open(oneliner_file.as_posix(), 'r') as f:
-            task.oneliner = f.read().strip()
-    else:
-        os.makedirs(oneliner_file.parent, exist_ok=True)
-
-        task_file = directory / 'TASK' / f'{task_id}.md'
-        if task_file.exists():
-            with open(task_file.as_posix()) as f:
-                task_description = f.read().strip()
-            task.oneliner = get_task_oneliner(task_description, config.cursor_api_key)
-            with open(oneliner_file.as_posix(), 'w') as f:
-                f.write(task.oneliner.strip())
-        else:
-            task.oneliner = task.description
+    request_task_oneliner(config, task)
+    write_manifest(task)
     logger.info('Task: %s', task)
     return task
 
 
-def clone_repository(remote_url: str, new_task_folder: Path) -> Path:
+def request_task_oneliner(config: Config, task: Task) -> None:
+    """Set task.oneliner from TASK/oneliner.txt or the local engine. With the
+    agent engine, it comes from the oneliner cache, or is the first line of
+    the description while the background queue generates it"""
+    oneliner_file = task.directory / 'TASK' / ONELINER_FILE
+    if oneliner_file.exists():
+        task.oneliner = oneliner_file.read_text().strip()
+        return
+    task_file = task.directory / 'TASK' / f'{task.id}.md'
+    if not task_file.exists():
+        task.oneliner = task.description
+        return
+    task_description = task_file.read_text().strip()
+    if not task_description or config.oneliner_engine != ONELINER_ENGINE_AGENT:
+        task.oneliner = generate_oneliner(
+            task_description, config.cursor_api_key, config.oneliner_engine
+        )
+        write_oneliner_file(task.directory, task.oneliner)
+        return
+    queue = get_oneliner_queue(
+        config.config_path, config.cursor_api_key, config.oneliner_concurrency
+    )
+    task.oneliner = queue.request(
+        task,
+        task_description,
+        on_done=lambda updated_task: _notify_task_listeners(TaskChange(updated_task)),
+    )
+
+
+def clone_repository(
+    remote_url: str,
+    new_task_folder: Path,
+    reference: str | None = None,
+    profile: CloneProfile | None = None,
+    mirror: Path | None = None,
+    cancel: threading.Event | None = None,
+    progress: Callable[[CloneProgress], None] | None = None,
+) -> Path:
+    """Clone remote_url into new_task_folder. With a reference (a local clone
+    of the same repository), the objects it has are copied from it and only
+    the missing ones are fetched; --dissociate keeps the new clone independent.
+    A profile makes a partial, shallow or single-branch clone. With a mirror,
+    the clone is made from it and origin is then pointed to remote_url.
+    Setting cancel stops the clone and removes new_task_folder; progress is
+    called with the parsed `git clone --progress` lines"""
     if not remote_url:
         raise ValueError('remote_url cannot be empty')
 
     parent_folder = new_task_folder.parent
     parent_folder.mkdir(parents=True, exist_ok=True)
-    args = ['git', 'clone', remote_url, str(new_task_folder)]
+    args = ['git', 'clone']
+    source = remote_url
+    if mirror:
+        # a plain path clone hardlinks the objects of the mirror, but git
+        # ignores --depth and --filter on it
+        source = mirror.as_uri() if profile and profile.is_reduced else str(mirror)
+    elif reference:
+        args.extend(['--reference-if-able', str(reference), '--dissociate'])
+    if profile:
+        args.extend(profile.clone_args())
+    on_output = None
+    if progress:
+        args.append('--progress')
+        tracker = CloneProgressTracker()
+
+        def on_output(line: str) -> None:
+            if (clone_progress := tracker.update(line)) is not None:
+                progress(clone_progress)
+
+    args.extend([source, str(new_task_folder)])
     logger = get_logger(__name__)
     logger.info('Cloning repository: %s', args)
-    res = subprocess.run(
-        args,
-        check=False,
-        env=os.environ,
-        capture_output=True,
-        cwd=str(parent_folder),
+    started_at = time.monotonic()
+    try:
+        res = _run(args, parent_folder, cancel, on_output)
+    except RuntimeError:
+        shutil.rmtree(new_task_folder, ignore_errors=True)
+        raise
+    logger.info(
+        'Result: %s in %.2fs (reference: %s, mirror: %s)',
+        res.returncode,
+        time.monotonic() - started_at,
+        reference or 'none',
+        mirror or 'none',
     )
-    logger.info('Result: %s', res.returncode)
     logger.info('Output: %s', res.stdout.decode('utf-8', errors='replace'))
     logger.info('Error: %s', res.stderr.decode('utf-8', errors='replace'))
 
+    if res.returncode == 0 and mirror:
+        res = subprocess.run(
+            ['git', 'remote', 'set-url', 'origin', remote_url],
+            check=False,
+            env=os.environ,
+            capture_output=True,
+            cwd=str(new_task_folder),
+        )
     if res.returncode == 0:
         return new_task_folder
     else:
@@ -219,18 +630,150 @@ def clone_repository(remote_url: str, new_task_folder: Path) -> Path:
         )
 
 
+def refill_workspace_pool(config: Config, remote_url: str) -> threading.Thread | None:
+    """Refill the spare workspaces of remote_url in background, when its
+    repository has a pool size"""
+    _, repository_name = GitConfig.get_repo_names(remote_url)
+    if not (size := config.pool_sizes.get(repository_name, 0)):
+        return None
+    profile = config.clone_profile(repository_name)
+
+    def clone(directory: Path) -> Path:
+        mirror = None
+        if config.mirror_cache:
+            mirror = get_mirror_cache(config.config_path, config.mirror_budget).find(
+                remote_url
+            )
+        reference = config.find_repo_sample(remote_url)
+        return clone_repository(remote_url, directory, reference, profile, mirror)
+
+    return get_workspace_pool(config.tasks_directory).refill(remote_url, size, clone)
+
+
+def refill_workspace_pools(config: Config) -> None:
+    """Refill the spare workspaces of every repository with a pool size"""
+    if config.workspace_mode == WORKSPACE_MODE_WORKTREE:
+        return
+    for repository_name, size in config.pool_sizes.items():
+        if size and (remote_url := config.unique_repos.get(repository_name)):
+            refill_workspace_pool(config, remote_url)
+
+
+def _run(
+    args: list[str],
+    cwd: Path,
+    cancel: threading.Event | None = None,
+    on_output: Callable[[str], None] | None = None,
+) -> subprocess.CompletedProcess:
+    """subprocess.run, terminated when cancel is set. on_output is called
+    with each output line (stderr and stdout merged, progress lines split on
+    carriage returns) while the process runs"""
+    if cancel is None and on_output is None:
+        return subprocess.run(
+            args, check=False, env=os.environ, capture_output=True, cwd=str(cwd)
+        )
+    if cancel and cancel.is_set():
+        raise RuntimeError(f'Cancelled: {" ".join(args)}')
+    output: list[bytes] = []
+    with subprocess.Popen(
+        args,
+        env=os.environ,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        cwd=str(cwd),
+    ) as process:
+
+        def read_output() -> None:
+            pending = b''
+            while chunk := process.stdout.read1(4096):
+                output.append(chunk)
+                *lines, pending = re.split(rb'[\r\n]', pending + chunk)
+                for line in lines:
+                    if line and on_output:
+                        on_output(line.decode('utf-8', errors='replace'))
+            if pending and on_output:
+                on_output(pending.decode('utf-8', errors='replace'))
+
+        reader = threading.Thread(target=read_output, daemon=True)
+        reader.start()
+        while True:
+            try:
+                process.wait(timeout=0.2)
+                break
+            except subprocess.TimeoutExpired:
+                if cancel and cancel.is_set():
+                    process.terminate()
+                    process.wait()
+                    reader.join()
+                    raise RuntimeError(f'Cancelled: {" ".join(args)}')
+        reader.join()
+    return subprocess.CompletedProcess(args, process.returncode, b''.join(output), b'')
+
+
+def deepen_repository(directory: Path, profile: CloneProfile) -> threading.Thread:
+    """Turn a partial, shallow or single-branch clone into a full one in a
+    background thread"""
+
+    def deepen() -> None:
+        logger = get_logger(__name__)
+        started_at = time.monotonic()
+        for command in profile.deepen_commands():
+            res = subprocess.run(
+                ['git', *command],
+                check=False,
+                env=os.environ,
+                capture_output=True,
+                cwd=str(directory),
+            )
+            if res.returncode != 0:
+                logger.warning(
+                    'Failed to deepen %s: git %s\n%s',
+                    directory,
+                    ' '.join(command),
+                    res.stderr.decode('utf-8', errors='replace'),
+                )
+                return
+        logger.info('Deepened %s in %.2fs', directory, time.monotonic() - started_at)
+
+    thread = threading.Thread(target=deepen, name='deepen-clone', daemon=True)
+    thread.start()
+    return thread
+
+
+def _move_workspace(directory: Path, new_directory: Path) -> None:
+    shutil.move(directory, new_directory)
+    if is_worktree(new_directory):
+        repair_worktree(new_directory)
+
+
+def _remove_workspace(directory: Path, task_id: str) -> None:
+    if is_worktree(directory):
+        remove_worktree(directory, task_branch(task_id))
+    else:
+        shutil.rmtree(directory)
+
+
+def get_last_task_entry(config: Config, task_number: str) -> TaskIndexEntry | None:
+    """Indexed lookup of the highest version of a task number"""
+    return config.task_index.last(task_number)
+
+
+def read_task_description(entry: TaskIndexEntry) -> str:
+    task_readme_file = entry.directory / 'TASK' / f'{entry.task_id}.md'
+    if not task_readme_file.exists():
+        return ''
+    with open(task_readme_file, 'r') as f:
+        return f.read()
+
+
 def get_existing_tasks(config: Config, task_number: str) -> list[Task]:
     tasks = []
     logger = get_logger(__name__)
     logger.info('Getting existing tasks for %s', task_number)
-    for task_folder in [config.doing_tasks_directory, config.done_tasks_directory]:
-        for task_folder in task_folder.iterdir():
-            if task_folder.is_dir():
-                task = read_task_from_directory(task_folder, config)
-                if task and task.id.startswith(f'{task_number}-'):
-                    tasks.append(task)
-                    logger.info(' + Found task: %s', task)
-    tasks.sort(key=lambda x: x.id)
+    for entry in config.task_index.find(task_number):
+        if task := read_task_from_directory(entry.directory, config):
+            tasks.append(task)
+            logger.info(' + Found task: %s', task)
     logger.info(' + Found %d tasks', len(tasks))
     return tasks
 
@@ -256,7 +799,55 @@ def open_task_in_editor(config: Config, task: Task) -> str | None:
         return 'Editor is not set'
 
 
+def get_task_group(config: Config, task: Task) -> list[Task]:
+    """The other workspaces of a multi-repository task in the same status"""
+    members = []
+    for repository_name in task.group:
+        if repository_name == task.repo.repository_name:
+            continue
+        directory = task.directory.parent / f'{task.id}-{repository_name}'
+        if directory.is_dir() and (
+            member := read_task_from_directory(directory, config)
+        ):
+            members.append(member)
+    return members
+
+
 def move_task_to_done(config: Config, task: Task) -> str | None:
+    return _for_task_group(config, task, _move_task_to_done)
+
+
+def move_task_to_doing(config: Config, task: Task) -> str | None:
+    return _for_task_group(config, task, _move_task_to_doing)
+
+
+def delete_done_task(config: Config, task: Task) -> str | None:
+    return _for_task_group(config, task, _delete_done_task)
+
+
+def archive_task(config: Config, task: Task) -> str | None:
+    """Archive a done task (and the rest of its group) into zip files"""
+    messages = [
+        _archive_task(config, member)
+        for member in [task, *get_task_group(config, task)]
+    ]
+    return '\n'.join(message for message in messages if message)
+
+
+def _for_task_group(
+    config: Config, task: Task, operation: Callable[[Config, Task], str | None]
+) -> str | None:
+    """Apply operation to the task and the rest of its group; the error
+    messages are joined"""
+    errors = [
+        error
+        for member in [task, *get_task_group(config, task)]
+        if (error := operation(config, member))
+    ]
+    return '\n'.join(errors) or None
+
+
+def _move_task_to_done(config: Config, task: Task) -> str | None:
     if (
         task.status == TaskStatus.DONE
         or task.directory.parent == config.done_tasks_directory
@@ -268,15 +859,19 @@ def move_task_to_done(config: Config, task: Task) -> str | None:
     )
     new_task_folder.parent.mkdir(parents=True, exist_ok=True)
     try:
-        shutil.move(task.directory, new_task_folder)
+        previous_directory = task.directory
+        _move_workspace(previous_directory, new_task_folder)
+        task.repo.directory = str(new_task_folder)
         task.status = TaskStatus.DONE
         task.updated_at = datetime.now()
+        write_manifest(task)
+        _notify_task_listeners(TaskChange(task, previous_directory))
         config.save()
     except Exception as e:
         return f'Failed to move task to done: {e}'
 
 
-def move_task_to_doing(config: Config, task: Task) -> str | None:
+def _move_task_to_doing(config: Config, task: Task) -> str | None:
     if task.status == TaskStatus.IN_PROGRESS:
         return 'Task is already in progress'
     new_task_folder = (
@@ -284,19 +879,24 @@ def move_task_to_doing(config: Config, task: Task) -> str | None:
     )
     new_task_folder.parent.mkdir(parents=True, exist_ok=True)
     try:
-        shutil.move(task.directory, new_task_folder)
+        previous_directory = task.directory
+        _move_workspace(previous_directory, new_task_folder)
+        task.repo.directory = str(new_task_folder)
         task.status = TaskStatus.IN_PROGRESS
         task.updated_at = datetime.now()
+        write_manifest(task)
+        _notify_task_listeners(TaskChange(task, previous_directory))
         config.save()
     except Exception as e:
         return f'Failed to move task to doing: {e}'
 
 
-def delete_done_task(config: Config, task: Task) -> str | None:
+def _delete_done_task(config: Config, task: Task) -> str | None:
     if task.status != TaskStatus.DONE:
         return 'Task is not done'
     try:
-        shutil.rmtree(task.directory)
+        _remove_workspace(task.directory, task.id)
+        _notify_task_listeners(TaskChange(task, task.directory, removed=True))
         config.repos = [
             repo
             for repo in config.repos
@@ -307,11 +907,19 @@ def delete_done_task(config: Config, task: Task) -> str | None:
         return f'Failed to delete done task: {e}'
 
 
-def archive_task(config: Config, task: Task) -> str | None:
+def _archive_task(config: Config, task: Task) -> str | None:
     if task.status != TaskStatus.DONE:
         raise ValueError('Task is not done')
     try:
         os.makedirs(config.archive_tasks_directory, exist_ok=True)
+        task.status = TaskStatus.ARCHIVE
+        task.updated_at = datetime.now()
+        write_manifest(task)
+        if is_worktree(task.directory):
+            # the .git file points to the store, the bundle holds the history
+            bundle_worktree(
+                task.directory, task.directory / 'TASK' / f'{task.id}.bundle'
+            )
         archive_file = Path(
             shutil.make_archive(
                 base_name=str(Path(config.archive_tasks_directory) / task.archive_name),
@@ -323,7 +931,8 @@ def archive_task(config: Config, task: Task) -> str | None:
         )
         if not archive_file.exists():
             raise FileNotFoundError('Failed to create archive file', str(archive_file))
-        shutil.rmtree(task.directory)
+        _remove_workspace(task.directory, task.id)
+        _notify_task_listeners(TaskChange(task, task.directory, removed=True))
         config.repos = [
             repo
             for repo in config.repos
@@ -333,68 +942,3 @@ def archive_task(config: Config, task: Task) -> str | None:
         return f'Task {task.id} archived to {archive_file}'
     except Exception as e:
         raise ValueError(f'Failed to archive task: {e}')
-
-
-def get_task_oneliner(description: str, api_key: str) -> str:
-    logger = get_logger(__name__)
-    if not description:
-        logger.warning('oneliner: no description')
-        return ''
-    if description.count('\n') == 0:
-        logger.warning('oneliner: using description as is')
-        return description.strip()
-    default_oneliner = ''.join(description.splitlines()[:1])
-    if (
-        not shutil.which('agent') or not api_key
-    ):  # Use cursor agent to generate the oneliner
-        logger.warning('oneliner: no agent found. using default oneliner')
-        return default_oneliner
-
-    with tempfile.TemporaryDirectory(dir='.') as tmp_dir:
-        task_file = Path(tmp_dir) / 'task.md'
-        task_file.write_text(description)
-        prompt = (
-            f'create just a one line description from the content of @{task_file.as_posix()}. '
-            'Output only the one line description, no other text. '
-            'Use the same language as the description.'
-        )
-
-        result = subprocess.run(
-            args=[
-                'agent',
-                '--output-format',
-                'json',
-                '--print',
-                '--trust',
-                '--api-key',
-                api_key,
-                prompt,
-            ],
-            capture_output=True,
-            text=True,
-        )
-
-        if result.returncode != 0:
-            logger.warning(
-                'oneliner: failed to get oneliner: %s',
-                result.stderr,
-            )
-            return default_oneliner
-
-        json_result = json.loads(result.stdout)
-        if (
-            json_result['type'] == 'result'
-            and json_result['subtype'] == 'success'
-            and not json_result['is_error']
-        ):
-            logger.info('oneliner: got oneliner: %s', json_result['result'])
-            return json_result['result']
-
-        logger.warning('oneliner: failed to get oneliner: %s', result.stdout)
-        return default_oneliner
-
-    # args = ['agent', 'generate', description]
-
-    # agent "create a one line description from the content of @TASK/125364-0.md" --output-format json --print
-
-    # {"type":"result","subtype":"success","is_error":false,"duration_ms":7172,"duration_api_ms":7172,"result":"Implement E2E tests for Company endpoints covering listing with filters/pagination, ID lookup, cache behavior, and context.","session_id":"198eb041-fdd9-401c-8646-961bd30e5e4f","request_id":"21e30550-9306-4a91-a529-9287a6245221"}
@@ -0,0 +1,141 @@
+"""Next-version allocator of the task ids.
+
+The last version given to each task number is kept in
+`<config-path>/task_versions.json`, read and written under an exclusive
+`fcntl` lock on `task_versions.lock`, so TUI instances and batch runs
+creating the same task number at the same time get different versions
+without listing the task directories.
+
+The counters heal from the directory tree: a task number without a counter
+starts after its highest version on disk, and a version whose workspace
+already exists (the counter is behind, e.g. a task copied by hand) is
+skipped.
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
+
+from tasks.service.logging_service import get_logger
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+VERSIONS_FILE = 'task_versions.json'
+VERSIONS_LOCK_FILE = 'task_versions.lock'
+
+
+class VersionAllocator:
+    """task number -> last allocated version, shared between processes"""
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+
+    @property
+    def versions_file(self) -> Path:
+        return self.directory / VERSIONS_FILE
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with (self.directory / VERSIONS_LOCK_FILE).open('a') as lock_file:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def allocate(
+        self,
+        task_number: str,
+        last_version: Callable[[], int | None],
+        taken: Callable[[int], bool] = lambda version: False,
+    ) -> int:
+        """The next version of a task number.
+        last_version (the highest version on disk, None when there is none)
+        is only called when the counter is missing or behind, which taken
+        (whether the workspaces of a version already exist) tells"""
+        with self._locked():
+            versions = self._load()
+            last = versions.get(task_number)
+            if last is None:
+                last = _on_disk(last_version)
+            version = last + 1
+            if taken(version):
+                healed = _on_disk(last_version)
+                get_logger(__name__).warning(
+                    'Version counter of %s behind: %d taken, last on disk %d',
+                    task_number,
+                    version,
+                    healed,
+                )
+                version = max(version, healed) + 1
+                while taken(version):
+                    version += 1
+            versions[task_number] = version
+            self._save(versions)
+        return version
+
+    def release(self, task_number: str, version: int) -> None:
+        """Give back a version whose task was not created, when it is still
+        the last one allocated"""
+        with self._locked():
+            versions = self._load()
+            if versions.get(task_number) != version:
+                return
+            if version > 0:
+                versions[task_number] = version - 1
+            else:
+                del versions[task_number]
+            self._save(versions)
+
+    def _load(self) -> dict[str, int]:
+        try:
+            with self.versions_file.open('r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        return {
+            str(number): version
+            for number, version in data.items()
+            if isinstance(version, int)
+        }
+
+    def _save(self, versions: dict[str, int]) -> None:
+        tmp_file = self.versions_file.with_suffix('.tmp')
+        try:
+            with tmp_file.open('w', encoding='utf-8') as f:
+                json.dump(versions, f, indent=2, sort_keys=True)
+            os.replace(tmp_file, self.versions_file)
+        except OSError as e:
+            get_logger(__name__).warning('Failed to save task versions: %s', e)
+
+
+def _on_disk(last_version: Callable[[], int | None]) -> int:
+    """The highest version on disk, -1 when there is none"""
+    version = last_version()
+    return -1 if version is None else version
+
+
+_allocators: dict[str, VersionAllocator] = {}
+_allocators_lock = threading.Lock()
+
+
+def get_version_allocator(config_path: str | Path) -> VersionAllocator:
+    """The version allocator of a configuration directory"""
+    directory = str(Path(config_path))
+    with _allocators_lock:
+        if directory not in _allocators:
+            _allocators[directory] = VersionAllocator(directory)
+        return _allocators[directory]
@@ -0,0 +1,94 @@
+"""Machine-readable task manifest, stored at `TASK/task.json` in each workspace.
+
+The manifest lets a task be loaded without reading its git configuration.
+The workspace location stays authoritative: the directory and the status
+come from where the workspace is, not from the manifest.
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+from tasks.consts import TaskStatus
+from tasks.git import GitConfig
+from tasks.service.logging_service import get_logger
+from tasks.task.task import Task, parse_task_id
+
+MANIFEST_FILE = 'task.json'
+MANIFEST_VERSION = 1
+
+_REPO_FIELDS = (
+    'remote_name',
+    'remote_url',
+    'project_name',
+    'repository_name',
+    'readme_description',
+)
+
+
+def manifest_file(directory: str | Path) -> Path:
+    return Path(directory) / 'TASK' / MANIFEST_FILE
+
+
+def task_status_from_directory(directory: str | Path) -> TaskStatus:
+    """Status of a workspace from its parent folder (in_progress, done)"""
+    parent = Path(directory).parent.name
+    if parent in (TaskStatus.IN_PROGRESS.value, TaskStatus.DONE.value):
+        return TaskStatus(parent)
+    return TaskStatus.TODO
+
+
+def write_manifest(task: Task) -> None:
+    data = {
+        'version': MANIFEST_VERSION,
+        'id': task.id,
+        'status': task.status.value,
+        'created_at': task.created_at.isoformat(),
+        'updated_at': task.updated_at.isoformat(),
+        'oneliner': task.oneliner,
+        'group': task.group,
+        'repo': {name: getattr(task.repo, name) for name in _REPO_FIELDS},
+    }
+    file = manifest_file(task.directory)
+    try:
+        file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = file.with_suffix('.tmp')
+        with tmp_file.open('w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_file, file)
+    except OSError as e:
+        get_logger(__name__).warning('Failed to write manifest %s: %s', file, e)
+
+
+def read_manifest(directory: str | Path) -> Task | None:
+    """Task from the workspace manifest, or None when it is missing, invalid
+    or belongs to another task id (renamed workspace)"""
+    directory = Path(directory)
+    try:
+        with manifest_file(directory).open('r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != MANIFEST_VERSION:
+            return None
+        task_number, task_version = parse_task_id(directory.name)
+        if data['id'] != f'{task_number}-{task_version}':
+            return None
+        repo = GitConfig.from_dict(
+            {
+                **{name: data['repo'].get(name, '') for name in _REPO_FIELDS},
+                'directory': str(directory.absolute()),
+                'is_git_directory': True,
+            }
+        )
+        task = Task(
+            id=data['id'],
+            repo=repo,
+            status=TaskStatus(data['status']),
+            created_at=datetime.fromisoformat(data['created_at']),
+            updated_at=datetime.fromisoformat(data['updated_at']),
+        )
+        task.oneliner = str(data.get('oneliner', ''))
+        task.group = [str(name) for name in data.get('group', [])]
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+    return task
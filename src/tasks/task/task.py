@@ -14,6 +14,8 @@ class Task:
     created_at: datetime
     updated_at: datetime
     oneliner: str = field(default='', init=False)
+    # repository names of a multi-repository task (workspaces sharing the id)
+    group: list[str] = field(default_factory=list, init=False)
 
     @property
     def name(self) -> str:
@@ -49,10 +49,5 @@ class MainApp(App):
         self.exit()
 
     def on_mount(self) -> None:
-        def check_tasks_screen(*args) -> None:
-            tasks_args = dict(
-                refresh_tasks=bool(args), selected_task_id=args[0] if args else None
-            )
-            self.push_screen(Tasks(**tasks_args), check_tasks_screen)
-
-        self.push_screen(Tasks(), check_tasks_screen)
+        # a single tasks screen for the whole session, reloaded in place
+        self.push_screen('tasks')
@@ -27,6 +27,18 @@ parser.add_argument(
     default=default_config_path / 'tasks.log',
     help='Log file',
 )
+parser.add_argument(
+    '--batch',
+    type=str,
+    default=None,
+    help='CSV or YAML manifest of tasks to create without the UI',
+)
+parser.add_argument(
+    '--batch-concurrency',
+    type=int,
+    default=4,
+    help='Tasks of the batch manifest to create at the same time',
+)
 
 
 def get_args() -> tuple[Path, Path, str, Path]:
@@ -40,3 +52,10 @@ def get_args() -> tuple[Path, Path, str, Path]:
     tasks_folder.mkdir(parents=True, exist_ok=True)
 
     return config_path, tasks_folder, args.log_level, log_file
+
+
+def get_batch_args() -> tuple[Path | None, int]:
+    args = parser.parse_args()
+
+    manifest_file = Path(args.batch).expanduser() if args.batch else None
+    return manifest_file, args.batch_concurrency
@@ -1,38 +1,138 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Callable, Iterator
 
 from tasks.config.config import Config, load_config_from_file
 from tasks.consts import TaskStatus
 from tasks.git import GitConfig
-from tasks.service.task_service import read_task_from_directory
-from tasks.task.task import Task
+from tasks.service.mirror_service import get_mirror_cache
+from tasks.service.task_service import (
+    TaskChange,
+    add_task_listener,
+    read_task_from_directory,
+    refill_workspace_pools,
+    remove_task_listener,
+)
+from tasks.task.task import Task, parse_task_id
 
 
 @dataclass
 class Context:
     config: Config = None
 
-    _task_cache: dict[TaskStatus, list[Task]] = field(default_factory=dict)
+    # status -> task directory -> (directory mtime_ns, task or None when not a task)
+    _task_cache: dict[TaskStatus, dict[str, tuple[int, Task | None]]] = field(
+        default_factory=dict
+    )
+    # status -> mtime_ns of the status directory when it was last listed
+    _listed_mtimes: dict[TaskStatus, int] = field(default_factory=dict)
+    _lock: threading.RLock = field(default_factory=threading.RLock)
 
     def _get_tasks(self, status: TaskStatus, refresh: bool = False) -> list[Task]:
-        tasks = self._task_cache.get(status, [])
-        if refresh or not tasks:
-            tasks_directory = Path(self.config.tasks_directory) / status.value
-            if not tasks_directory.exists():
-                return []
-            tasks = [
-                t
-                for t in [
-                    read_task_from_directory(p, self.config)
-                    for p in tasks_directory.iterdir()
-                    if p.is_dir()
-                ]
-                if t is not None
-            ]
-            tasks.sort(key=lambda x: x.id)
-            # self._task_cache[status] = tasks
+        tasks = list(self.iter_tasks(status, refresh))
+        tasks.sort(key=lambda x: x.id)
         return tasks
 
+    def iter_tasks(
+        self,
+        status: TaskStatus,
+        refresh: bool = False,
+        progress: Callable[[int, int], None] | None = None,
+    ) -> Iterator[Task]:
+        """Yield the tasks of a status in id order, as they are read.
+        progress is called with (read, total) workspaces"""
+        tasks_directory = Path(self.config.tasks_directory) / status.value
+        try:
+            status_mtime_ns = tasks_directory.stat().st_mtime_ns
+        except OSError:
+            return
+        with self._lock:
+            cached = dict(self._task_cache.get(status, {}))
+            listed = (
+                status in self._task_cache
+                and self._listed_mtimes.get(status) == status_mtime_ns
+            )
+        if listed and not refresh:
+            tasks = sorted(
+                (task for _, task in cached.values() if task is not None),
+                key=lambda x: x.id,
+            )
+            for index, task in enumerate(tasks, 1):
+                if progress:
+                    progress(index, len(tasks))
+                yield task
+            return
+
+        directories = _list_task_directories(tasks_directory)
+        loaded: dict[str, tuple[int, Task | None]] = {}
+        for index, (directory, mtime_ns, task) in enumerate(
+            self._read_tasks(directories, cached), 1
+        ):
+            loaded[directory] = (mtime_ns, task)
+            if progress:
+                progress(index, len(directories))
+            if task is not None:
+                yield task
+        with self._lock:
+            self._task_cache[status] = loaded
+            self._listed_mtimes[status] = status_mtime_ns
+
+    def _read_tasks(
+        self,
+        directories: list[tuple[str, int]],
+        cached: dict[str, tuple[int, Task | None]],
+    ) -> Iterator[tuple[str, int, Task | None]]:
+        """Read the task directories in order, reusing the cached tasks whose
+        directory mtime did not change"""
+
+        def read_task(directory: str, mtime_ns: int) -> tuple[str, int, Task | None]:
+            cached_task = cached.get(directory)
+            if cached_task and cached_task[0] == mtime_ns:
+                return directory, mtime_ns, cached_task[1]
+            return (
+                directory,
+                mtime_ns,
+                read_task_from_directory(Path(directory), self.config),
+            )
+
+        to_read = [
+            directory
+            for directory, mtime_ns in directories
+            if cached.get(directory, (None, None))[0] != mtime_ns
+        ]
+        if len(to_read) <= 1 or self.config.task_loading_workers == 1:
+            yield from (read_task(*directory) for directory in directories)
+            return
+        executor = ThreadPoolExecutor(
+            max_workers=self.config.task_loading_workers or None,
+            thread_name_prefix='task-loader',
+        )
+        try:
+            yield from executor.map(read_task, *zip(*directories))
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def on_task_changed(self, change: TaskChange) -> None:
+        """Update the cache in place after a task is created, moved or removed"""
+        with self._lock:
+            if change.previous_directory:
+                previous_directory = os.path.abspath(change.previous_directory)
+                for tasks in self._task_cache.values():
+                    tasks.pop(previous_directory, None)
+            if change.removed:
+                return
+            tasks = self._task_cache.get(change.task.status)
+            if tasks is None:
+                return
+            try:
+                mtime_ns = change.task.directory.stat().st_mtime_ns
+            except OSError:
+                return
+            tasks[os.path.abspath(change.task.directory)] = (mtime_ns, change.task)
+
     def get_doing_tasks(self, refresh: bool = False) -> list[Task]:
         return self._get_tasks(TaskStatus.IN_PROGRESS, refresh)
 
@@ -62,6 +162,24 @@ class Context:
         return list(repos.values())
 
 
+def _list_task_directories(tasks_directory: Path) -> list[tuple[str, int]]:
+    """(directory, mtime_ns) of the workspaces of a status directory, in task id order"""
+    directories = []
+    with os.scandir(tasks_directory) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                directories.append(
+                    (os.path.abspath(entry.path), entry.stat().st_mtime_ns)
+                )
+
+    def sort_key(directory: tuple[str, int]) -> tuple[str, str]:
+        task_number, task_version = parse_task_id(Path(directory[0]).stem)
+        return f'{task_number}-{task_version}', directory[0]
+
+    directories.sort(key=sort_key)
+    return directories
+
+
 class ContextClass:
     @property
     def context(self) -> Context:
@@ -88,9 +206,20 @@ def setup_context(
 
     config.log_level = log_level
     config.log_file = log_file
+    config.tasks_directory = tasks_directory
+    if config.repo_index_is_stale():
+        config.rebuild_repo_index(background=True)
+    if config.mirror_cache:
+        get_mirror_cache(config.config_path, config.mirror_budget).start(
+            lambda: list(config.unique_repos.values()),
+            config.mirror_refresh_interval,
+        )
 
+    if _context:
+        remove_task_listener(_context.on_task_changed)
     _context = Context(config=config)
-    _context.config.tasks_directory = tasks_directory
+    add_task_listener(_context.on_task_changed)
+    refill_workspace_pools(config)
 
 
 def get_context() -> Context:
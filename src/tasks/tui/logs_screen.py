@@ -2,9 +2,10 @@ from textual import on
 from textual.app import ComposeResult
 from textual.events import ScreenResume
 from textual.screen import Screen
-from textual.widgets import Button, Footer, Header, RichLog
+from textual.widgets import Button, Footer, Header, RichLog, Static
 
 from tasks.service.logging_service import get_log_bytes
+from tasks.service.pool_service import get_workspace_pool
 from tasks.tui.context import ContextClass
 
 
@@ -14,6 +15,11 @@ class Logs(Screen, ContextClass):
     padding: 1;
     border: round $primary;
     width: 1fr;  
+}
+#pool {
+    padding: 0 1;
+    border: round $primary;
+    height: auto;
 }"""
 
     BINDINGS = [
@@ -22,6 +28,9 @@ class Logs(Screen, ContextClass):
 
     def compose(self) -> ComposeResult:
         yield Header()
+        pool = Static(id='pool')
+        pool.border_title = 'Spare workspaces'
+        yield pool
         rl = RichLog(highlight=True)
         rl.border_title = 'Logs'
         yield rl
@@ -37,8 +46,22 @@ class Logs(Screen, ContextClass):
     #     log.write(log_text)
     @on(ScreenResume)
     async def on_screen_resume(self, event) -> None:
+        self.reload_pool()
         self.reload_log()
 
+    def reload_pool(self) -> None:
+        pool: Static = self.query_one('#pool', Static)
+        states = get_workspace_pool(self.context.config.tasks_directory).state()
+        pool.display = bool(states)
+        pool.update(
+            '\n'.join(
+                f'{state.directory.parent.name}/{state.directory.name}: '
+                f'{state.spares}/{state.size} spares'
+                + (' (refilling)' if state.filling else '')
+                for state in states
+            )
+        )
+
     def reload_log(self) -> None:
         log_text = get_log_bytes().decode('utf-8')
         log: RichLog = self.query_one(RichLog)
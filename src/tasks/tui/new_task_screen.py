@@ -1,6 +1,10 @@
+import re
+import threading
 import typing
+from functools import partial
 from pathlib import Path
 
+from rich.text import Text
 from textual import on
 from textual.app import ComposeResult
 from textual.containers import Horizontal
@@ -12,21 +16,36 @@ from textual.widgets import (
     Header,
     Input,
     Markdown,
-    RadioButton,
-    RadioSet,
+    OptionList,
+    ProgressBar,
+    Static,
     TabbedContent,
     TabPane,
     TextArea,
 )
+from textual.widgets.option_list import Option
+from textual.worker import Worker, WorkerFailed
 
 from tasks.git import GitConfig
+from tasks.git.clone_progress import CloneProgress
+from tasks.service.frecency_service import get_repo_frecency
+from tasks.service.oneliner_service import generate_oneliner
+from tasks.service.search_index import SearchIndex
 from tasks.service.task_service import (
+    discard_staged_workspace,
     get_task_data_candidate,
-    get_task_oneliner,
+    new_multi_repo_task,
     new_task,
+    stage_workspace,
 )
+from tasks.task.task import Task
 from tasks.tui.context import ContextClass
 
+# repositories shown by the picker, the best matches of the query
+PICKER_LIMIT = 100
+# remote urls and local paths are not searched, e.g. git@host:org/repo.git
+_REMOTE_URL = re.compile(r'://|^[\w.-]+@[\w.-]+:|^[/~.]')
+
 
 class NewTask(Screen, ContextClass):
     CSS_PATH = 'new_task_screen.tcss'
@@ -38,7 +57,12 @@ class NewTask(Screen, ContextClass):
         ('ctrl+g', 'generate_oneliner', 'Generate oneliner'),
     ]
     _is_composed: var[bool] = var(False)
+    # the most frecent first
     repos: list[GitConfig] = []
+    _repos_by_url: dict[str, GitConfig] = {}
+    _repos_by_name: dict[str, GitConfig] = {}
+    # fuzzy search of project/repository, by remote url
+    _repo_search: SearchIndex | None = None
 
     task_id: var[str] = var('')
 
@@ -50,14 +74,94 @@ class NewTask(Screen, ContextClass):
     # Creation tab
     task_markdown: var[str] = var('')
 
+    # remote url, cancel event and worker of the speculative clone
+    _staging: tuple[str, threading.Event, Worker] | None = None
+    # latest progress of the speculative clone
+    _staging_progress: CloneProgress | None = None
+    # set to cancel the running task creation
+    _creation_cancel: threading.Event | None = None
+    # repository name ('' for a single repository) -> clone progress
+    _clone_progress: dict[str, CloneProgress] = {}
+
     def action_tab_task_details(self) -> None:
         tabbed_content: TabbedContent = self.query_one('#new_task_main')
         tabbed_content.active = 'task_details'
         self.query_one('#task').focus()
 
     def action_cancel(self) -> None:
+        self.discard_staging()
+        if self._creation_cancel:
+            # stop the running creation and stay on the screen
+            self._creation_cancel.set()
+            self.show_status('Cancelling...')
+            return
         self.dismiss((False, 'Task creation cancelled', ''))
 
+    def stage_repository(self, remote_url: str) -> None:
+        """Start cloning remote_url in background, before Create is pressed"""
+        if self._staging and self._staging[0] == remote_url:
+            return
+        self.discard_staging()
+        if not remote_url:
+            return
+        cancel = threading.Event()
+
+        def progress(clone_progress: CloneProgress) -> None:
+            if not cancel.is_set():
+                self.app.call_from_thread(
+                    self.show_staging_progress, remote_url, clone_progress
+                )
+
+        worker = self.run_worker(
+            lambda: stage_workspace(self.context.config, remote_url, cancel, progress),
+            thread=True,
+            group='stage_workspace',
+        )
+        self._staging = (remote_url, cancel, worker)
+
+    def show_staging_progress(
+        self, remote_url: str, clone_progress: CloneProgress
+    ) -> None:
+        """Keep the progress of the speculative clone, shown while Create
+        waits for it"""
+        if not self._staging or self._staging[0] != remote_url:
+            return
+        self._staging_progress = clone_progress
+        if self._creation_cancel:
+            self.show_progress(clone_progress)
+
+    def discard_staging(self) -> None:
+        """Cancel the speculative clone and remove it"""
+        if not self._staging:
+            return
+        _, cancel, worker = self._staging
+        self._staging = None
+        self._staging_progress = None
+        cancel.set()
+        if worker.is_finished:
+            threading.Thread(
+                target=discard_staged_workspace, args=(worker.result,), daemon=True
+            ).start()
+
+    async def take_staged_workspace(self, remote_url: str) -> Path | None:
+        """The speculative clone of remote_url, waiting for it to finish"""
+        if not self._staging or self._staging[0] != remote_url:
+            self.discard_staging()
+            return None
+        worker = self._staging[2]
+        try:
+            staged_directory = await worker.wait()
+        except WorkerFailed:
+            staged_directory = None
+        self._staging = None
+        self._staging_progress = None
+        return staged_directory
+
+    def on_unmount(self) -> None:
+        self.discard_staging()
+        if self._creation_cancel:
+            self._creation_cancel.set()
+
     async def action_generate_oneliner(self) -> None:
         input: Input = self.query_one('#oneliner_description')
         description_input: TextArea = self.query_one('#description')
@@ -71,8 +175,10 @@ class NewTask(Screen, ContextClass):
         input.loading = True
         try:
             worker = self.run_worker(
-                lambda: get_task_oneliner(
-                    description, self.context.config.cursor_api_key
+                lambda: generate_oneliner(
+                    description,
+                    self.context.config.cursor_api_key,
+                    self.context.config.oneliner_engine,
                 ),
                 thread=True,
                 exclusive=True,
@@ -85,8 +191,22 @@ class NewTask(Screen, ContextClass):
         finally:
             input.loading = False
 
-    def compose(self) -> ComposeResult:
+    def load_repos(self) -> None:
         self.repos = self.context.get_all_repos()
+        scores = get_repo_frecency(self.context.config.config_path).scores()
+        # the search keeps this order for the empty query and the ties
+        self.repos.sort(key=lambda repo: -scores.get(repo.remote_url, 0))
+        self._repos_by_url = {}
+        self._repos_by_name = {}
+        self._repo_search = SearchIndex()
+        for repo in self.repos:
+            self._repos_by_name.setdefault(repo.repository_name, repo)
+            if repo.remote_url and repo.remote_url not in self._repos_by_url:
+                self._repos_by_url[repo.remote_url] = repo
+                self._repo_search.add(repo.remote_url, repo_search_fields(repo))
+
+    def compose(self) -> ComposeResult:
+        self.load_repos()
         yield Header()
         with TabbedContent(
             'Task details', 'Repository', 'Creation', id='new_task_main'
@@ -119,18 +239,15 @@ class NewTask(Screen, ContextClass):
                     else '',
                 )
                 repository_input.border_title = 'Repository remote URL'
+                repository_input.border_subtitle = (
+                    'Type to search the repositories. Several URLs, separated by'
+                    ' spaces, create a multi-repository task'
+                )
                 yield repository_input
 
-                repositories = (
-                    RadioButton(
-                        label=f'{repo.project_name}/{repo.repository_name}',
-                        id=repo.repository_name,
-                    )
-                    for repo in self.repos
-                )
-                radio_set = RadioSet(*repositories, id='repos', name='Repositories')
-                radio_set.border_title = 'Repositories'
-                yield radio_set
+                repository_list = OptionList(id='repos')
+                repository_list.border_title = 'Repositories'
+                yield repository_list
 
             with TabPane('Creation', id='creation_tab'):
                 with Horizontal(id='creation_horizontal'):
@@ -141,49 +258,66 @@ class NewTask(Screen, ContextClass):
                     task_markdown.border_title = 'Task markdown'
                     yield task_markdown
 
+                progress_bar = ProgressBar(
+                    total=100, show_eta=False, id='creation_progress'
+                )
+                progress_bar.display = False
+                yield progress_bar
+                yield Static(id='creation_status')
                 yield Button('Create', variant='primary', id='create')
+                cancel_button = Button(
+                    'Cancel creation', variant='error', id='cancel_creation'
+                )
+                cancel_button.display = False
+                yield cancel_button
 
         yield Footer()
         self._is_composed = True
 
     @property
-    def repository_url(self) -> str:
-        return (
-            self.chosen_repository.remote_url
-            if self.chosen_repository
-            else self.query_one('#repository_input').value
+    def repository_urls(self) -> list[str]:
+        """The repositories of the task, as typed: several remote URLs,
+        separated by spaces or commas, create a multi-repository task"""
+        value = self.query_one('#repository_input', Input).value
+        urls = [url for url in re.split(r'[\s,]+', value) if url]
+        if not urls and self.chosen_repository:
+            return [self.chosen_repository.remote_url]
+        return urls
+
+    def filter_repositories(self, query: str) -> None:
+        """Show the best PICKER_LIMIT repositories matching query (the most
+        frecent without query, or for remote urls), the chosen one first"""
+        if is_remote_url(query):
+            query = ''
+        remote_urls = self._repo_search.search(query, subsequences=True)
+        shown = remote_urls[:PICKER_LIMIT]
+        chosen_url = self.chosen_repository and self.chosen_repository.remote_url
+        if not query and chosen_url in self._repos_by_url:
+            shown = [chosen_url, *(url for url in shown if url != chosen_url)]
+            shown = shown[:PICKER_LIMIT]
+
+        repository_list = self.query_one('#repos', OptionList)
+        repository_list.clear_options()
+        repository_list.add_options(
+            Option(Text(repo_label(self._repos_by_url[url])), id=url) for url in shown
+        )
+        if shown:
+            repository_list.highlighted = 0
+        repository_list.border_subtitle = (
+            f'{len(shown)} of {len(remote_urls)}'
+            if len(shown) < len(remote_urls)
+            else f'{len(shown)}'
         )
-
-    @repository_url.setter
-    def repository_url(self, value: str) -> None:
-        if self.chosen_repository and self.chosen_repository.remote_url == value:
-            return
-        input: Input = self.query_one('#repository_input')
-        input.value = value
-
-        chosen_repository_name = ''
-        for repo in self.repos:
-            if repo.remote_url == value:
-                self.chosen_repository = repo
-                chosen_repository_name = repo.repository_name
-                break
-        else:
-            self.chosen_repository = None
-
-        for i, button in enumerate(self.query_one('#repos').query('RadioButton')):
-            button.value = self.repos[i].repository_name == chosen_repository_name
 
     def on_mount(self) -> None:
+        self.filter_repositories('')
         self.query_one('#task').focus()
 
     def watch_chosen_repository(self) -> None:
+        # the repository input is set by whoever chooses the repository, and
+        # keeps the typed text when the choice is cleared
         if not self._is_composed:
             return
-        self.repository_url = (
-            self.chosen_repository.remote_url if self.chosen_repository else ''
-        )
-
-        button: RadioButton
         chosen_repository_name = (
             self.chosen_repository.repository_name if self.chosen_repository else ''
         )
@@ -191,15 +325,18 @@ class NewTask(Screen, ContextClass):
             Path(self.context.config.doing_tasks_directory)
             / f'{self.task_id}-{chosen_repository_name}'
         ).as_posix()
-        for i, button in enumerate(self.query_one('#repos').query('RadioButton')):
-            button.value = self.repos[i].repository_name == chosen_repository_name
+        self.stage_repository(
+            self.chosen_repository.remote_url if self.chosen_repository else ''
+        )
 
     def get_creation_markdown(self) -> str:
         error_message, _ = self.new_task_validation()
         if error_message:
             return f"""# Task Creation: {error_message}"""
 
-        if self.chosen_repository:
+        if len(repository_urls := self.repository_urls) > 1:
+            repository_description = ', '.join(repository_urls)
+        elif self.chosen_repository:
             repository_description = f'{self.chosen_repository.project_name}/{self.chosen_repository.repository_name}'
         else:
             repository_description = (
@@ -239,22 +376,40 @@ class NewTask(Screen, ContextClass):
                     event = Input.Submitted(event.input, event.value)
                     await self.input_submitted(event)
             case 'repository_input':
-                for repo in self.repos:
-                    if repo.remote_url == event.input.value:
-                        self.chosen_repository = repo
-                        break
+                if repo := self._repos_by_url.get(event.input.value):
+                    self.chosen_repository = repo
 
             case _:
                 pass
 
+    @on(Input.Changed, '#repository_input')
+    def repository_input_changed(self, event: Input.Changed) -> None:
+        if self.chosen_repository and event.value != self.chosen_repository.remote_url:
+            # edited away from the chosen repository: stop its clone
+            self.chosen_repository = None
+        self.filter_repositories(event.value)
+
     @on(Input.Submitted)
     async def input_submitted(self, event: Input.Submitted) -> None:
         match event.input.id:
             case 'repository_input':
-                for repo in self.repos:
-                    if repo.remote_url == event.input.value:
-                        self.chosen_repository = repo
-                        break
+                # a known remote url, or the best match of the search
+                query = event.input.value
+                repo = self._repos_by_url.get(query)
+                repository_list = self.query_one('#repos', OptionList)
+                if (
+                    not repo
+                    and query.strip()
+                    and not is_remote_url(query)
+                    and repository_list.highlighted is not None
+                ):
+                    option = repository_list.get_option_at_index(
+                        repository_list.highlighted
+                    )
+                    repo = self._repos_by_url[option.id]
+                if repo:
+                    self.chosen_repository = repo
+                    event.input.value = repo.remote_url
             case 'task':
                 if self.task_id == event.input.value:
                     return
@@ -278,11 +433,9 @@ class NewTask(Screen, ContextClass):
                     self.task_markdown = task_description
                     self.query_one('#description').text = self.task_markdown
 
-                for repo in self.repos:
-                    if repo.repository_name == repository_name:
-                        self.chosen_repository = repo
-                        self.query_one('#repository_input').value = repo.remote_url
-                        break
+                if repo := self._repos_by_name.get(repository_name):
+                    self.chosen_repository = repo
+                    self.query_one('#repository_input').value = repo.remote_url
 
                 if not self.oneliner_description:
                     self.oneliner_description = task_oneliner
@@ -290,8 +443,8 @@ class NewTask(Screen, ContextClass):
                         '#oneliner_description'
                     ).value = self.oneliner_description
 
-    def on_radio_set_changed(self, event: RadioSet.Changed) -> None:
-        self.chosen_repository = self.repos[event.radio_set.pressed_index]
+    def on_option_list_option_selected(self, event: OptionList.OptionSelected) -> None:
+        self.chosen_repository = self._repos_by_url[event.option.id]
         input: Input = self.query_one('#repository_input')
         input.value = self.chosen_repository.remote_url
 
@@ -304,24 +457,125 @@ class NewTask(Screen, ContextClass):
                     self.app.notify(error_message, severity='error')
                     focus_function()
                     return
-
-                repository_url = self.repository_url
-                task, message = new_task(
-                    self.context.config,
+                await self.create_task()
+            case 'cancel_creation':
+                self.action_cancel()
+
+    async def create_task(self) -> None:
+        """Create the task in a thread worker, showing the clone progress"""
+        repository_urls = self.repository_urls
+        cancel = threading.Event()
+        self._creation_cancel = cancel
+        self.set_creating(True)
+        try:
+            staged_directory = None
+            if len(repository_urls) == 1:
+                if self._staging_progress:
+                    self.show_progress(self._staging_progress)
+                else:
+                    self.show_status('Waiting for the background clone...')
+                staged_directory = await self.take_staged_workspace(repository_urls[0])
+            else:
+                self.discard_staging()
+            if cancel.is_set():
+                discard_staged_workspace(staged_directory)
+                return
+            self.show_status('Creating task...')
+            worker = self.run_worker(
+                partial(
+                    self._create_task,
                     self.task_id,
-                    repository_url,
+                    repository_urls,
                     self.task_markdown,
+                    staged_directory,
+                    cancel,
+                ),
+                thread=True,
+                exclusive=True,
+                group='create_task',
+            )
+            try:
+                task, message = await worker.wait()
+            except WorkerFailed as e:
+                task, message = None, f'{e.error}'
+        finally:
+            self._creation_cancel = None
+            self.set_creating(False)
+
+        if cancel.is_set():
+            self.show_status('')
+            self.app.notify('Task creation cancelled', severity='warning')
+        elif task:
+            self.app.notify(message, title='Task created', severity='information')
+            self.dismiss((True, message, task.id))
+        else:
+            self.app.notify(message, title='Task creation failed', severity='error')
+            self.dismiss((False, message, ''))
+
+    def _create_task(
+        self,
+        task_id: str,
+        repository_urls: list[str],
+        task_markdown: str,
+        staged_directory: Path | None,
+        cancel: threading.Event,
+    ) -> tuple[Task | None, str]:
+        def progress(repository_name: str, clone_progress: CloneProgress) -> None:
+            if not cancel.is_set():
+                self.app.call_from_thread(
+                    self.show_progress, clone_progress, repository_name
                 )
-                if task:
-                    self.app.notify(
-                        message, title='Task created', severity='information'
-                    )
-                    self.dismiss((True, message, task.id))
-                else:
-                    self.app.notify(
-                        message, title='Task creation failed', severity='error'
-                    )
-                    self.dismiss((False, message, ''))
+
+        if len(repository_urls) > 1:
+            tasks, message = new_multi_repo_task(
+                self.context.config,
+                task_id,
+                repository_urls,
+                task_markdown,
+                progress,
+                cancel,
+            )
+            return (tasks[0] if tasks else None), message
+        try:
+            return new_task(
+                self.context.config,
+                task_id,
+                repository_urls[0],
+                task_markdown,
+                staged_directory,
+                partial(progress, ''),
+                cancel,
+            )
+        finally:
+            discard_staged_workspace(staged_directory)
+
+    def set_creating(self, creating: bool) -> None:
+        self.query_one('#create', Button).display = not creating
+        self.query_one('#cancel_creation', Button).display = creating
+        progress_bar = self.query_one('#creation_progress', ProgressBar)
+        progress_bar.display = creating
+        progress_bar.update(progress=0)
+        self._clone_progress = {}
+
+    def show_status(self, status: str) -> None:
+        self.query_one('#creation_status', Static).update(status)
+
+    def show_progress(
+        self, clone_progress: CloneProgress, repository_name: str = ''
+    ) -> None:
+        """Show the clone progress of a repository (of all of them, for a
+        multi-repository task)"""
+        self._clone_progress[repository_name] = clone_progress
+        progresses = self._clone_progress.values()
+        self.query_one('#creation_progress', ProgressBar).update(
+            progress=sum(p.percent for p in progresses) / len(progresses)
+        )
+        self.show_status(
+            '\n'.join(
+                f'{name}: {p.describe()}' if name else p.describe()
+                for name, p in sorted(self._clone_progress.items())
+            )
+        )
 
     def new_task_validation(self) -> tuple[str, typing.Callable | None]:
         if '-' not in self.task_id:
@@ -337,3 +591,17 @@ class NewTask(Screen, ContextClass):
                 '#description'
             ).focus()
         return '', None
+
+
+def is_remote_url(value: str) -> bool:
+    """Whether value holds remote urls or paths rather than a search"""
+    return any(_REMOTE_URL.search(part) for part in value.split())
+
+
+def repo_label(repo: GitConfig) -> str:
+    return f'{repo.project_name}/{repo.repository_name}'
+
+
+def repo_search_fields(repo: GitConfig) -> tuple[str, ...]:
+    """The texts the repository picker searches: the repository name first"""
+    return repo.repository_name or '', repo_label(repo)
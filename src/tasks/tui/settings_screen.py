@@ -114,10 +114,16 @@ class Setup(Screen, ContextClass):
                 self.app.pop_screen()
                 return
 
+            directories_changed = (
+                self.tasks_directory != self.context.config.tasks_directory
+                or self.base_repos_directory != self.context.config.base_repos_directory
+            )
             self.context.config.tasks_directory = self.tasks_directory
             self.context.config.base_repos_directory = self.base_repos_directory
             self.context.config.editor = self.editor
             self.context.config.cursor_api_key = self.cursor_api_key
+            if directories_changed:
+                self.context.config.rebuild_repo_index(background=True)
             self.context.config.save()
             self.app.notify(
                 'Setup saved - Please restart the app', severity='information'
@@ -1,10 +1,21 @@
+import time
+from dataclasses import dataclass, field
+from functools import cache, partial
+from typing import Any, Callable, Iterable
+
+from rich.text import Text
+from textual import events
 from textual.app import ComposeResult
+from textual.binding import Binding
 from textual.containers import Horizontal
+from textual.coordinate import Coordinate
 from textual.reactive import reactive
 from textual.screen import Screen
-from textual.widgets import Footer, Header, RadioButton, RadioSet
+from textual.widgets import DataTable, Footer, Header, Input
+from textual.worker import get_current_worker
 
 from tasks.service.logging_service import get_logger
+from tasks.service.search_index import SearchIndex
 from tasks.service.task_service import (
     archive_task,
     delete_done_task,
@@ -12,7 +23,7 @@ from tasks.service.task_service import (
     move_task_to_done,
     open_task_in_editor,
 )
-from tasks.task.task import Task, TaskStatus
+from tasks.task.task import Task, TaskStatus, parse_task_id
 from tasks.tui.context import ContextClass
 from tasks.tui.new_task_screen import NewTask
 
@@ -24,6 +35,24 @@ MOVE_TO_DOING = 'move_to_doing'
 DELETE_DONE = 'delete_done'
 REFRESH_TASKS = 'refresh_tasks'
 ARCHIVE_TASK = 'archive_task'
+FILTER_TASKS = 'filter_tasks'
+CLEAR_FILTER = 'clear_filter'
+
+PANELS = ('doing_tasks', 'done_tasks')
+# column key -> label, width (None = the remaining width)
+COLUMNS = {
+    'task_id': ('Task ID', 12),
+    'repository': ('Repository', 24),
+    'project': ('Project', 16),
+    'updated_at': ('Updated', 16),
+    'oneliner': ('Oneliner', None),
+}
+# rows and progress streamed to the tables at most this often, in seconds
+STREAM_INTERVAL = 0.1
+# id suffix of the table showing the filtered tasks of a panel
+MATCHES = '_matches'
+# best matches shown per table while filtering
+FILTER_LIMIT = 100
 
 
 class Tasks(Screen, ContextClass):
@@ -37,96 +66,297 @@ class Tasks(Screen, ContextClass):
         ('x', DELETE_DONE, 'Delete done task'),
         ('r', REFRESH_TASKS, 'Refresh tasks'),
         ('a', ARCHIVE_TASK, 'Archive task'),
+        ('/', FILTER_TASKS, 'Filter tasks'),
+        Binding('escape', CLEAR_FILTER, 'Clear filter', show=False),
     ]
 
-    doing_tasks: list[Task] = []
-    done_tasks: list[Task] = []
-
-    current_task: Task | None = reactive(None, bindings=True)
+    current_task: Task | None = reactive(None)
 
     def __init__(self, *args, **kwargs) -> None:
         self.selected_task_id = kwargs.pop('selected_task_id', None)
         self.refresh_tasks = kwargs.pop('refresh_tasks', False)
         super().__init__(*args, **kwargs)
+        # panel id -> row key -> row
+        self._rows: dict[str, dict[str, TaskRow]] = {panel: {} for panel in PANELS}
+        # panel id -> search index of its tasks by row key, filled by the
+        # loading workers
+        self._search: dict[str, SearchIndex] = {
+            panel: SearchIndex() for panel in PANELS
+        }
+        self.filter_query = ''
+        # column key and reverse order of the tables
+        self.sort_column = 'task_id'
+        self.sort_reverse = False
 
     def compose(self) -> ComposeResult:
-        ids = set()
-
-        def get_task_id(task: Task, prefix: str) -> str:
-            id = f'{prefix}_{task.id}'
-            index = 0
-            while id in ids:
-                index += 1
-                id = f'{prefix}_{task.id}_{index}'
-            ids.add(id)
-            return id
-
         yield Header()
+        yield Input(placeholder='Filter tasks', id='task_filter')
         with Horizontal():
-            self.doing_tasks = self.context.get_doing_tasks(refresh=self.refresh_tasks)
-            tasks = (
-                RadioButton(
-                    label=task.short_name,
-                    id=get_task_id(task, 'doing_tasks_radio'),
-                    tooltip=task_tooltip(task),
-                    compact=True,
-                    value=self.selected_task_id == task.id,
-                )
-                for task in self.doing_tasks
+            for panel_id, title in zip(PANELS, ['Doing Tasks', 'Done Tasks']):
+                # all the tasks, and the best matches of the filter: hiding
+                # the rows of a large table is slower than filling another one
+                for table_id in (panel_id, f'{panel_id}{MATCHES}'):
+                    table = DataTable(
+                        id=table_id,
+                        classes=panel_id,
+                        cursor_type='row',
+                        zebra_stripes=True,
+                    )
+                    for column_key, (label, width) in COLUMNS.items():
+                        table.add_column(label, width=width, key=column_key)
+                    table.border_title = title
+                    table.display = table_id == panel_id
+                    yield table
+
+        yield Footer()
+
+    def load_tasks(self) -> None:
+        """Stream the tasks of both tables from background workers"""
+        for status, panel_id in zip([TaskStatus.IN_PROGRESS, TaskStatus.DONE], PANELS):
+            self.run_worker(
+                partial(self._stream_tasks, status, panel_id),
+                thread=True,
+                group=f'load_{panel_id}',
+                exclusive=True,
             )
-            radio_set = RadioSet(*tasks, id='doing_tasks')
-            radio_set.border_title = 'Doing Tasks'
-            yield radio_set
-
-            self.done_tasks = self.context.get_done_tasks(refresh=self.refresh_tasks)
-            tasks = (
-                RadioButton(
-                    label=task.short_name,
-                    id=get_task_id(task, 'done_tasks_radio'),
-                    tooltip=task_tooltip(task),
-                    compact=True,
-                    value=self.selected_task_id == task.id,
-                )
-                for task in self.done_tasks
+
+    def reload_tasks(
+        self, selected_task_id: str | None = None, refresh: bool = False
+    ) -> None:
+        """Reload both tables in place, applying only the differences to the
+        rows. selected_task_id gets the cursor when it shows up"""
+        self.selected_task_id = selected_task_id
+        self.refresh_tasks = refresh
+        # the moves update the current task in place
+        self.refresh_bindings()
+        self.load_tasks()
+
+    def _stream_tasks(self, status: TaskStatus, panel_id: str) -> None:
+        worker = get_current_worker()
+
+        progress_at = time.monotonic()
+
+        def progress(read: int, total: int) -> None:
+            nonlocal progress_at
+            if worker.is_cancelled or time.monotonic() - progress_at < STREAM_INTERVAL:
+                return
+            progress_at = time.monotonic()
+            self.app.call_from_thread(self._set_progress, panel_id, read, total)
+
+        # the first load shows the tasks as they are read, in batches, and
+        # reloads at once
+        stream = not self._rows[panel_id]
+        search = self._search[panel_id]
+        tasks: list[Task] = []
+        streamed, streamed_at = 0, time.monotonic()
+        for task in self.context.iter_tasks(status, self.refresh_tasks, progress):
+            if worker.is_cancelled:
+                return
+            tasks.append(task)
+            search.add(str(task.directory), task_search_fields(task))
+            # each batch re-sorts the table, so they grow with it
+            if (
+                stream
+                and time.monotonic() - streamed_at >= STREAM_INTERVAL
+                and len(tasks) - streamed >= streamed // 4
+            ):
+                self.app.call_from_thread(self._add_tasks, panel_id, tasks[streamed:])
+                streamed, streamed_at = len(tasks), time.monotonic()
+        if worker.is_cancelled:
+            return
+        search.retain({str(task.directory) for task in tasks})
+        self.app.call_from_thread(self._apply_tasks, panel_id, tasks)
+        self.app.call_from_thread(self._set_progress, panel_id, 0, 0)
+
+    def _set_progress(self, panel_id: str, read: int, total: int) -> None:
+        table = self.query_one(f'#{panel_id}', DataTable)
+        table.border_subtitle = f'Loading {read}/{total}' if read < total else ''
+
+    def _add_tasks(self, panel_id: str, tasks: list[Task]) -> None:
+        """Add the rows of tasks and sort the table, keeping the cursor row"""
+        if not tasks:
+            return
+        table = self.query_one(f'#{panel_id}', DataTable)
+        rows = self._rows[panel_id]
+        with _KeepCursor(table):
+            for task in tasks:
+                row = TaskRow.of(task)
+                rows[row.key] = row
+                table.add_row(*row.cells, key=row.key)
+            self._sort_table(table)
+        self._filter_table(panel_id)
+        self._select_task_id(panel_id)
+
+    def _apply_tasks(self, panel_id: str, tasks: list[Task]) -> None:
+        """Bring a table to tasks: remove, update and add only the rows of the
+        tasks that changed, keeping the cursor on its task"""
+        rows = self._rows[panel_id]
+        diff = diff_tasks(rows.values(), tasks)
+        if diff:
+            table = self.query_one(f'#{panel_id}', DataTable)
+            with _KeepCursor(table):
+                for key in diff.removed:
+                    row = rows.pop(key)
+                    table.remove_row(key)
+                    if (
+                        row.task is self.current_task
+                        and not row.task.directory.exists()
+                    ):
+                        self.current_task = None
+                for task in diff.changed:
+                    row = TaskRow.of(task)
+                    old_row, rows[row.key] = rows[row.key], row
+                    for column_key, cell, old_cell in zip(
+                        COLUMNS, row.cells, old_row.cells
+                    ):
+                        if cell != old_cell:
+                            table.update_cell(row.key, column_key, cell)
+                    if self.current_task is old_row.task:
+                        self.current_task = task
+                for task in diff.added:
+                    row = TaskRow.of(task)
+                    rows[row.key] = row
+                    table.add_row(*row.cells, key=row.key)
+                if diff.added or (diff.changed and self.sort_column != 'task_id'):
+                    self._sort_table(table)
+            get_logger(__name__).debug(
+                'Tasks %s: %d added, %d changed, %d removed',
+                panel_id,
+                len(diff.added),
+                len(diff.changed),
+                len(diff.removed),
             )
-            radio_set = RadioSet(*tasks, id='done_tasks')
-            radio_set.border_title = 'Done Tasks'
-            yield radio_set
+            self._filter_table(panel_id)
+        self._select_task_id(panel_id)
+
+    def _sort_table(self, table: DataTable) -> None:
+        table.sort(
+            self.sort_column,
+            key=SORT_KEYS[self.sort_column],
+            reverse=self.sort_reverse,
+        )
 
-        yield Footer()
+    def _filter_table(self, panel_id: str) -> None:
+        """Show the best matches of filter_query in the matches table of a
+        panel, or its table of all the tasks without filter"""
+        table = self.query_one(f'#{panel_id}', DataTable)
+        matches_table = self.query_one(f'#{panel_id}{MATCHES}', DataTable)
+        filtering = bool(self.filter_query.strip())
+        if filtering != matches_table.display:
+            table.display, matches_table.display = not filtering, filtering
+            if self.focused in (table, matches_table):
+                (matches_table if filtering else table).focus()
+        if not filtering:
+            matches_table.clear()
+            return
+
+        started_at = time.perf_counter()
+        rows = self._rows[panel_id]
+        keys = [
+            key
+            for key in self._search[panel_id].search(self.filter_query)
+            if key in rows
+        ]
+        searched_at = time.perf_counter()
+        matches_table.clear()
+        for key in keys[:FILTER_LIMIT]:
+            matches_table.add_row(*rows[key].cells, key=key)
+        matches_table.border_subtitle = (
+            f'{FILTER_LIMIT} of {len(keys)} matches'
+            if len(keys) > FILTER_LIMIT
+            else f'{len(keys)} matches'
+        )
+        if matches_table.has_focus:
+            self._show_current_task(matches_table)
+        get_logger(__name__).debug(
+            'Filter %s %r: %d matches, searched in %.1fms, shown in %.1fms',
+            panel_id,
+            self.filter_query,
+            len(keys),
+            (searched_at - started_at) * 1000,
+            (time.perf_counter() - searched_at) * 1000,
+        )
 
-    @property
-    def selected_task(self) -> Task | None:
-        if doing_radio_set := self.query_exactly_one('#doing_tasks'):
-            if doing_radio_set.pressed_index >= 0:
-                return self.doing_tasks[doing_radio_set.pressed_index]
-        if done_radio_set := self.query_exactly_one('#done_tasks'):
-            if done_radio_set.pressed_index >= 0:
-                return self.done_tasks[done_radio_set.pressed_index]
-        return None
-
-    def on_radio_set_changed(self, event: RadioSet.Changed) -> None:
-        if event.radio_set.id == 'doing_tasks':
-            self.current_task = self.doing_tasks[event.radio_set.pressed_index]
-            other_radio_set: RadioSet = self.query_exactly_one('#done_tasks')
-
-        elif event.radio_set.id == 'done_tasks':
-            self.current_task = self.done_tasks[event.radio_set.pressed_index]
-            other_radio_set = self.query_exactly_one('#doing_tasks')
+    def _panel_table(self, panel_id: str) -> DataTable:
+        """The table shown in a panel"""
+        suffix = MATCHES if self.filter_query.strip() else ''
+        return self.query_one(f'#{panel_id}{suffix}', DataTable)
 
+    def _select_task_id(self, panel_id: str) -> None:
+        """Move the cursor (and the focus) to the selected_task_id row"""
+        if not self.selected_task_id:
+            return
+        table = self._panel_table(panel_id)
+        for row in self._rows[panel_id].values():
+            if row.task.id == self.selected_task_id and row.key in table.rows:
+                self.selected_task_id = None
+                table.move_cursor(row=table.get_row_index(row.key), scroll=True)
+                table.focus()
+                self.current_task = row.task
+                return
+
+    def _table_task(self, table: DataTable) -> Task | None:
+        """The task at the cursor of a table"""
+        if not table.row_count:
+            return None
+        row_key = table.coordinate_to_cell_key(table.cursor_coordinate).row_key
+        row = self._rows[table.id.removesuffix(MATCHES)].get(row_key.value)
+        return row.task if row else None
+
+    def watch_current_task(self, old: Task | None, new: Task | None) -> None:
+        # the allowed actions only depend on the status, and refreshing the
+        # footer on every cursor move is slow
+        if (old and old.status) != (new and new.status):
+            self.refresh_bindings()
+
+    def on_data_table_row_highlighted(self, event: DataTable.RowHighlighted) -> None:
+        if event.data_table.has_focus:
+            self._show_current_task(event.data_table)
+
+    def on_descendant_focus(self, event: events.DescendantFocus) -> None:
+        if isinstance(event.widget, DataTable):
+            self._show_current_task(event.widget)
+
+    def _show_current_task(self, table: DataTable) -> None:
+        self.current_task = self._table_task(table)
+        table.tooltip = task_tooltip(self.current_task) if self.current_task else None
+        get_logger(__name__).debug('Current task: %s', self.current_task)
+
+    def on_data_table_header_selected(self, event: DataTable.HeaderSelected) -> None:
+        """Sort both tables by the clicked column, reversed on a second click;
+        the matches of the filter stay ranked"""
+        column_key = event.column_key.value
+        if column_key == self.sort_column:
+            self.sort_reverse = not self.sort_reverse
         else:
-            self.current_task = None
-            other_radio_set = None
-        if other_radio_set:
-            for button in other_radio_set.query('RadioButton'):
-                button.value = False
-        get_logger(__name__).info('Current task: %s', self.current_task)
+            self.sort_column, self.sort_reverse = column_key, False
+        for panel_id in PANELS:
+            table = self.query_one(f'#{panel_id}', DataTable)
+            for key, column in table.columns.items():
+                label = COLUMNS[key.value][0]
+                if key.value == self.sort_column:
+                    label += ' ▼' if self.sort_reverse else ' ▲'
+                column.label = Text(label)
+            with _KeepCursor(table):
+                self._sort_table(table)
+
+    def on_input_changed(self, event: Input.Changed) -> None:
+        self.filter_query = event.value
+        for panel_id in PANELS:
+            self._filter_table(panel_id)
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        """Go to the best match"""
+        for panel_id in PANELS:
+            if (table := self._panel_table(panel_id)).row_count:
+                table.move_cursor(row=0)
+                table.focus()
+                return
 
     def on_mount(self) -> None:
-        if doing_tasks := self.query_one('#doing_tasks'):
-            doing_tasks.focus()
-
+        self.query_one('#doing_tasks', DataTable).focus()
         self.refresh_bindings()
+        self.load_tasks()
 
     def action_new_task(self) -> None:
         def check_new_task_result(result) -> None:
@@ -134,7 +364,7 @@ class Tasks(Screen, ContextClass):
                 return
             self.app.notify(result[1], severity='success' if result[0] else 'error')
             if result[2]:
-                self.dismiss(result[2])
+                self.reload_tasks(result[2])
 
         self.app.push_screen(NewTask(), check_new_task_result)
 
@@ -162,7 +392,7 @@ class Tasks(Screen, ContextClass):
         self.app.notify(
             message=f'Task {self.current_task.id} moved to done', severity='success'
         )
-        self.dismiss(self.current_task.id)
+        self.reload_tasks(self.current_task.id)
 
     def action_move_to_doing(self) -> None:
         if not self.can_move_to_doing():
@@ -176,7 +406,7 @@ class Tasks(Screen, ContextClass):
         self.app.notify(
             message=f'Task {self.current_task.id} moved to doing', severity='success'
         )
-        self.dismiss(self.current_task.id)
+        self.reload_tasks(self.current_task.id)
 
     def action_delete_done(self) -> None:
         if not self.can_delete_done():
@@ -186,10 +416,25 @@ class Tasks(Screen, ContextClass):
             self.app.notify(message=error_message, severity='error')
             return
         self.app.notify(message='Task deleted', severity='success')
-        self.dismiss(self.current_task.id)
+        self.reload_tasks()
 
     def action_refresh_tasks(self) -> None:
-        self.dismiss('00000-0')
+        self.reload_tasks(refresh=True)
+
+    def action_filter_tasks(self) -> None:
+        self.query_one('#task_filter', Input).focus()
+
+    def action_clear_filter(self) -> None:
+        """Show all the tasks again, with the cursor on the current task"""
+        task_filter = self.query_one('#task_filter', Input)
+        self.selected_task_id = self.current_task and self.current_task.id
+        task_filter.value = ''
+        self.filter_query = ''
+        for panel_id in PANELS:
+            self._filter_table(panel_id)
+        self.query_one('#doing_tasks', DataTable).focus()
+        for panel_id in PANELS:
+            self._select_task_id(panel_id)
 
     def action_archive_task(self) -> None:
         if not self.can_archive_task():
@@ -200,7 +445,7 @@ class Tasks(Screen, ContextClass):
         try:
             message = archive_task(self.context.config, self.current_task)
             self.app.notify(message=message, severity='success')
-            self.dismiss('00000-0')
+            self.reload_tasks()
         except Exception as e:
             self.app.notify(message=f'{e}', severity='error')
 
@@ -219,6 +464,9 @@ class Tasks(Screen, ContextClass):
             result = self.can_delete_done()
         elif action == ARCHIVE_TASK:
             result = self.can_archive_task()
+        elif action == CLEAR_FILTER:
+            # escape quits the app otherwise
+            result = self.can_clear_filter()
 
         else:
             return True
@@ -240,6 +488,127 @@ class Tasks(Screen, ContextClass):
     def can_archive_task(self) -> bool:
         return self.current_task and self.current_task.status == TaskStatus.DONE
 
+    def can_clear_filter(self) -> bool:
+        task_filter = self.query_one('#task_filter', Input)
+        return bool(task_filter.value) or task_filter.has_focus
+
+
+def task_search_fields(task: Task) -> tuple[str, ...]:
+    """The texts the filter searches: task id, repository, project and
+    oneliner"""
+    return (
+        task.id,
+        task.repo.repository_name or '',
+        task.repo.project_name or '',
+        task.oneliner or '',
+    )
+
+
+def task_tooltip(task: Task) -> str:
+    tooltip = f'[b]{task.repo.project_name} - {task.repo.repository_name}[/b]\n\n{task.short_directory}\n\n[i]{task.oneliner}[/i]'
+    if task.group:
+        tooltip += f'\n\nRepositories: {", ".join(task.group)}'
+    return tooltip
+
+
+@cache
+def task_id_sort_key(task_id: str) -> tuple[int, int, str, int]:
+    """Numeric-aware sort key of a task id: 9-0 < 10-0 < 10-1 < ABC-0"""
+    number, version = parse_task_id(task_id)
+    if number.isdigit():
+        return 0, int(number), '', int(version)
+    return 1, 0, number.casefold(), int(version)
+
+
+def _text_sort_key(cell: Text) -> str:
+    return cell.plain.casefold()
+
+
+# column key -> sort key of its cells
+SORT_KEYS: dict[str, Callable[[Any], Any]] = {
+    'task_id': lambda cell: task_id_sort_key(cell.plain),
+    'repository': _text_sort_key,
+    'project': _text_sort_key,
+    'updated_at': lambda cell: cell.plain,  # yyyy-mm-dd hh:mm
+    'oneliner': _text_sort_key,
+}
+
+
+@dataclass
+class TaskRow:
+    """A task as its table row shows it"""
+
+    task: Task
+    key: str  # task directory when shown, the task may be moved since
+    cells: tuple[Any, ...]  # one per column of COLUMNS
+
+    @classmethod
+    def of(cls, task: Task) -> 'TaskRow':
+        task_id_sort_key(task.id)  # computed once, sorting reuses it
+        return cls(
+            task=task,
+            key=str(task.directory),
+            # Text cells are not parsed as markup
+            cells=(
+                Text(task.id),
+                Text(task.repo.repository_name or ''),
+                Text(task.repo.project_name or ''),
+                Text(task.updated_at.strftime('%Y-%m-%d %H:%M')),
+                Text(task.oneliner or ''),
+            ),
+        )
+
+    def shows(self, task: Task) -> bool:
+        """Whether the row shows task as it is: the same object (tasks are
+        re-read when their directory changes), with the same oneliner (the
+        oneliner queue updates it in place)"""
+        return task is self.task and self.cells[-1].plain == (task.oneliner or '')
+
+
+class _KeepCursor:
+    """Keeps the cursor of a table on its row while rows are added, removed
+    and sorted; on the same index when the row is removed"""
 
-def task_tooltip(task) -> str:
-    return f'[b]{task.repo.project_name} - {task.repo.repository_name}[/b]\n\n{task.short_directory}\n\n[i]{task.oneliner}[/i]'
+    def __init__(self, table: DataTable) -> None:
+        self.table = table
+        self.row_key = None
+        self.row = 0
+
+    def __enter__(self) -> None:
+        if self.table.row_count:
+            self.row = self.table.cursor_row
+            self.row_key = self.table.coordinate_to_cell_key(
+                Coordinate(self.row, 0)
+            ).row_key
+
+    def __exit__(self, *args) -> None:
+        if not self.table.row_count:
+            return
+        if self.row_key is not None and self.row_key in self.table.rows:
+            row = self.table.get_row_index(self.row_key)
+        else:
+            row = min(self.row, self.table.row_count - 1)
+        self.table.move_cursor(row=row, scroll=False)
+
+
+@dataclass
+class TaskListDiff:
+    removed: list[str] = field(default_factory=list)  # row keys
+    changed: list[Task] = field(default_factory=list)  # re-read, same directory
+    added: list[Task] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.removed or self.changed or self.added)
+
+
+def diff_tasks(rows: Iterable[TaskRow], tasks: list[Task]) -> TaskListDiff:
+    """The rows to remove and the tasks to update and add to show tasks"""
+    diff = TaskListDiff()
+    new = {str(task.directory): task for task in tasks}
+    for row in rows:
+        if (task := new.pop(row.key, None)) is None:
+            diff.removed.append(row.key)
+        elif not row.shows(task):
+            diff.changed.append(task)
+    diff.added = list(new.values())
+    return diff
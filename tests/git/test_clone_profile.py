@@ -0,0 +1,39 @@
+import unittest
+
+from tasks.git.clone_profile import CloneProfile
+
+
+class TestCloneProfile(unittest.TestCase):
+    def test_clone_args(self):
+        self.assertEqual(CloneProfile().clone_args(), [])
+        self.assertFalse(CloneProfile().is_reduced)
+        self.assertEqual(
+            CloneProfile(mode='blobless', single_branch=True).clone_args(),
+            ['--filter=blob:none', '--single-branch'],
+        )
+        self.assertEqual(
+            CloneProfile(mode='treeless', depth=10).clone_args(),
+            ['--filter=tree:0', '--depth', '10', '--no-single-branch'],
+        )
+
+    def test_deepen_commands(self):
+        self.assertEqual(CloneProfile().deepen_commands(), [])
+        self.assertEqual(
+            CloneProfile(
+                mode='blobless', depth=1, single_branch=True
+            ).deepen_commands(),
+            [
+                ['remote', 'set-branches', 'origin', '*'],
+                ['config', '--unset', 'remote.origin.partialclonefilter'],
+                ['fetch', '--quiet', 'origin', '--unshallow', '--refetch'],
+            ],
+        )
+
+    def test_from_dict(self):
+        profile = CloneProfile.from_dict(
+            {'mode': 'blobless', 'depth': '5', 'deepen': 1}
+        )
+        self.assertEqual(profile, CloneProfile(mode='blobless', depth=5, deepen=True))
+        self.assertEqual(CloneProfile.from_dict(profile.to_dict()), profile)
+        with self.assertRaises(ValueError):
+            CloneProfile.from_dict({'mode': 'sparse'})
@@ -0,0 +1,38 @@
+from unittest import TestCase
+
+from tasks.git.clone_progress import CloneProgressTracker, parse_clone_progress
+
+
+class TestParseCloneProgress(TestCase):
+    def test_receiving_objects(self):
+        progress = parse_clone_progress(
+            'Receiving objects:  45% (450/1000), 1.20 MiB | 2.40 MiB/s'
+        )
+        self.assertEqual(progress.phase, 'Receiving objects')
+        self.assertEqual(
+            (progress.percent, progress.done, progress.total), (45, 450, 1000)
+        )
+        self.assertEqual((progress.received, progress.rate), ('1.20 MiB', '2.40 MiB/s'))
+        self.assertEqual(
+            progress.describe(),
+            'Receiving objects: 45% (450/1000), 1.20 MiB | 2.40 MiB/s',
+        )
+
+    def test_remote_and_other_lines(self):
+        progress = parse_clone_progress('remote: Counting objects: 100% (5/5), done.')
+        self.assertEqual((progress.phase, progress.percent), ('Counting objects', 100))
+        self.assertIsNone(parse_clone_progress("Cloning into 'repo'..."))
+        self.assertIsNone(parse_clone_progress('warning: redirecting to https://x'))
+
+
+class TestCloneProgressTracker(TestCase):
+    def test_eta(self):
+        now = [0.0]
+        tracker = CloneProgressTracker(clock=lambda: now[0])
+        self.assertIsNone(tracker.update('Receiving objects:   0% (0/100)').eta)
+        now[0] = 10.0
+        progress = tracker.update('Receiving objects:  25% (25/100)')
+        self.assertEqual(progress.eta, 30.0)
+        self.assertTrue(progress.describe().endswith('ETA 0:30'))
+        # a new phase restarts the clock
+        self.assertIsNone(tracker.update('Resolving deltas:  50% (1/2)').eta)
@@ -0,0 +1,219 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from tasks.git.config_reader import (
+    UnsupportedGitConfig,
+    parse_config,
+    read_repository_config,
+    rewrite_url,
+)
+from tasks.git.git_config import GitConfig
+
+
+def write_repo(directory: Path, config: str) -> Path:
+    git_dir = directory / '.git'
+    git_dir.mkdir(parents=True, exist_ok=True)
+    (git_dir / 'config').write_text(config, encoding='utf-8')
+    (git_dir / 'HEAD').write_text('ref: refs/heads/main\n', encoding='utf-8')
+    return directory
+
+
+class TestConfigReader(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp_dir.name)
+        self.global_config = self.root / 'global.gitconfig'
+        self.global_config.write_text('', encoding='utf-8')
+        env = patch.dict(
+            os.environ,
+            {
+                'GIT_CONFIG_NOSYSTEM': '1',
+                'GIT_CONFIG_GLOBAL': str(self.global_config),
+            },
+        )
+        env.start()
+        self.addCleanup(env.stop)
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def test_parse_config(self):
+        entries = parse_config(
+            '# comment\n'
+            '[core]\n'
+            '\tbare = false ; trailing comment\n'
+            '\tfilemode\n'
+            '[remote "Up Stream"]\n'
+            '\turl = "https://example.com/org/repo.git"  # comment\n'
+            '[Branch "main"]\n'
+            '\tRemote = origin\n'
+        )
+        self.assertEqual(
+            entries,
+            [
+                ('core.bare', 'false'),
+                ('core.filemode', 'true'),
+                ('remote.Up Stream.url', 'https://example.com/org/repo.git'),
+                ('branch.main.remote', 'origin'),
+            ],
+        )
+
+    def test_remote_prefers_origin_and_push_url(self):
+        repo = write_repo(
+            self.root / 'repo',
+            '[remote "fork"]\n\turl = https://example.com/me/repo.git\n'
+            '[remote "origin"]\n\turl = https://example.com/org/repo.git\n'
+            '\tpushurl = git@example.com:org/repo.git\n',
+        )
+        config = GitConfig(directory=str(repo))
+        self.assertTrue(config.is_git_directory)
+        self.assertEqual(config.remote_name, 'origin')
+        self.assertEqual(config.remote_url, 'git@example.com:org/repo.git')
+        self.assertEqual((config.project_name, config.repository_name), ('org', 'repo'))
+
+    def test_instead_of_from_global_config(self):
+        self.global_config.write_text(
+            '[url "git@github.com:"]\n\tinsteadOf = https://github.com/\n'
+            '[url "ssh://push.example.com/"]\n\tpushInsteadOf = https://example.com/\n',
+            encoding='utf-8',
+        )
+        repo = write_repo(
+            self.root / 'repo',
+            '[remote "origin"]\n\turl = https://github.com/org/repo.git\n',
+        )
+        config = read_repository_config(repo)
+        self.assertEqual(
+            config.remote_url('origin', push=True), 'git@github.com:org/repo.git'
+        )
+
+        repo = write_repo(
+            self.root / 'other',
+            '[remote "origin"]\n\turl = https://example.com/org/repo.git\n',
+        )
+        config = read_repository_config(repo)
+        self.assertEqual(
+            config.remote_url('origin', push=True),
+            'ssh://push.example.com/org/repo.git',
+        )
+        self.assertEqual(
+            config.remote_url('origin'), 'https://example.com/org/repo.git'
+        )
+
+    def test_rewrite_url_uses_longest_prefix(self):
+        rewrites = {'https://': 'x://', 'https://github.com/': 'gh:'}
+        self.assertEqual(rewrite_url('https://github.com/a/b', rewrites), 'gh:a/b')
+        self.assertEqual(rewrite_url('ssh://host/a/b', rewrites), 'ssh://host/a/b')
+
+    def test_include_and_include_if(self):
+        (self.root / 'work.gitconfig').write_text(
+            '[url "git@work.com:"]\n\tinsteadOf = work:\n', encoding='utf-8'
+        )
+        (self.root / 'other.gitconfig').write_text(
+            '[url "git@other.com:"]\n\tinsteadOf = work:\n', encoding='utf-8'
+        )
+        (self.root / 'base.gitconfig').write_text(
+            '[includeIf "gitdir:work/"]\n\tpath = work.gitconfig\n', encoding='utf-8'
+        )
+        self.global_config.write_text(
+            '[include]\n\tpath = base.gitconfig\n'
+            '[includeIf "gitdir:~/not-here/"]\n\tpath = other.gitconfig\n'
+            '[includeIf "onbranch:feature/"]\n\tpath = other.gitconfig\n',
+            encoding='utf-8',
+        )
+        repo = write_repo(
+            self.root / 'work' / 'repo',
+            '[remote "origin"]\n\turl = work:org/repo.git\n',
+        )
+        config = read_repository_config(repo)
+        self.assertEqual(config.remote_url('origin'), 'git@work.com:org/repo.git')
+
+    def test_onbranch_does_not_match_detached_head(self):
+        (self.root / 'other.gitconfig').write_text(
+            '[url "git@other.com:"]\n\tinsteadOf = https://example.com/\n',
+            encoding='utf-8',
+        )
+        self.global_config.write_text(
+            '[includeIf "onbranch:**"]\n\tpath = other.gitconfig\n',
+            encoding='utf-8',
+        )
+        repo = write_repo(
+            self.root / 'repo',
+            '[remote "origin"]\n\turl = https://example.com/org/repo.git\n',
+        )
+        config = read_repository_config(repo)
+        self.assertEqual(config.remote_url('origin'), 'git@other.com:org/repo.git')
+
+        (repo / '.git' / 'HEAD').write_text(
+            '0123456789abcdef0123456789abcdef01234567\n', encoding='utf-8'
+        )
+        config = read_repository_config(repo)
+        self.assertEqual(
+            config.remote_url('origin'), 'https://example.com/org/repo.git'
+        )
+
+    def test_remotes_without_url(self):
+        repo = write_repo(
+            self.root / 'repo',
+            '[remote "upstream"]\n\tfetch = +refs/heads/*:refs/remotes/upstream/*\n'
+            '[remote "fork"]\n\turl = https://example.com/me/repo.git\n',
+        )
+        config = read_repository_config(repo)
+        self.assertEqual(config.remotes, ['upstream', 'fork'])
+        self.assertEqual(config.remote_url('upstream'), '')
+
+    def test_worktree_git_file(self):
+        main = write_repo(
+            self.root / 'main',
+            '[remote "origin"]\n\turl = https://example.com/org/repo.git\n',
+        )
+        worktree_git_dir = main / '.git' / 'worktrees' / 'task'
+        worktree_git_dir.mkdir(parents=True)
+        (worktree_git_dir / 'commondir').write_text('../..\n', encoding='utf-8')
+        (worktree_git_dir / 'HEAD').write_text(
+            'ref: refs/heads/task\n', encoding='utf-8'
+        )
+        worktree = self.root / 'task'
+        worktree.mkdir()
+        (worktree / '.git').write_text(
+            f'gitdir: {worktree_git_dir}\n', encoding='utf-8'
+        )
+
+        config = GitConfig(directory=str(worktree))
+        self.assertTrue(config.is_git_directory)
+        self.assertEqual(config.remote_url, 'https://example.com/org/repo.git')
+
+    def test_not_a_git_directory(self):
+        self.assertIsNone(read_repository_config(self.root))
+        self.assertFalse(GitConfig(directory=str(self.root)).is_git_directory)
+
+    @patch('tasks.git.git_config.subprocess.run')
+    def test_unsupported_config_falls_back_to_git(self, mock_run):
+        self.global_config.write_text(
+            '[includeIf "hasconfig:remote.*.url:https://**"]\n\tpath = x\n',
+            encoding='utf-8',
+        )
+        repo = write_repo(
+            self.root / 'repo',
+            '[remote "origin"]\n\turl = https://example.com/org/repo.git\n',
+        )
+        with self.assertRaises(UnsupportedGitConfig):
+            read_repository_config(repo)
+
+        mock_run.side_effect = [
+            Mock(returncode=0, stdout='origin\n', stderr=''),
+            Mock(returncode=0, stdout='https://example.com/org/repo.git\n', stderr=''),
+        ]
+        config = GitConfig(directory=str(repo))
+        self.assertEqual(mock_run.call_count, 2)
+        self.assertEqual(config.remote_url, 'https://example.com/org/repo.git')
+
+    @patch('tasks.git.git_config.subprocess.run')
+    def test_supported_config_does_not_spawn_git(self, mock_run):
+        repo = write_repo(
+            self.root / 'repo',
+            '[remote "origin"]\n\turl = https://example.com/org/repo.git\n',
+        )
+        for _ in range(100):
+            GitConfig(directory=str(repo))
+        mock_run.assert_not_called()
@@ -0,0 +1,73 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from tasks.git.git_config import GitConfig
+from tasks.git.repo_index import RepoIndex
+
+
+def make_repo(directory: Path, remote_url: str) -> Path:
+    (directory / '.git').mkdir(parents=True)
+    (directory / '.git' / 'config').write_text(
+        f'[remote "origin"]\n\turl = {remote_url}\n', encoding='utf-8'
+    )
+    return directory
+
+
+class TestRepoIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.root = Path(self.tmp_dir.name) / 'repos'
+        self.index_file = Path(self.tmp_dir.name) / 'config' / '.repos_index.json'
+        make_repo(self.root / 'repo-a', 'https://example.com/org/repo-a.git')
+        make_repo(self.root / 'repo-b', 'https://example.com/org/repo-b.git')
+
+    def build_index(self) -> RepoIndex:
+        index = RepoIndex(self.index_file)
+        index.rebuild([str(self.root)])
+        return index
+
+    def test_rebuild_and_load(self):
+        self.build_index()
+        index = RepoIndex(self.index_file).load()
+        self.assertTrue(index.is_indexed(str(self.root)))
+        self.assertEqual(
+            [repo.repository_name for repo in index.repos_under(str(self.root))],
+            ['repo-a', 'repo-b'],
+        )
+
+    def test_warm_refresh_does_not_parse_unchanged_repos(self):
+        self.build_index()
+        index = RepoIndex(self.index_file).load()
+        with patch('tasks.git.repo_index.GitConfig', side_effect=GitConfig) as parse:
+            index.refresh()
+        parse.assert_not_called()
+
+    def test_refresh_reparses_changed_and_drops_removed(self):
+        self.build_index()
+        (self.root / 'repo-a' / '.git' / 'config').write_text(
+            '[remote "origin"]\n\turl = https://example.com/other/renamed.git\n',
+            encoding='utf-8',
+        )
+        (self.root / 'repo-a' / 'README.md').write_text('# Repo A\n')
+        shutil.rmtree(self.root / 'repo-b')
+        make_repo(self.root / 'repo-c', 'https://example.com/org/repo-c.git')
+
+        index = RepoIndex(self.index_file).load()
+        index.refresh()
+        repos = index.repos_under(str(self.root))
+
+        self.assertEqual(
+            [(repo.project_name, repo.repository_name) for repo in repos],
+            [('other', 'renamed'), ('org', 'repo-c')],
+        )
+        self.assertEqual(repos[0].readme_description, 'Repo A')
+
+    def test_rebuild_in_background(self):
+        index = RepoIndex(self.index_file)
+        index.rebuild_in_background([str(self.root)]).join(timeout=10)
+        self.assertEqual(len(index.repos_under(str(self.root))), 2)
+        self.assertTrue(self.index_file.exists())
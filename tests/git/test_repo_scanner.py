@@ -0,0 +1,105 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from tasks.git import find_repos, scan_repos
+from tasks.git.repo_scanner import scan_repo_directories
+
+
+def make_repo(directory: Path, remote_url: str = '') -> Path:
+    (directory / '.git').mkdir(parents=True)
+    (directory / '.git' / 'config').write_text(
+        f'[remote "origin"]\n\turl = {remote_url}\n' if remote_url else '',
+        encoding='utf-8',
+    )
+    return directory
+
+
+class TestScanRepoDirectories(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.root = Path(self.tmp_dir.name)
+        make_repo(self.root / 'a' / 'repo1')
+        make_repo(self.root / 'a' / 'repo1' / 'nested')
+        make_repo(self.root / 'b' / 'deep' / 'repo2')
+        make_repo(self.root / 'node_modules' / 'pkg')
+        make_repo(self.root / '.cache' / 'repo3')
+        (self.root / 'c').mkdir()
+        (self.root / 'c' / '.git').write_text('gitdir: /somewhere\n')
+
+    def test_prunes_repositories_and_excludes(self):
+        result = scan_repo_directories(self.root)
+        self.assertTrue(result.complete)
+        self.assertEqual(
+            result.directories,
+            [
+                str(self.root / 'a' / 'repo1'),
+                str(self.root / 'b' / 'deep' / 'repo2'),
+                str(self.root / 'c'),
+            ],
+        )
+
+    def test_custom_excludes_and_max_depth(self):
+        result = scan_repo_directories(self.root, exclude=['b'], max_depth=2)
+        self.assertEqual(
+            result.directories,
+            [
+                str(self.root / '.cache' / 'repo3'),
+                str(self.root / 'a' / 'repo1'),
+                str(self.root / 'c'),
+                str(self.root / 'node_modules' / 'pkg'),
+            ],
+        )
+
+    def test_resumable_cursor(self):
+        result = scan_repo_directories(self.root, time_budget=1e-9)
+        directories = list(result.directories)
+        rounds = 0
+        while not result.complete:
+            rounds += 1
+            result = scan_repo_directories(cursor=result.cursor, time_budget=1e-9)
+            directories.extend(result.directories)
+        self.assertGreater(rounds, 0)
+        self.assertEqual(directories, scan_repo_directories(self.root).directories)
+
+    def test_time_budget_without_repositories(self):
+        for i in range(50):
+            (self.root / 'empty' / f'dir{i:02}').mkdir(parents=True)
+        result = scan_repo_directories(self.root / 'empty', time_budget=1e-9)
+        self.assertFalse(result.complete)
+        self.assertEqual(result.directories, [])
+
+    def test_empty_base_path(self):
+        self.assertEqual(scan_repo_directories('').directories, [])
+
+
+class TestFindRepos(unittest.TestCase):
+    def test_find_repos_keeps_directory_order(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            for name in ['repo-b', 'repo-a', 'repo-c']:
+                make_repo(root / name, f'https://example.com/org/{name}.git')
+
+            repos = list(find_repos(root, max_workers=3))
+
+            self.assertEqual(
+                [repo.repository_name for repo in repos],
+                ['repo-a', 'repo-b', 'repo-c'],
+            )
+            self.assertTrue(all(repo.is_git_directory for repo in repos))
+
+    def test_scan_repos_resumes_from_cursor(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            for name in ['repo-a', 'repo-b']:
+                make_repo(root / name, f'https://example.com/org/{name}.git')
+
+            repos, cursor = scan_repos(root, time_budget=1e-9)
+            while cursor:
+                more_repos, cursor = scan_repos(root, cursor=cursor, time_budget=1e-9)
+                repos.extend(more_repos)
+
+            self.assertEqual(
+                [repo.repository_name for repo in repos], ['repo-a', 'repo-b']
+            )
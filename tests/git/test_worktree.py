@@ -0,0 +1,98 @@
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from unittest import TestCase, skipUnless
+
+from tasks.git.worktree import (
+    add_worktree,
+    bundle_worktree,
+    ensure_store,
+    is_worktree,
+    remove_worktree,
+    repair_worktree,
+    store_path,
+)
+from tests.service.test_task_service import make_origin, run_git
+
+
+def git_output(*args: str, cwd: Path) -> str:
+    return subprocess.run(
+        ['git', *args], cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+class TestStorePath(TestCase):
+    def test_store_path(self):
+        self.assertEqual(
+            store_path('/stores', 'git@github.com:project/repo.git'),
+            Path('/stores/project/repo.git'),
+        )
+
+    def test_invalid_url(self):
+        with self.assertRaises(ValueError):
+            store_path('/stores', '')
+
+
+@skipUnless(shutil.which('git'), 'git is not installed')
+class TestWorktree(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.origin = make_origin(self.root)
+        self.store = self.root / 'stores' / '_' / 'repo.git'
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_tasks_share_the_store(self):
+        ensure_store(self.store, str(self.origin))
+        first = add_worktree(self.store, self.root / 'doing' / '1-1', 'task/1-1')
+        ensure_store(self.store, str(self.origin))
+        second = add_worktree(self.store, self.root / 'doing' / '2-1', 'task/2-1')
+
+        self.assertTrue(is_worktree(first))
+        self.assertTrue(is_worktree(second))
+        self.assertFalse(is_worktree(self.origin))
+        self.assertEqual(git_output('branch', '--show-current', cwd=first), 'task/1-1')
+        self.assertEqual(
+            git_output('rev-parse', 'HEAD', cwd=second),
+            git_output('rev-parse', 'HEAD', cwd=self.origin),
+        )
+        self.assertIn('origin/feature', git_output('branch', '-r', cwd=first))
+        # objects are only in the store
+        self.assertFalse((first / '.git').is_dir())
+
+    def test_move_and_remove(self):
+        ensure_store(self.store, str(self.origin))
+        directory = add_worktree(self.store, self.root / 'doing' / '1-1', 'task/1-1')
+
+        moved = self.root / 'done' / '1-1'
+        moved.parent.mkdir()
+        shutil.move(directory, moved)
+        repair_worktree(moved)
+        self.assertEqual(git_output('status', '--porcelain', cwd=moved), '')
+        self.assertIn(str(moved), git_output('worktree', 'list', cwd=self.store))
+
+        remove_worktree(moved, 'task/1-1')
+        self.assertFalse(moved.exists())
+        self.assertNotIn(str(moved), git_output('worktree', 'list', cwd=self.store))
+        self.assertNotIn('task/1-1', git_output('branch', cwd=self.store))
+
+    def test_bundle(self):
+        ensure_store(self.store, str(self.origin))
+        directory = add_worktree(self.store, self.root / 'doing' / '1-1', 'task/1-1')
+        (directory / 'CHANGE.md').write_text('change\n')
+        run_git('add', '.', cwd=directory)
+        run_git('commit', '-q', '-m', 'change', cwd=directory)
+        bundle = bundle_worktree(directory, self.root / '1-1.bundle')
+        head = git_output('rev-parse', 'HEAD', cwd=directory)
+        remove_worktree(directory, 'task/1-1')
+
+        restored = self.root / 'restored'
+        run_git('clone', '-q', str(bundle), str(restored), cwd=self.root)
+        self.assertEqual(git_output('rev-parse', 'HEAD', cwd=restored), head)
+        self.assertEqual(
+            git_output('branch', '--show-current', cwd=restored), 'task/1-1'
+        )
+        self.assertTrue((restored / 'CHANGE.md').exists())
@@ -0,0 +1,106 @@
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import TestCase, skipUnless
+from unittest.mock import patch
+
+from tasks.config.config import Config
+from tasks.service.batch_service import (
+    BATCH_STATUS_CREATED,
+    BATCH_STATUS_FAILED,
+    BATCH_STATUS_SKIPPED,
+    BatchRow,
+    read_batch_manifest,
+    run_batch,
+)
+from tests.service.test_task_service import make_origin
+
+
+class TestReadBatchManifest(TestCase):
+    def test_csv_and_yaml(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_file = Path(tmp_dir) / 'tasks.csv'
+            csv_file.write_text(
+                'task_id,repository,description\n'
+                '1,https://example.com/org/repo.git,# First\n'
+                '2,https://example.com/org/other.git,\n'
+            )
+            yaml_file = Path(tmp_dir) / 'tasks.yaml'
+            yaml_file.write_text(
+                'tasks:\n'
+                '  - task_id: 1\n'
+                '    remote_url: https://example.com/org/repo.git\n'
+                '    description: "# First"\n'
+                '  - task_id: 2\n'
+                '    repository: https://example.com/org/other.git\n'
+            )
+            expected = [
+                BatchRow('1', 'https://example.com/org/repo.git', '# First'),
+                BatchRow('2', 'https://example.com/org/other.git', ''),
+            ]
+            self.assertEqual(read_batch_manifest(csv_file), expected)
+            self.assertEqual(read_batch_manifest(yaml_file), expected)
+
+    def test_missing_repository(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_file = Path(tmp_dir) / 'tasks.csv'
+            csv_file.write_text('task_id,description\n1,# First\n')
+            with self.assertRaises(ValueError):
+                read_batch_manifest(csv_file)
+
+
+@skipUnless(shutil.which('git'), 'git is not installed')
+class TestRunBatch(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.remote_url = make_origin(self.root).as_uri()
+        self.config = Config(
+            config_path=self.temp_dir.name, tasks_directory=str(self.root / 'tasks')
+        )
+        patcher = patch(
+            'tasks.service.task_service.generate_oneliner', return_value='oneliner'
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_concurrent_rows_get_distinct_versions_and_rerun_skips(self):
+        manifest_file = self.root / 'tasks.csv'
+        missing_url = (self.root / 'missing' / 'repo').as_uri()
+        manifest_file.write_text(
+            'task_id,repository,description\n'
+            f'5,{self.remote_url},# A\n'
+            f'5-0,{self.remote_url},# B\n'
+            f'5,{self.remote_url},# C\n'
+            f'6,{missing_url},# D\n'
+        )
+
+        results = run_batch(self.config, manifest_file, concurrency=4)
+        self.assertEqual(
+            [r.status for r in results],
+            [BATCH_STATUS_CREATED] * 3 + [BATCH_STATUS_FAILED],
+        )
+        self.assertEqual(sorted(r.task_id for r in results[:3]), ['5-0', '5-1', '5-2'])
+        self.assertTrue(results[3].error)
+        self.assertEqual(
+            sorted(d.name for d in self.config.doing_tasks_directory.iterdir()),
+            ['5-0-repo', '5-1-repo', '5-2-repo'],
+        )
+
+        results = run_batch(self.config, manifest_file, concurrency=4)
+        self.assertEqual(
+            [r.status for r in results],
+            [BATCH_STATUS_SKIPPED] * 3 + [BATCH_STATUS_FAILED],
+        )
+        self.assertEqual(len(list(self.config.doing_tasks_directory.iterdir())), 3)
+
+    def test_repeated_rows_are_created_once_each(self):
+        manifest_file = self.root / 'tasks.yaml'
+        manifest_file.write_text(f'- task_id: 8\n  repository: {self.remote_url}\n' * 2)
+        results = run_batch(self.config, manifest_file, concurrency=1)
+        self.assertEqual([r.task_id for r in results], ['8-0', '8-1'])
+        results = run_batch(self.config, manifest_file, concurrency=1)
+        self.assertEqual([r.status for r in results], [BATCH_STATUS_SKIPPED] * 2)
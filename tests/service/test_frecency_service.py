@@ -0,0 +1,47 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from tasks.service.frecency_service import (
+    FRECENCY_FILE,
+    FRECENCY_HALF_LIFE,
+    RepoFrecency,
+)
+
+
+class TestRepoFrecency(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.frecency_file = Path(self.tmp_dir.name) / FRECENCY_FILE
+        self.frecency = RepoFrecency(self.frecency_file)
+
+    def test_record_and_decay(self):
+        self.frecency.record('often', now=0)
+        self.frecency.record('often', now=0)
+        self.frecency.record('lately', now=FRECENCY_HALF_LIFE)
+
+        scores = self.frecency.scores(now=FRECENCY_HALF_LIFE)
+        self.assertAlmostEqual(scores['often'], 1)
+        self.assertAlmostEqual(scores['lately'], 1)
+
+        scores = self.frecency.scores(now=2 * FRECENCY_HALF_LIFE)
+        self.assertAlmostEqual(scores['often'], 0.5)
+        self.assertAlmostEqual(scores['lately'], 0.5)
+
+        self.frecency.record('often', now=2 * FRECENCY_HALF_LIFE)
+        self.assertAlmostEqual(
+            self.frecency.scores(now=2 * FRECENCY_HALF_LIFE)['often'], 1.5
+        )
+
+    def test_shared_through_the_file(self):
+        self.frecency.record('url', now=0)
+        self.assertEqual(RepoFrecency(self.frecency_file).scores(now=0), {'url': 1})
+
+    def test_invalid_file(self):
+        self.frecency_file.write_text('{"url": {"score": "x"}, "other": 1', 'utf-8')
+        self.assertEqual(self.frecency.scores(), {})
+        self.frecency_file.write_text('{"url": {"score": "x"}, "other": 1}', 'utf-8')
+        self.assertEqual(self.frecency.scores(), {})
+        self.frecency.record('url', now=0)
+        self.assertEqual(self.frecency.scores(now=0), {'url': 1})
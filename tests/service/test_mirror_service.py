@@ -0,0 +1,122 @@
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from unittest import TestCase, skipUnless
+from unittest.mock import patch
+
+from tasks.service.mirror_service import MirrorCache
+from tasks.service.task_service import clone_repository
+from tests.service.test_task_service import make_origin, run_git
+
+
+def git_output(*args: str, cwd: Path) -> str:
+    return subprocess.run(
+        ['git', *args], cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+@skipUnless(shutil.which('git'), 'git is not installed')
+class TestMirrorCache(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.origin = make_origin(self.root)
+        self.remote_url = self.origin.as_uri()
+        self.mirrors = MirrorCache(self.root / 'mirrors', budget=0)
+
+    def tearDown(self):
+        self.mirrors.stop()
+        self.temp_dir.cleanup()
+
+    def test_clone_from_mirror(self):
+        self.assertIsNone(self.mirrors.use(self.remote_url))
+        entry = self.mirrors.update(self.remote_url)
+        self.assertGreater(entry.size, 0)
+
+        mirror = self.mirrors.use(self.remote_url)
+        self.assertEqual(mirror, Path(entry.path))
+        folder = self.root / 'tasks' / '1-0-repo'
+        clone_repository(self.remote_url, folder, mirror=mirror)
+
+        self.assertTrue((folder / 'README.md').exists())
+        self.assertEqual(
+            git_output('remote', 'get-url', 'origin', cwd=folder), self.remote_url
+        )
+        self.assertIn('origin/feature', git_output('branch', '-r', cwd=folder))
+
+        # the state survives a restart
+        mirrors = MirrorCache(self.root / 'mirrors', budget=0).load()
+        self.assertEqual(mirrors.entries[0].uses, 1)
+
+    def test_refresh_fetches_new_commits(self):
+        self.mirrors.refresh([self.remote_url])
+        (self.origin / 'NEW.md').write_text('new\n')
+        run_git('add', '.', cwd=self.origin)
+        run_git('commit', '-q', '-m', 'new', cwd=self.origin)
+
+        self.mirrors.refresh([self.remote_url])
+        mirror = self.mirrors.use(self.remote_url)
+        self.assertEqual(
+            git_output('rev-parse', 'HEAD', cwd=mirror),
+            git_output('rev-parse', 'HEAD', cwd=self.origin),
+        )
+
+    def test_background_refresh(self):
+        self.mirrors.start(lambda: [self.remote_url], interval=3600)
+        for _ in range(300):
+            if self.mirrors.entries:
+                break
+            time.sleep(0.1)
+        self.assertEqual(self.mirrors.entries[0].remote_url, self.remote_url)
+
+    def test_least_recently_used_is_evicted(self):
+        other = self.root / 'other' / 'repo2'
+        run_git('clone', '-q', str(self.origin), str(other), cwd=self.root)
+        first = self.mirrors.update(self.remote_url, used=True)
+        self.mirrors.budget = first.size * 3 // 2
+        second = self.mirrors.update(other.as_uri(), used=True)
+
+        self.assertEqual(
+            [entry.remote_url for entry in self.mirrors.entries], [other.as_uri()]
+        )
+        self.assertFalse(Path(first.path).exists())
+        self.assertTrue(Path(second.path).exists())
+
+    def test_unused_mirror_is_not_recreated(self):
+        used = self.mirrors.update(self.remote_url, used=True)
+        self.mirrors.budget = used.size * 3 // 2
+        other = self.root / 'other' / 'repo2'
+        run_git('clone', '-q', str(self.origin), str(other), cwd=self.root)
+
+        self.mirrors.refresh([self.remote_url, other.as_uri()])
+        self.assertEqual(
+            [entry.remote_url for entry in self.mirrors.entries], [self.remote_url]
+        )
+        self.mirrors.refresh([self.remote_url, other.as_uri()])
+        self.assertFalse(self.mirrors.mirror_path(other.as_uri()).exists())
+
+    def test_skipped_mirrors_survive_a_restart(self):
+        used = self.mirrors.update(self.remote_url, used=True)
+        self.mirrors.budget = used.size * 3 // 2
+        other = self.root / 'other' / 'repo2'
+        run_git('clone', '-q', str(self.origin), str(other), cwd=self.root)
+        self.mirrors.refresh([self.remote_url, other.as_uri()])
+
+        mirrors = MirrorCache(self.root / 'mirrors', budget=self.mirrors.budget)
+        with patch.object(mirrors, 'update', wraps=mirrors.update) as update:
+            mirrors.load().refresh([self.remote_url, other.as_uri()])
+        update.assert_called_once_with(self.remote_url)
+
+    def test_borrowed_mirror_is_not_evicted(self):
+        entry = self.mirrors.update(self.remote_url)
+        self.mirrors.budget = 1
+        with self.mirrors.borrow(self.remote_url) as mirror:
+            self.assertEqual(mirror, Path(entry.path))
+            self.assertEqual(self.mirrors.evict(), [])
+            self.assertTrue(mirror.exists())
+        self.assertEqual(
+            [entry.remote_url for entry in self.mirrors.evict()], [self.remote_url]
+        )
+        self.assertFalse(mirror.exists())
@@ -0,0 +1,59 @@
+import unittest
+
+from tasks.service.oneliner_extractor import (
+    MAX_ONELINER_LENGTH,
+    detect_language,
+    extract_oneliner,
+)
+
+ENGLISH = """# PROJ-123 Company endpoints
+
+https://jira.example.com/browse/PROJ-123
+
+## Description
+
+Implement E2E tests for the [Company](https://example.com/api) endpoints covering
+listing with filters and pagination. The tests must also cover the ID lookup.
+
+Sprint: 42
+
+## Acceptance criteria
+- [ ] tests run in CI
+"""
+
+PORTUGUESE = """# Ajustar cálculo
+
+Ticket: ABC-1
+
+Precisamos corrigir o cálculo do frete para pedidos com mais de um item.
+O valor está sendo duplicado quando há desconto no frete.
+
+```python
+print('frete')
+```
+"""
+
+
+class TestExtractOneliner(unittest.TestCase):
+    def test_skips_headings_links_and_boilerplate(self):
+        self.assertEqual(
+            extract_oneliner(ENGLISH),
+            'Implement E2E tests for the Company endpoints covering listing with '
+            'filters and pagination.',
+        )
+
+    def test_keeps_the_description_language(self):
+        self.assertEqual(
+            extract_oneliner(PORTUGUESE),
+            'Precisamos corrigir o cálculo do frete para pedidos com mais de um item.',
+        )
+        self.assertEqual(detect_language(['o', 'valor', 'está', 'no', 'frete']), 'pt')
+        self.assertEqual(detect_language(['the', 'value', 'is', 'wrong']), 'en')
+
+    def test_fallbacks_and_length(self):
+        self.assertEqual(extract_oneliner(''), '')
+        self.assertEqual(extract_oneliner('# Only a heading'), 'Only a heading')
+        self.assertEqual(extract_oneliner('single line'), 'single line')
+        oneliner = extract_oneliner('word ' * 100)
+        self.assertLessEqual(len(oneliner), MAX_ONELINER_LENGTH)
+        self.assertTrue(oneliner.endswith('…'))
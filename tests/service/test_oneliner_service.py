@@ -0,0 +1,107 @@
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+from tasks.consts import TaskStatus
+from tasks.git import GitConfig
+from tasks.service.oneliner_service import (
+    OnelinerCache,
+    OnelinerQueue,
+    get_task_oneliners,
+)
+from tasks.task.manifest import read_manifest
+from tasks.task.task import Task
+
+DESCRIPTION = '# Title\n\nLong description of the task.\n'
+
+
+def make_task(directory: Path, task_id: str) -> Task:
+    (directory / 'TASK').mkdir(parents=True)
+    repo = GitConfig.from_dict({'directory': str(directory), 'repository_name': 'repo'})
+    return Task(task_id, repo, TaskStatus.IN_PROGRESS, datetime.now(), datetime.now())
+
+
+class TestOnelinerQueue(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.root = Path(self.tmp_dir.name)
+        self.cache_file = self.root / 'oneliners.json'
+
+    def test_request_deduplicates_and_caches(self):
+        release = threading.Event()
+
+        def generate(description, api_key):
+            release.wait(5)
+            return 'Generated oneliner'
+
+        task_a = make_task(self.root / '1-0-repo', '1-0')
+        task_b = make_task(self.root / '2-0-repo', '2-0')
+        queue = OnelinerQueue(OnelinerCache(self.cache_file), api_key='key')
+        done = []
+        with patch(
+            'tasks.service.oneliner_service.get_task_oneliner', side_effect=generate
+        ) as get_task_oneliner:
+            self.assertEqual(queue.request(task_a, DESCRIPTION, done.append), '# Title')
+            self.assertEqual(queue.request(task_b, DESCRIPTION, done.append), '# Title')
+            release.set()
+            self.assertTrue(queue.join(timeout=5))
+
+        get_task_oneliner.assert_called_once()
+        self.assertEqual(done, [task_a, task_b])
+        self.assertEqual(task_b.oneliner, 'Generated oneliner')
+        self.assertEqual(
+            (task_a.directory / 'TASK' / 'oneliner.txt').read_text(),
+            'Generated oneliner',
+        )
+        self.assertEqual(read_manifest(task_a.directory).oneliner, 'Generated oneliner')
+
+        cache = OnelinerCache(self.cache_file).load()
+        self.assertEqual(cache.get(DESCRIPTION), 'Generated oneliner')
+        task_c = make_task(self.root / '3-0-repo', '3-0')
+        with patch(
+            'tasks.service.oneliner_service.get_task_oneliner'
+        ) as get_task_oneliner:
+            oneliner = OnelinerQueue(cache, api_key='key').request(task_c, DESCRIPTION)
+        get_task_oneliner.assert_not_called()
+        self.assertEqual(oneliner, 'Generated oneliner')
+
+
+AGENT_STUB = """#!/usr/bin/env python3
+import json, os, sys
+with open(os.environ['AGENT_STUB_LOG'], 'a') as log:
+    log.write(sys.argv[-1] + '\\n')
+print(json.dumps({
+    'type': 'result', 'subtype': 'success', 'is_error': False,
+    'result': '```json\\n["First oneliner", 42]\\n```',
+}))
+"""
+
+
+class TestGetTaskOneliners(unittest.TestCase):
+    def test_single_agent_call_with_per_item_fallback(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bin_dir = Path(tmp_dir) / 'bin'
+            bin_dir.mkdir()
+            agent = bin_dir / 'agent'
+            agent.write_text(AGENT_STUB)
+            agent.chmod(0o755)
+            log_file = Path(tmp_dir) / 'agent.log'
+            environ = {
+                'PATH': f'{bin_dir}{os.pathsep}{os.environ.get("PATH", "")}',
+                'AGENT_STUB_LOG': str(log_file),
+            }
+            with patch.dict(os.environ, environ):
+                oneliners = get_task_oneliners(
+                    ['# First\n\nbody', '# Second\n\nbody', 'single line'],
+                    api_key='key',
+                )
+
+            self.assertEqual(oneliners, ['First oneliner', '# Second', 'single line'])
+            prompts = log_file.read_text().splitlines()
+            self.assertEqual(len(prompts), 1)
+            self.assertIn('2 files', prompts[0])
@@ -0,0 +1,78 @@
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from unittest import TestCase, skipUnless
+from unittest.mock import patch
+
+from tasks.config.config import Config
+from tasks.service.pool_service import WorkspacePool
+from tasks.service.task_service import clone_repository, new_task
+from tests.service.test_task_service import make_origin, run_git
+
+
+def git_output(*args: str, cwd: Path) -> str:
+    return subprocess.run(
+        ['git', *args], cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+@skipUnless(shutil.which('git'), 'git is not installed')
+class TestWorkspacePool(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.origin = make_origin(self.root)
+        self.remote_url = self.origin.as_uri()
+        self.pool = WorkspacePool(self.root / 'tasks' / '.pool')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def clone(self, directory: Path) -> Path:
+        return clone_repository(self.remote_url, directory)
+
+    def test_refill_and_claim(self):
+        self.pool.refill(self.remote_url, 2, self.clone).join(timeout=60)
+        self.assertEqual(len(self.pool.spares(self.remote_url)), 2)
+        state = self.pool.state()[0]
+        self.assertEqual((state.spares, state.size, state.filling), (2, 2, False))
+
+        first = self.pool.claim(self.remote_url, self.root / 'doing' / '1-0-repo')
+        second = self.pool.claim(self.remote_url, self.root / 'doing' / '2-0-repo')
+        self.assertIsNone(self.pool.claim(self.remote_url, self.root / 'doing' / 'x'))
+        self.assertNotEqual(first, second)
+        self.assertTrue((first / 'README.md').exists())
+        self.assertTrue((second / 'README.md').exists())
+        self.assertEqual(self.pool.spares(self.remote_url), [])
+
+    def test_refill_updates_spares(self):
+        self.pool.refill(self.remote_url, 1, self.clone).join(timeout=60)
+        (self.origin / 'NEW.md').write_text('new\n')
+        run_git('add', '.', cwd=self.origin)
+        run_git('commit', '-q', '-m', 'new', cwd=self.origin)
+
+        self.pool.refill(self.remote_url, 1, self.clone).join(timeout=60)
+        spare = self.pool.claim(self.remote_url, self.root / 'doing' / '1-0-repo')
+        self.assertTrue((spare / 'NEW.md').exists())
+        self.assertEqual(git_output('status', '--porcelain', cwd=spare), '')
+
+    @patch('tasks.service.task_service.generate_oneliner', return_value='oneliner')
+    def test_new_task_claims_a_spare(self, _mock_oneliner):
+        config = Config(config_path=str(self.root), tasks_directory=str(self.root))
+        config.pool_sizes = {'repo': 1}
+        with patch(
+            'tasks.service.task_service.get_workspace_pool', return_value=self.pool
+        ):
+            self.pool.refill(self.remote_url, 1, self.clone).join(timeout=60)
+            spare = self.pool.spares(self.remote_url)[0]
+            task, message = new_task(config, '1-0', self.remote_url, '# Task')
+            self.assertIsNotNone(task, message)
+            self.assertIn('Claimed a spare workspace', message)
+            self.assertFalse(spare.exists())
+            self.assertTrue((task.directory / 'README.md').exists())
+            self.assertTrue((task.directory / 'TASK' / '1-0.md').exists())
+
+            # a new spare is cloned in background
+            self.pool.join(timeout=60)
+            self.assertEqual(len(self.pool.spares(self.remote_url)), 1)
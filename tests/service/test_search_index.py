@@ -0,0 +1,65 @@
+import unittest
+
+from tasks.service.search_index import SearchIndex
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = SearchIndex()
+        self.index.add('a', ['110-0', 'parser', 'tools', 'Fix the config parser'])
+        self.index.add('b', ['11-0', 'web-app', 'front', 'Add a login page'])
+        self.index.add('c', ['12-0', 'config-service', 'back', 'Retry on timeouts'])
+
+    def test_empty_query_returns_all_keys(self):
+        self.assertEqual(self.index.search(''), ['a', 'b', 'c'])
+        self.assertEqual(self.index.search('   '), ['a', 'b', 'c'])
+
+    def test_short_terms_match_word_starts(self):
+        self.assertEqual(self.index.search('lo'), ['b'])
+        self.assertEqual(self.index.search('ap'), ['b'])
+        # not the start of a word
+        self.assertEqual(self.index.search('pp'), [])
+
+    def test_ranked_by_place(self):
+        # field prefix of the repository, then inside the oneliner
+        self.assertEqual(self.index.search('config'), ['c', 'a'])
+        self.assertEqual(self.index.search('pars'), ['a'])
+        # the whole word first
+        self.assertEqual(self.index.search('11'), ['b', 'a'])
+
+    def test_every_term_matches(self):
+        self.assertEqual(self.index.search('config retry'), ['c'])
+        self.assertEqual(self.index.search('CONFIG fix'), ['a'])
+        self.assertEqual(self.index.search('config login'), [])
+
+    def test_fuzzy_after_substring(self):
+        index = SearchIndex()
+        # the trigrams of "abcd", not next to each other, in the first field
+        index.add('fuzzy', ['bcd abc', 'x'])
+        index.add('substring', ['x', 'xabcdx'])
+        index.add('none', ['abc', 'bce'])
+        self.assertEqual(index.search('abcd'), ['substring', 'fuzzy'])
+
+    def test_subsequences(self):
+        self.assertEqual(self.index.search('cfgsrv'), [])
+        self.assertEqual(self.index.search('cfgsrv', subsequences=True), ['c'])
+        # after the trigram matches, not across fields
+        self.assertEqual(self.index.search('conf', subsequences=True), ['c', 'a'])
+        self.assertEqual(self.index.search('rtms', subsequences=True), ['c'])
+        # config-service, back
+        self.assertEqual(self.index.search('sb', subsequences=True), [])
+
+    def test_replace_and_remove(self):
+        self.index.add('b', ['11-0', 'web-app', 'front', 'Retry the payment'])
+        self.assertEqual(self.index.search('login'), [])
+        self.assertEqual(self.index.search('retry'), ['b', 'c'])
+        self.index.remove('c')
+        self.assertEqual(self.index.search('retry'), ['b'])
+        self.assertNotIn('c', self.index)
+        self.index.remove('c')
+
+    def test_retain(self):
+        self.index.retain({'a', 'c', 'x'})
+        self.assertEqual(len(self.index), 2)
+        self.assertEqual(self.index.search('config'), ['c', 'a'])
+        self.assertEqual(self.index.search('login'), [])
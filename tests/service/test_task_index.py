@@ -0,0 +1,80 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from tasks.config.config import Config
+from tasks.consts import TaskStatus
+from tasks.service.task_index import TaskIndex, parse_task_directory_name
+from tasks.service.task_service import get_task_data_candidate
+
+
+class TestTaskIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.tasks_directory = Path(self.tmp_dir.name) / 'tasks'
+        self.doing = self.tasks_directory / TaskStatus.IN_PROGRESS.value
+        self.done = self.tasks_directory / TaskStatus.DONE.value
+        (self.doing / '1234-0-repo').mkdir(parents=True)
+        (self.done / '1234-2-other-repo').mkdir(parents=True)
+        (self.doing / '999-0-repo').mkdir(parents=True)
+        self.index = TaskIndex(Path(self.tmp_dir.name) / 'tasks_index.sqlite3')
+
+    def test_parse_task_directory_name(self):
+        self.assertEqual(
+            parse_task_directory_name('1234-10-repo-name'), ('1234', 10, 'repo-name')
+        )
+        self.assertEqual(parse_task_directory_name('1234-repo'), ('1234', 0, 'repo'))
+
+    def test_find_and_last(self):
+        self.index.reconcile(self.tasks_directory)
+        entries = self.index.find('1234')
+        self.assertEqual([entry.task_id for entry in entries], ['1234-0', '1234-2'])
+        self.assertEqual(entries[1].status, TaskStatus.DONE)
+        self.assertEqual(entries[1].repository, 'other-repo')
+        self.assertEqual(self.index.last('1234').task_id, '1234-2')
+        self.assertIsNone(self.index.last('42'))
+
+    def test_reconcile_is_incremental(self):
+        self.index.reconcile(self.tasks_directory)
+        with patch('tasks.service.task_index.os.scandir') as scandir:
+            self.index.reconcile(self.tasks_directory)
+        scandir.assert_not_called()
+
+        (self.doing / '1234-3-repo').mkdir()
+        shutil.move(self.doing / '999-0-repo', self.done / '999-0-repo')
+        self.index.reconcile(self.tasks_directory)
+        self.assertEqual(self.index.last('1234').task_id, '1234-3')
+        self.assertEqual(self.index.last('999').status, TaskStatus.DONE)
+        self.assertEqual(len(self.index.find('999')), 1)
+
+    def test_reconcile_escapes_like_wildcards(self):
+        # tasks_1 is a LIKE pattern matching tasksx1
+        wildcard = Path(self.tmp_dir.name) / 'tasks_1'
+        other = Path(self.tmp_dir.name) / 'tasksx1'
+        (wildcard / TaskStatus.IN_PROGRESS.value / '1-0-repo').mkdir(parents=True)
+        (other / TaskStatus.IN_PROGRESS.value / '2-0-repo').mkdir(parents=True)
+        self.index.reconcile(other)
+        self.index.reconcile(wildcard)
+        shutil.rmtree(wildcard)
+        self.index.reconcile(wildcard)
+        self.assertEqual(self.index.find('1'), [])
+        self.assertEqual(len(self.index.find('2')), 1)
+
+    def test_task_data_candidate_uses_index(self):
+        (self.done / '1234-2-other-repo' / 'TASK').mkdir()
+        (self.done / '1234-2-other-repo' / 'TASK' / '1234-2.md').write_text('desc')
+        config = Config(
+            config_path=self.tmp_dir.name, tasks_directory=str(self.tasks_directory)
+        )
+        with patch('tasks.service.task_service.GitConfig') as git_config:
+            task_id, description, _, repository, folder = get_task_data_candidate(
+                config, '1234-0', 'repo'
+            )
+        git_config.assert_not_called()
+        self.assertEqual(
+            (task_id, description, repository), ('1234-3', 'desc', 'other-repo')
+        )
+        self.assertEqual(folder, (self.doing / '1234-3-other-repo').as_posix())
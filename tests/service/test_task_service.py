@@ -1,12 +1,32 @@
+import shutil
+import subprocess
 import tempfile
+import threading
+import time
+import zipfile
 from datetime import datetime
 from pathlib import Path
-from unittest import TestCase
+from unittest import TestCase, skipUnless
 from unittest.mock import Mock, patch
 
 from tasks.config.config import Config
 from tasks.consts import TaskStatus
-from tasks.service.task_service import clone_repository, new_task
+from tasks.git import GitConfig
+from tasks.git.clone_profile import CloneProfile
+from tasks.service.frecency_service import get_repo_frecency
+from tasks.service.task_service import (
+    STAGING_DIRECTORY,
+    archive_task,
+    clone_repository,
+    deepen_repository,
+    delete_done_task,
+    move_task_to_done,
+    new_multi_repo_task,
+    new_task,
+    read_task_from_directory,
+    stage_workspace,
+)
+from tasks.task.manifest import read_manifest
 
 
 class TestTaskService(TestCase):
@@ -29,11 +49,11 @@ class TestTaskService(TestCase):
 
 
 class TestNewTask(TestCase):
-    @patch('tasks.service.task_service.get_task_oneliner', return_value='test oneliner')
-    @patch('tasks.service.task_service.get_existing_tasks', return_value=[])
+    @patch('tasks.service.task_service.generate_oneliner', return_value='test oneliner')
+    @patch('tasks.service.task_service.get_last_task_entry', return_value=None)
     @patch('tasks.service.task_service.clone_repository')
     def test_new_task(
-        self, mock_clone_repository, _mock_get_existing_tasks, _mock_oneliner
+        self, mock_clone_repository, _mock_get_last_task_entry, _mock_oneliner
     ):
         repo_url = 'https://example.com/org/repo.git'
         with tempfile.TemporaryDirectory() as tmp_dir:
@@ -43,14 +63,17 @@ class TestNewTask(TestCase):
             This is a test task description.
             """
             task_output_folder = config.doing_tasks_directory / '1234-0-repo'
-            git_config_folder = task_output_folder / '.git'
-            git_config_folder.mkdir(parents=True, exist_ok=True)
-            (git_config_folder / 'config').write_text(
-                '[remote "origin"]\n\turl = https://example.com/org/repo.git\n',
-                encoding='utf-8',
-            )
 
-            mock_clone_repository.return_value = task_output_folder
+            def clone(remote_url, directory, *args, **kwargs):
+                git_config_folder = directory / '.git'
+                git_config_folder.mkdir(parents=True, exist_ok=True)
+                (git_config_folder / 'config').write_text(
+                    '[remote "origin"]\n\turl = https://example.com/org/repo.git\n',
+                    encoding='utf-8',
+                )
+                return directory
+
+            mock_clone_repository.side_effect = clone
             task, message = new_task(config, '1234-0', repo_url, task_description)
 
             self.assertIn('New task 1234-0', message)
@@ -63,3 +86,258 @@ class TestNewTask(TestCase):
             self.assertGreaterEqual(task.updated_at, task.created_at)
             self.assertTrue(task_output_folder.exists())
             self.assertTrue((task.directory / '.git').exists())
+            self.assertEqual(list(get_repo_frecency(tmp_dir).scores()), [repo_url])
+
+
+def run_git(*args: str, cwd: Path) -> None:
+    subprocess.run(
+        ['git', '-c', 'user.name=Test', '-c', 'user.email=test@example.com', *args],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+    )
+
+
+def make_origin(root: Path) -> Path:
+    origin = root / 'origin' / 'repo'
+    origin.mkdir(parents=True)
+    run_git('init', '-q', cwd=origin)
+    run_git('config', 'uploadpack.allowFilter', 'true', cwd=origin)
+    for index in range(3):
+        (origin / 'README.md').write_text(f'# Repo {index}\n')
+        run_git('add', '.', cwd=origin)
+        run_git('commit', '-q', '-m', f'commit {index}', cwd=origin)
+    run_git('branch', 'feature', cwd=origin)
+    return origin
+
+
+@skipUnless(shutil.which('git'), 'git is not installed')
+class TestCloneRepository(TestCase):
+    def test_clone_with_reference_is_dissociated(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            origin = make_origin(root)
+            sample = root / 'dev' / 'repo'
+            run_git('clone', '-q', origin.as_uri(), str(sample), cwd=root)
+
+            config = Config(config_path=tmp_dir, tasks_directory=str(root / 'tasks'))
+            config.repos = [GitConfig(directory=str(sample))]
+            self.assertEqual(config.find_repo_sample(origin.as_uri()), str(sample))
+            self.assertIsNone(
+                config.find_repo_sample('https://example.com/org/other.git')
+            )
+
+            task_folder = root / 'tasks' / 'in_progress' / '1-0-repo'
+            with patch(
+                'tasks.service.task_service.subprocess.run', wraps=subprocess.run
+            ) as run:
+                clone_repository(origin.as_uri(), task_folder, str(sample))
+            self.assertIn('--reference-if-able', run.call_args.args[0])
+            self.assertTrue((task_folder / 'README.md').exists())
+            self.assertFalse(
+                (task_folder / '.git' / 'objects' / 'info' / 'alternates').exists()
+            )
+
+    def test_reduced_clone_is_deepened_in_background(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            origin = make_origin(root)
+            task_folder = root / 'tasks' / '1-0-repo'
+            profile = CloneProfile(mode='blobless', depth=1, single_branch=True)
+            clone_repository(origin.as_uri(), task_folder, profile=profile)
+            self.assertTrue((task_folder / '.git' / 'shallow').exists())
+
+            deepen_repository(task_folder, profile).join(timeout=60)
+
+            self.assertFalse((task_folder / '.git' / 'shallow').exists())
+            branches = subprocess.run(
+                ['git', 'branch', '-r'],
+                cwd=task_folder,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            self.assertIn('origin/feature', branches)
+
+    @patch('tasks.service.task_service.generate_oneliner', return_value='oneliner')
+    def test_worktree_workspaces(self, _mock_oneliner):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            origin = make_origin(root)
+            config = Config(config_path=tmp_dir, tasks_directory=str(root / 'tasks'))
+            config.workspace_mode = 'worktree'
+
+            first, message = new_task(config, '1-0', origin.as_uri(), '# First')
+            self.assertIsNotNone(first, message)
+            second, message = new_task(config, '2-0', origin.as_uri(), '# Second')
+            self.assertIsNotNone(second, message)
+            store = config.worktree_stores_directory / 'origin' / 'repo.git'
+            self.assertTrue((store / 'HEAD').exists())
+            self.assertTrue((first.directory / '.git').is_file())
+            self.assertTrue((second.directory / 'README.md').exists())
+
+            self.assertIsNone(move_task_to_done(config, first))
+            self.assertEqual(first.directory.parent, config.done_tasks_directory)
+            worktrees = subprocess.run(
+                ['git', 'worktree', 'list'], cwd=store, capture_output=True, text=True
+            ).stdout
+            self.assertIn(str(first.directory), worktrees)
+
+            directory = first.directory
+            self.assertIsNone(delete_done_task(config, first))
+            self.assertFalse(directory.exists())
+            self.assertFalse((store / 'worktrees' / directory.name).exists())
+            branches = subprocess.run(
+                ['git', 'branch'], cwd=store, capture_output=True, text=True, check=True
+            ).stdout
+            self.assertNotIn('task/1-0', branches)
+            self.assertIn('task/2-0', branches)
+
+            self.assertIsNone(move_task_to_done(config, second))
+            message = archive_task(config, second)
+            self.assertIn('archived', message)
+            with zipfile.ZipFile(
+                config.archive_tasks_directory / f'{second.archive_name}.zip'
+            ) as archive:
+                self.assertIn('TASK/2-0.bundle', archive.namelist())
+
+    @patch('tasks.service.task_service.generate_oneliner', return_value='oneliner')
+    def test_new_task_uses_the_staged_workspace(self, _mock_oneliner):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            origin = make_origin(root)
+            config = Config(config_path=tmp_dir, tasks_directory=str(root / 'tasks'))
+
+            progress = []
+            staged = stage_workspace(
+                config, origin.as_uri(), threading.Event(), progress.append
+            )
+            self.assertEqual(staged.parent, root / 'tasks' / STAGING_DIRECTORY)
+            self.assertTrue(progress)
+            self.assertTrue((staged / 'README.md').exists())
+
+            task, message = new_task(config, '1-0', origin.as_uri(), '# Task', staged)
+            self.assertIsNotNone(task, message)
+            self.assertIn('made in background', message)
+            self.assertFalse(staged.exists())
+            self.assertTrue((task.directory / 'README.md').exists())
+            self.assertTrue((task.directory / 'TASK' / '1-0.md').exists())
+
+    def test_cancelled_staging_is_removed(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            origin = make_origin(root)
+            config = Config(config_path=tmp_dir, tasks_directory=str(root / 'tasks'))
+            cancel = threading.Event()
+            cancel.set()
+
+            self.assertIsNone(stage_workspace(config, origin.as_uri(), cancel))
+            self.assertEqual(list((root / 'tasks' / STAGING_DIRECTORY).iterdir()), [])
+
+            with self.assertRaises(RuntimeError):
+                clone_repository(origin.as_uri(), root / 'clone', cancel=cancel)
+
+    def test_clone_progress(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            origin = make_origin(root)
+            progress = []
+            clone_repository(origin.as_uri(), root / 'clone', progress=progress.append)
+            self.assertTrue((root / 'clone' / 'README.md').exists())
+            self.assertTrue(progress)
+            self.assertIn(
+                'Receiving objects',
+                {clone_progress.phase for clone_progress in progress},
+            )
+
+
+@skipUnless(shutil.which('git'), 'git is not installed')
+class TestMultiRepoTask(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        origin = make_origin(self.root)
+        other = origin.parent / 'other'
+        shutil.copytree(origin, other)
+        self.remote_urls = [origin.as_uri(), other.as_uri()]
+        self.config = Config(
+            config_path=self.temp_dir.name, tasks_directory=str(self.root / 'tasks')
+        )
+        patcher = patch(
+            'tasks.service.task_service.generate_oneliner', return_value='oneliner'
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_repositories_are_cloned_concurrently(self):
+        running, peak = [0], [0]
+        lock = threading.Lock()
+
+        def slow_clone(*args, **kwargs):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            try:
+                time.sleep(0.2)
+                return clone_repository(*args, **kwargs)
+            finally:
+                with lock:
+                    running[0] -= 1
+
+        with patch(
+            'tasks.service.task_service.clone_repository', side_effect=slow_clone
+        ):
+            tasks, message = new_multi_repo_task(
+                self.config, '7-0', self.remote_urls, '# Task'
+            )
+        self.assertEqual(len(tasks), 2, message)
+        self.assertEqual(peak[0], 2)
+        self.assertEqual({task.id for task in tasks}, {'7-0'})
+        self.assertEqual(
+            sorted(task.directory.name for task in tasks), ['7-0-other', '7-0-repo']
+        )
+        for task in tasks:
+            self.assertEqual(task.group, ['repo', 'other'])
+            self.assertTrue((task.directory / 'TASK' / '7-0.md').exists())
+            self.assertEqual(read_manifest(task.directory).group, ['repo', 'other'])
+
+    @patch('tasks.service.task_service.get_last_task_entry', return_value=None)
+    def test_version_taken_by_another_repository(self, _mock_get_last_task_entry):
+        (self.config.doing_tasks_directory / '7-0-another').mkdir(parents=True)
+        tasks, message = new_multi_repo_task(
+            self.config, '7-0', self.remote_urls, '# Task'
+        )
+        self.assertEqual(
+            sorted(task.directory.name for task in tasks),
+            ['7-1-other', '7-1-repo'],
+            message,
+        )
+
+    def test_group_is_moved_and_deleted_together(self):
+        tasks, message = new_multi_repo_task(
+            self.config, '7-0', self.remote_urls, '# Task'
+        )
+        self.assertEqual(len(tasks), 2, message)
+        first = read_task_from_directory(tasks[0].directory, self.config)
+
+        self.assertIsNone(move_task_to_done(self.config, first))
+        done = sorted(self.config.done_tasks_directory.iterdir())
+        self.assertEqual([d.name for d in done], ['7-0-other', '7-0-repo'])
+        self.assertEqual(list(self.config.doing_tasks_directory.iterdir()), [])
+
+        self.assertIsNone(delete_done_task(self.config, first))
+        self.assertEqual(list(self.config.done_tasks_directory.iterdir()), [])
+
+    def test_failed_clone_removes_the_group(self):
+        tasks, message = new_multi_repo_task(
+            self.config,
+            '7-0',
+            [self.remote_urls[0], (self.root / 'missing' / 'repo2').as_uri()],
+            '# Task',
+        )
+        self.assertEqual(tasks, [])
+        self.assertIn('not every repository was cloned', message)
+        self.assertEqual(list(self.config.doing_tasks_directory.iterdir()), [])
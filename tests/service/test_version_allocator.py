@@ -0,0 +1,63 @@
+import multiprocessing
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from tasks.service.version_allocator import VersionAllocator
+
+
+def allocate_versions(directory: str, count: int) -> list[int]:
+    allocator = VersionAllocator(directory)
+    return [allocator.allocate('42', lambda: None) for _ in range(count)]
+
+
+class TestVersionAllocator(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.allocator = VersionAllocator(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_counter_heals_from_disk(self):
+        calls = []
+
+        def last_version():
+            calls.append(1)
+            return 3
+
+        self.assertEqual(self.allocator.allocate('42', last_version), 4)
+        self.assertEqual(self.allocator.allocate('42', last_version), 5)
+        self.assertEqual(len(calls), 1)  # only when the counter is missing
+        self.assertEqual(self.allocator.allocate('7', lambda: None), 0)
+
+    def test_counter_behind_skips_taken_versions(self):
+        self.assertEqual(self.allocator.allocate('42', lambda: None), 0)
+        taken = {1, 2, 3}
+        version = self.allocator.allocate('42', lambda: 2, taken.__contains__)
+        self.assertEqual(version, 4)
+
+    def test_release(self):
+        self.assertEqual(self.allocator.allocate('42', lambda: None), 0)
+        self.assertEqual(self.allocator.allocate('42', lambda: None), 1)
+        self.allocator.release('42', 1)
+        self.assertEqual(self.allocator.allocate('42', lambda: None), 1)
+        # not the last one anymore
+        self.allocator.release('42', 0)
+        self.assertEqual(self.allocator.allocate('42', lambda: None), 2)
+
+    def test_concurrent_threads(self):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            versions = list(
+                executor.map(
+                    lambda _: self.allocator.allocate('42', lambda: None), range(40)
+                )
+            )
+        self.assertEqual(sorted(versions), list(range(40)))
+
+    def test_concurrent_processes(self):
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(4) as pool:
+            results = pool.starmap(allocate_versions, [(self.temp_dir.name, 10)] * 4)
+        versions = [version for result in results for version in result]
+        self.assertEqual(sorted(versions), list(range(40)))
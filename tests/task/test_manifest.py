@@ -0,0 +1,70 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from tasks.config.config import Config
+from tasks.consts import TaskStatus
+from tasks.service.task_service import move_task_to_done, read_task_from_directory
+from tasks.task.manifest import manifest_file, read_manifest
+
+
+class TestTaskManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.config = Config(
+            config_path=self.tmp_dir.name,
+            tasks_directory=str(Path(self.tmp_dir.name) / 'tasks'),
+        )
+        self.directory = self.config.doing_tasks_directory / '1234-0-repo'
+        (self.directory / '.git').mkdir(parents=True)
+        (self.directory / '.git' / 'config').write_text(
+            '[remote "origin"]\n\turl = https://example.com/org/repo.git\n',
+            encoding='utf-8',
+        )
+        (self.directory / 'TASK').mkdir()
+        (self.directory / 'TASK' / 'oneliner.txt').write_text('Fix the thing')
+
+    def test_manifest_is_created_lazily_and_used_as_fast_path(self):
+        self.assertIsNone(read_manifest(self.directory))
+        task = read_task_from_directory(self.directory, self.config)
+        self.assertTrue(manifest_file(self.directory).exists())
+
+        with patch('tasks.service.task_service.GitConfig') as git_config:
+            cached = read_task_from_directory(self.directory, self.config)
+        git_config.assert_not_called()
+        self.assertEqual(cached.id, '1234-0')
+        self.assertEqual(cached.status, TaskStatus.IN_PROGRESS)
+        self.assertEqual(cached.oneliner, 'Fix the thing')
+        self.assertEqual(cached.repo.remote_url, task.repo.remote_url)
+        self.assertEqual(cached.repo.repository_name, 'repo')
+        self.assertEqual(cached.directory, task.directory)
+
+    def test_move_updates_manifest(self):
+        task = read_task_from_directory(self.directory, self.config)
+        self.assertIsNone(move_task_to_done(self.config, task))
+
+        done_directory = self.config.done_tasks_directory / '1234-0-repo'
+        self.assertEqual(task.directory, done_directory)
+        data = json.loads(manifest_file(done_directory).read_text())
+        self.assertEqual(data['status'], TaskStatus.DONE.value)
+        self.assertEqual(
+            read_task_from_directory(done_directory, self.config).status,
+            TaskStatus.DONE,
+        )
+
+    def test_status_follows_location(self):
+        read_task_from_directory(self.directory, self.config)
+        done_directory = self.config.done_tasks_directory / '1234-0-repo'
+        self.directory.rename(done_directory)
+        task = read_task_from_directory(done_directory, self.config)
+        self.assertEqual(task.status, TaskStatus.DONE)
+        self.assertEqual(task.directory, done_directory)
+
+    def test_manifest_of_renamed_workspace_is_ignored(self):
+        read_task_from_directory(self.directory, self.config)
+        renamed = self.directory.with_name('1234-1-repo')
+        self.directory.rename(renamed)
+        self.assertIsNone(read_manifest(renamed))
@@ -0,0 +1,92 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from tasks.config.config import Config
+from tasks.consts import TaskStatus
+from tasks.service.task_service import (
+    add_task_listener,
+    move_task_to_done,
+    read_task_from_directory,
+    remove_task_listener,
+)
+from tasks.tui.context import Context
+
+
+def make_task(directory: Path) -> Path:
+    (directory / '.git').mkdir(parents=True)
+    (directory / '.git' / 'config').write_text(
+        '[remote "origin"]\n\turl = https://example.com/org/repo.git\n',
+        encoding='utf-8',
+    )
+    (directory / 'TASK').mkdir()
+    (directory / 'TASK' / 'oneliner.txt').write_text('oneliner')
+    return directory
+
+
+class TestContextTaskCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.config = Config(
+            config_path=self.tmp_dir.name,
+            tasks_directory=str(Path(self.tmp_dir.name) / 'tasks'),
+        )
+        make_task(self.config.doing_tasks_directory / '1-0-repo')
+        make_task(self.config.doing_tasks_directory / '2-0-repo')
+        self.config.done_tasks_directory.mkdir(exist_ok=True)
+        self.context = Context(config=self.config)
+        add_task_listener(self.context.on_task_changed)
+        self.addCleanup(remove_task_listener, self.context.on_task_changed)
+
+    def test_refresh_reads_only_changed_directories(self):
+        self.assertEqual(
+            [task.id for task in self.context.get_doing_tasks()], ['1-0', '2-0']
+        )
+        make_task(self.config.doing_tasks_directory / '3-0-repo')
+        with patch(
+            'tasks.tui.context.read_task_from_directory',
+            side_effect=read_task_from_directory,
+        ) as read_task:
+            tasks = self.context.get_doing_tasks(refresh=True)
+        self.assertEqual([task.id for task in tasks], ['1-0', '2-0', '3-0'])
+        self.assertEqual(read_task.call_count, 1)
+
+    def test_move_updates_cache_in_place(self):
+        task = self.context.get_doing_tasks()[0]
+        self.context.get_done_tasks()
+        with patch('tasks.tui.context.read_task_from_directory') as read_task:
+            self.assertIsNone(move_task_to_done(self.config, task))
+            doing = self.context.get_doing_tasks(refresh=True)
+            done = self.context.get_done_tasks(refresh=True)
+        read_task.assert_not_called()
+        self.assertEqual([task.id for task in doing], ['2-0'])
+        self.assertEqual([task.id for task in done], ['1-0'])
+        self.assertIs(done[0], task)
+
+    def test_parallel_loading_keeps_order_and_skips_non_tasks(self):
+        (self.config.doing_tasks_directory / '0-0-not-a-repo').mkdir()
+        for number in range(3, 10):
+            make_task(self.config.doing_tasks_directory / f'{number}-0-repo')
+        self.config.task_loading_workers = 4
+        with patch(
+            'tasks.tui.context.read_task_from_directory',
+            side_effect=read_task_from_directory,
+        ) as read_task:
+            tasks = self.context.get_doing_tasks()
+        self.assertEqual(read_task.call_count, 10)
+        self.assertEqual(
+            [task.id for task in tasks], [f'{number}-0' for number in range(1, 10)]
+        )
+
+    def test_iter_tasks_streams_in_order_with_progress(self):
+        (self.config.doing_tasks_directory / '0-0-not-a-repo').mkdir()
+        progress = []
+        tasks = self.context.iter_tasks(
+            TaskStatus.IN_PROGRESS,
+            progress=lambda read, total: progress.append((read, total)),
+        )
+        self.assertEqual(next(tasks).id, '1-0')
+        self.assertEqual([task.id for task in tasks], ['2-0'])
+        self.assertEqual(progress, [(1, 3), (2, 3), (3, 3)])
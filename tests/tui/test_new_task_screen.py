@@ -0,0 +1,114 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from textual.app import App
+from textual.widgets import Input, ProgressBar, Static
+
+from tasks.config.config import Config
+from tasks.git import GitConfig
+from tasks.git.clone_progress import CloneProgress
+from tasks.tui.context import Context
+from tasks.tui.new_task_screen import NewTask
+
+REPO_URL = 'https://example.com/org/repo.git'
+OTHER_URL = 'https://example.com/org/other.git'
+
+
+def make_repo(remote_url: str) -> GitConfig:
+    project_name, repository_name = GitConfig.get_repo_names(remote_url)
+    return GitConfig.from_dict(
+        {
+            'directory': f'/repos/{repository_name}',
+            'is_git_directory': True,
+            'remote_url': remote_url,
+            'project_name': project_name,
+            'repository_name': repository_name,
+        }
+    )
+
+
+class TestNewTaskRepositories(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        config = Config(
+            config_path=self.tmp_dir.name,
+            tasks_directory=str(Path(self.tmp_dir.name) / 'tasks'),
+        )
+        for patcher in (
+            patch('tasks.tui.context._context', Context(config=config)),
+            patch.object(Context, 'get_all_repos', lambda _: [make_repo(REPO_URL)]),
+            patch('tasks.tui.new_task_screen.stage_workspace', return_value=None),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def test_urls_typed_after_a_chosen_repository(self):
+        app = App()
+        async with app.run_test() as pilot:
+            screen = NewTask()
+            await app.push_screen(screen)
+            repository_input = screen.query_one('#repository_input', Input)
+            repository_input.focus()
+            repository_input.value = 'repo'
+            await pilot.press('enter')
+            await pilot.pause()
+            self.assertEqual(screen.chosen_repository.remote_url, REPO_URL)
+            self.assertEqual(screen.repository_urls, [REPO_URL])
+
+            repository_input.action_end()
+            repository_input.insert_text_at_cursor(f' {OTHER_URL}')
+            await pilot.pause()
+            self.assertEqual(screen.repository_urls, [REPO_URL, OTHER_URL])
+
+    async def test_editing_the_chosen_repository_clears_it(self):
+        app = App()
+        async with app.run_test() as pilot:
+            screen = NewTask()
+            await app.push_screen(screen)
+            repository_input = screen.query_one('#repository_input', Input)
+            repository_input.focus()
+            repository_input.value = 'repo'
+            await pilot.press('enter')
+            await pilot.pause()
+            self.assertEqual(screen._staging[0], REPO_URL)
+
+            repository_input.action_end()
+            await pilot.press('backspace')
+            await pilot.pause()
+            self.assertIsNone(screen.chosen_repository)
+            self.assertIsNone(screen._staging)
+            self.assertEqual(repository_input.value, REPO_URL[:-1])
+
+    async def test_create_shows_the_staged_clone_progress(self):
+        clone_progress = CloneProgress('Receiving objects', 40, 4, 10, eta=75)
+        release = threading.Event()
+
+        def stage_workspace(config, remote_url, cancel, progress):
+            progress(clone_progress)
+            release.wait(10)
+
+        app = App()
+        with patch('tasks.tui.new_task_screen.stage_workspace', stage_workspace):
+            async with app.run_test() as pilot:
+                screen = NewTask()
+                await app.push_screen(screen)
+                screen.chosen_repository = screen._repos_by_url[REPO_URL]
+                await pilot.pause()
+                self.assertEqual(screen._staging_progress, clone_progress)
+
+                screen.task_id = '1-0'
+                screen.task_markdown = '# Task'
+                screen.run_worker(screen.create_task())
+                await pilot.pause()
+                self.assertEqual(
+                    str(screen.query_one('#creation_status', Static).content),
+                    'Receiving objects: 40% (4/10) | ETA 1:15',
+                )
+                progress_bar = screen.query_one('#creation_progress', ProgressBar)
+                self.assertEqual(progress_bar.progress, 40)
+                screen.action_cancel()
+                release.set()
@@ -0,0 +1,76 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from tasks.config.config import Config
+from tasks.service.search_index import SearchIndex
+from tasks.service.task_service import read_task_from_directory
+from tasks.tui.tasks_screen import (
+    TaskRow,
+    diff_tasks,
+    task_id_sort_key,
+    task_search_fields,
+)
+from tests.tui.test_context import make_task
+
+
+class TestDiffTasks(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.config = Config(
+            config_path=self.tmp_dir.name,
+            tasks_directory=str(Path(self.tmp_dir.name) / 'tasks'),
+        )
+        self.tasks = [
+            read_task_from_directory(
+                make_task(self.config.doing_tasks_directory / f'{number}-0-repo'),
+                self.config,
+            )
+            for number in range(1, 4)
+        ]
+        self.rows = [TaskRow.of(task) for task in self.tasks]
+
+    def test_no_changes(self):
+        self.assertFalse(diff_tasks(self.rows, list(self.tasks)))
+
+    def test_added_removed_and_changed(self):
+        first, second, third = self.tasks
+        shutil.rmtree(first.directory)
+        (second.directory / 'TASK' / 'oneliner.txt').write_text('new oneliner')
+        changed = read_task_from_directory(second.directory, self.config)
+        added = read_task_from_directory(
+            make_task(self.config.doing_tasks_directory / '4-0-repo'), self.config
+        )
+
+        diff = diff_tasks(self.rows, [changed, third, added])
+        self.assertEqual(diff.removed, [str(first.directory)])
+        self.assertEqual(diff.changed, [changed])
+        self.assertEqual(diff.added, [added])
+
+    def test_search_fields(self):
+        index = SearchIndex()
+        for task in reversed(self.tasks):
+            index.add(str(task.directory), task_search_fields(task))
+        self.assertEqual(index.search('2'), [str(self.tasks[1].directory)])
+        self.assertEqual(len(index.search('repo onel')), 3)
+
+    def test_moved_task_is_removed_and_added(self):
+        # moves update the task in place, the row keeps the old directory
+        task = self.tasks[0]
+        task.repo.directory = str(
+            self.config.done_tasks_directory / task.directory.name
+        )
+        diff = diff_tasks(self.rows, self.tasks[1:])
+        self.assertEqual(diff.removed, [self.rows[0].key])
+        self.assertEqual(diff.added, [])
+
+
+class TestTaskIdSortKey(unittest.TestCase):
+    def test_numeric_aware(self):
+        task_ids = ['ABC-0', '10-1', '9-0', '10-0', '100-0', '9-10', '9-2']
+        self.assertEqual(
+            sorted(task_ids, key=task_id_sort_key),
+            ['9-0', '9-2', '9-10', '10-0', '10-1', '100-0', 'ABC-0'],
+        )